@@ -0,0 +1,41 @@
+"""Add flow stats covering index and the data revision counter.
+
+Revision ID: 0003_flow_stats_index_revision
+Revises: 0002_seed_stages_on_insert
+Create Date: 2026-10-19 12:00:00.000000
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_flow_stats_index_revision"
+down_revision: str | None = "0002_seed_stages_on_insert"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_history_logs_created_at_type_id_to_stage",
+        "history_logs",
+        ["created_at", "type_id", "to_stage"],
+        unique=False,
+        postgresql_include=["qty"],
+    )
+
+    op.create_table(
+        "data_revisions",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("bulk_revision", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+    )
+    op.execute("INSERT INTO data_revisions (id, bulk_revision) VALUES (1, 0)")
+
+
+def downgrade() -> None:
+    op.drop_table("data_revisions")
+    op.drop_index("ix_history_logs_created_at_type_id_to_stage", table_name="history_logs")
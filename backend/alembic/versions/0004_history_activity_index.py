@@ -0,0 +1,32 @@
+"""Add the descending history index backing the activity feed.
+
+Revision ID: 0004_history_activity_index
+Revises: 0003_flow_stats_index_revision
+Create Date: 2026-10-19 13:00:00.000000
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_history_activity_index"
+down_revision: str | None = "0003_flow_stats_index_revision"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_history_logs_created_at_id_desc",
+        "history_logs",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_history_logs_created_at_id_desc", table_name="history_logs")
@@ -0,0 +1,49 @@
+"""Add periodic per-type stage count snapshots.
+
+Revision ID: 0005_stage_count_snapshots
+Revises: 0004_history_activity_index
+Create Date: 2026-10-19 14:00:00.000000
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_stage_count_snapshots"
+down_revision: str | None = "0004_history_activity_index"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stage_count_snapshots",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("type_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "taken_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.Column("in_box", sa.Integer(), nullable=False),
+        sa.Column("building", sa.Integer(), nullable=False),
+        sa.Column("priming", sa.Integer(), nullable=False),
+        sa.Column("painting", sa.Integer(), nullable=False),
+        sa.Column("done", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ("type_id",),
+            ("miniature_types.id",),
+            ondelete="CASCADE",
+            name="fk_stage_count_snapshots_type_id_miniature_types",
+        ),
+        sa.UniqueConstraint("type_id", "taken_at", name="uq_stage_count_snapshots_type_taken_at"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stage_count_snapshots")
@@ -0,0 +1,127 @@
+"""Add the stage count adjustment ledger and consistency verifier state.
+
+Revision ID: 0006_consistency_verifier
+Revises: 0005_stage_count_snapshots
+Create Date: 2026-10-19 15:00:00.000000
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.domain.stages import STAGES_SQL_LIST
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_consistency_verifier"
+down_revision: str | None = "0005_stage_count_snapshots"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stage_count_adjustments",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("type_id", sa.Integer(), nullable=False),
+        sa.Column("stage_name", sa.String(length=32), nullable=False),
+        sa.Column("delta", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.CheckConstraint(
+            f"stage_name IN ({STAGES_SQL_LIST})",
+            name="ck_stage_count_adjustments_stage_name_valid",
+        ),
+        sa.ForeignKeyConstraint(
+            ("type_id",),
+            ("miniature_types.id",),
+            ondelete="CASCADE",
+            name="fk_stage_count_adjustments_type_id_miniature_types",
+        ),
+    )
+    op.create_index(
+        "ix_stage_count_adjustments_type_id",
+        "stage_count_adjustments",
+        ["type_id"],
+        unique=False,
+    )
+
+    op.create_table(
+        "consistency_checks",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column(
+            "history_high_water_mark", sa.BigInteger(), nullable=False, server_default=sa.text("0")
+        ),
+        sa.Column(
+            "adjustment_high_water_mark",
+            sa.BigInteger(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column("sweep_type_id", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("last_run_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_checked_types", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+
+    op.create_table(
+        "consistency_discrepancies",
+        sa.Column("type_id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("stage_name", sa.String(length=32), primary_key=True, nullable=False),
+        sa.Column("actual", sa.Integer(), nullable=False),
+        sa.Column("expected", sa.Integer(), nullable=False),
+        sa.Column(
+            "detected_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.ForeignKeyConstraint(
+            ("type_id",),
+            ("miniature_types.id",),
+            ondelete="CASCADE",
+            name="fk_consistency_discrepancies_type_id_miniature_types",
+        ),
+    )
+
+    # Existing counts are taken as the baseline: whatever the history does not
+    # explain is recorded as an adjustment so the ledger starts balanced.
+    op.execute(
+        """
+        INSERT INTO stage_count_adjustments (type_id, stage_name, delta)
+        SELECT sc.type_id, sc.stage_name, sc.count - COALESCE(flows.net_qty, 0)
+        FROM stage_counts sc
+        LEFT JOIN (
+            SELECT type_id, stage_name, SUM(delta) AS net_qty
+            FROM (
+                SELECT type_id, to_stage AS stage_name, qty AS delta FROM history_logs
+                UNION ALL
+                SELECT type_id, from_stage AS stage_name, -qty AS delta FROM history_logs
+            ) AS history_flows
+            GROUP BY type_id, stage_name
+        ) AS flows ON flows.type_id = sc.type_id AND flows.stage_name = sc.stage_name
+        WHERE sc.count - COALESCE(flows.net_qty, 0) <> 0
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO consistency_checks
+            (id, history_high_water_mark, adjustment_high_water_mark)
+        SELECT
+            1,
+            (SELECT COALESCE(MAX(id), 0) FROM history_logs),
+            (SELECT COALESCE(MAX(id), 0) FROM stage_count_adjustments)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("consistency_discrepancies")
+    op.drop_table("consistency_checks")
+    op.drop_index("ix_stage_count_adjustments_type_id", table_name="stage_count_adjustments")
+    op.drop_table("stage_count_adjustments")
@@ -0,0 +1,88 @@
+"""Add per-type change markers and the applied delta token for delta export/import.
+
+Revision ID: 0007_delta_export_markers
+Revises: 0006_consistency_verifier
+Create Date: 2026-10-19 16:00:00.000000
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_delta_export_markers"
+down_revision: str | None = "0006_consistency_verifier"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+_SEQUENCE_NAME = "miniature_types_change_seq"
+_SQLITE_TRIGGER_NAME = "trg_miniature_types_change_seq_after_insert"
+
+
+def _add_postgresql_change_seq() -> None:
+    op.execute(f"CREATE SEQUENCE {_SEQUENCE_NAME}")
+    # The volatile default backfills every existing type with its own marker.
+    op.add_column(
+        "miniature_types",
+        sa.Column(
+            "change_seq",
+            sa.BigInteger(),
+            nullable=False,
+            server_default=sa.text(f"nextval('{_SEQUENCE_NAME}')"),
+        ),
+    )
+    op.execute(f"ALTER SEQUENCE {_SEQUENCE_NAME} OWNED BY miniature_types.change_seq")
+
+
+def _add_sqlite_change_seq() -> None:
+    op.add_column(
+        "miniature_types",
+        sa.Column("change_seq", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+    )
+    op.execute("UPDATE miniature_types SET change_seq = id")
+    op.execute(
+        f"""
+        CREATE TRIGGER {_SQLITE_TRIGGER_NAME}
+        AFTER INSERT ON miniature_types
+        FOR EACH ROW
+        BEGIN
+            UPDATE miniature_types
+            SET change_seq = (SELECT COALESCE(MAX(change_seq), 0) + 1 FROM miniature_types)
+            WHERE id = NEW.id;
+        END;
+        """
+    )
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        _add_sqlite_change_seq()
+    else:
+        _add_postgresql_change_seq()
+    op.create_index(
+        "ix_miniature_types_change_seq",
+        "miniature_types",
+        ["change_seq"],
+        unique=False,
+    )
+
+    op.add_column(
+        "data_revisions",
+        sa.Column("applied_delta_token", sa.String(length=64), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("data_revisions", "applied_delta_token")
+    op.drop_index("ix_miniature_types_change_seq", table_name="miniature_types")
+
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute(f"DROP TRIGGER IF EXISTS {_SQLITE_TRIGGER_NAME}")
+        op.drop_column("miniature_types", "change_seq")
+        return
+
+    op.drop_column("miniature_types", "change_seq")
+    op.execute(f"DROP SEQUENCE IF EXISTS {_SEQUENCE_NAME}")
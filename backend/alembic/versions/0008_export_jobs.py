@@ -0,0 +1,61 @@
+"""Add background export jobs.
+
+Revision ID: 0008_export_jobs
+Revises: 0007_delta_export_markers
+Create Date: 2026-10-19 17:00:00.000000
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_export_jobs"
+down_revision: str | None = "0007_delta_export_markers"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "export_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("format", sa.String(length=16), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("data_revision", sa.String(length=96), nullable=True),
+        sa.Column("total_types", sa.Integer(), nullable=True),
+        sa.Column("exported_types", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("artifact_bytes", sa.BigInteger(), nullable=True),
+        sa.Column("error", sa.String(length=500), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.CheckConstraint(
+            "status IN ('pending', 'running', 'completed', 'failed', 'expired')",
+            name="ck_export_jobs_status_valid",
+        ),
+    )
+    op.create_index(
+        "ix_export_jobs_format_data_revision",
+        "export_jobs",
+        ["format", "data_revision"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_export_jobs_format_data_revision", table_name="export_jobs")
+    op.drop_table("export_jobs")
@@ -0,0 +1,38 @@
+"""Add a pattern-ops index for name-prefix filtered exports.
+
+Revision ID: 0009_type_name_pattern_index
+Revises: 0008_export_jobs
+Create Date: 2026-10-19 18:00:00.000000
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_type_name_pattern_index"
+down_revision: str | None = "0008_export_jobs"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # The unique name index follows the database collation, which LIKE
+    # prefixes cannot use outside the C locale; pattern ops compare bytewise.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.create_index(
+        "ix_miniature_types_name_pattern",
+        "miniature_types",
+        ["name"],
+        unique=False,
+        postgresql_ops={"name": "varchar_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_miniature_types_name_pattern", table_name="miniature_types")
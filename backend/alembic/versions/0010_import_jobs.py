@@ -0,0 +1,81 @@
+"""Add background import jobs and their per-type outcomes.
+
+Revision ID: 0010_import_jobs
+Revises: 0009_type_name_pattern_index
+Create Date: 2026-10-19 19:00:00.000000
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_import_jobs"
+down_revision: str | None = "0009_type_name_pattern_index"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "import_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("mode", sa.String(length=16), nullable=False),
+        sa.Column("commit_mode", sa.String(length=16), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("content_encoding", sa.String(length=16), nullable=True),
+        sa.Column("body_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("processed_types", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("processed_rows", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("error_code", sa.String(length=64), nullable=True),
+        sa.Column("error", sa.String(length=500), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.CheckConstraint(
+            "status IN ('pending', 'running', 'completed', 'failed')",
+            name="ck_import_jobs_status_valid",
+        ),
+        sa.CheckConstraint("mode IN ('merge', 'delta')", name="ck_import_jobs_mode_valid"),
+        sa.CheckConstraint(
+            "commit_mode IN ('single', 'chunked')", name="ck_import_jobs_commit_mode_valid"
+        ),
+    )
+    op.create_table(
+        "import_job_types",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column(
+            "job_id",
+            sa.Integer(),
+            sa.ForeignKey("import_jobs.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("history_rows", sa.Integer(), nullable=False),
+        sa.Column("outcome", sa.String(length=16), nullable=False),
+        sa.UniqueConstraint("job_id", "position", name="uq_import_job_types_job_position"),
+        sa.CheckConstraint(
+            "outcome IN ('pending', 'applied', 'skipped', 'rolled_back')",
+            name="ck_import_job_types_outcome_valid",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("import_job_types")
+    op.drop_table("import_jobs")
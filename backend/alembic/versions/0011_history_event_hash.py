@@ -0,0 +1,49 @@
+"""Add content hashes of imported history events for idempotent imports.
+
+Revision ID: 0011_history_event_hash
+Revises: 0010_import_jobs
+Create Date: 2026-10-19 20:00:00.000000
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0011_history_event_hash"
+down_revision: str | None = "0010_import_jobs"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+_HASHED_ROWS = sa.text("event_hash IS NOT NULL")
+
+
+def _replace_import_job_modes(modes_sql: str) -> None:
+    # Batch mode lets SQLite rebuild the table; PostgreSQL alters it in place.
+    with op.batch_alter_table("import_jobs") as batch_op:
+        batch_op.drop_constraint("ck_import_jobs_mode_valid", type_="check")
+        batch_op.create_check_constraint("ck_import_jobs_mode_valid", f"mode IN ({modes_sql})")
+
+
+def upgrade() -> None:
+    op.add_column("history_logs", sa.Column("event_hash", sa.LargeBinary(32), nullable=True))
+    # Partial, so rows written by moves and plain imports cost nothing here.
+    op.create_index(
+        "uq_history_logs_event_hash",
+        "history_logs",
+        ["event_hash"],
+        unique=True,
+        postgresql_where=_HASHED_ROWS,
+        sqlite_where=_HASHED_ROWS,
+    )
+    _replace_import_job_modes("'merge', 'delta', 'idempotent'")
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM import_jobs WHERE mode = 'idempotent'")
+    _replace_import_job_modes("'merge', 'delta'")
+    op.drop_index("uq_history_logs_event_hash", table_name="history_logs")
+    op.drop_column("history_logs", "event_hash")
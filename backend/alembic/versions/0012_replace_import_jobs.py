@@ -0,0 +1,34 @@
+"""Allow replace-mode import jobs.
+
+Revision ID: 0012_replace_import_jobs
+Revises: 0011_history_event_hash
+Create Date: 2026-10-19 21:00:00.000000
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0012_replace_import_jobs"
+down_revision: str | None = "0011_history_event_hash"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def _replace_import_job_modes(modes_sql: str) -> None:
+    # Batch mode lets SQLite rebuild the table; PostgreSQL alters it in place.
+    with op.batch_alter_table("import_jobs") as batch_op:
+        batch_op.drop_constraint("ck_import_jobs_mode_valid", type_="check")
+        batch_op.create_check_constraint("ck_import_jobs_mode_valid", f"mode IN ({modes_sql})")
+
+
+def upgrade() -> None:
+    _replace_import_job_modes("'merge', 'delta', 'idempotent', 'replace'")
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM import_jobs WHERE mode = 'replace'")
+    _replace_import_job_modes("'merge', 'delta', 'idempotent'")
@@ -0,0 +1,57 @@
+"""Keep running per-stage totals for the consistency verifier.
+
+Revision ID: 0013_consistency_running_totals
+Revises: 0012_replace_import_jobs
+Create Date: 2026-10-19 22:00:00.000000
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0013_consistency_running_totals"
+down_revision: str | None = "0012_replace_import_jobs"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "consistency_expected_counts",
+        sa.Column("type_id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("stage_name", sa.String(length=32), primary_key=True, nullable=False),
+        sa.Column("expected", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ("type_id",),
+            ("miniature_types.id",),
+            ondelete="CASCADE",
+            name="fk_consistency_expected_counts_type_id_miniature_types",
+        ),
+    )
+    # The totals start empty at mark 0; the first check sums the whole history
+    # once and every later one only the rows appended since.
+    with op.batch_alter_table("consistency_checks") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "totals_history_mark", sa.BigInteger(), nullable=False, server_default=sa.text("0")
+            )
+        )
+        batch_op.add_column(
+            sa.Column(
+                "totals_adjustment_mark",
+                sa.BigInteger(),
+                nullable=False,
+                server_default=sa.text("0"),
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("consistency_checks") as batch_op:
+        batch_op.drop_column("totals_adjustment_mark")
+        batch_op.drop_column("totals_history_mark")
+    op.drop_table("consistency_expected_counts")
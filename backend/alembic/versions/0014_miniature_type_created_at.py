@@ -0,0 +1,74 @@
+"""Record when each miniature type was created.
+
+Revision ID: 0014_miniature_type_created_at
+Revises: 0013_consistency_running_totals
+Create Date: 2026-10-19 23:00:00.000000
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0014_miniature_type_created_at"
+down_revision: str | None = "0013_consistency_running_totals"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+_SQLITE_TRIGGER_NAME = "trg_miniature_types_created_at_after_insert"
+
+
+def _add_postgresql_created_at() -> None:
+    op.add_column(
+        "miniature_types",
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+    )
+
+
+def _add_sqlite_created_at() -> None:
+    # SQLite cannot add a column with a non-constant default, so an empty
+    # default is replaced with the insert time by a trigger instead.
+    op.add_column(
+        "miniature_types",
+        sa.Column("created_at", sa.String(), nullable=False, server_default=sa.text("''")),
+    )
+    op.execute("UPDATE miniature_types SET created_at = CURRENT_TIMESTAMP")
+    op.execute(
+        f"""
+        CREATE TRIGGER {_SQLITE_TRIGGER_NAME}
+        AFTER INSERT ON miniature_types
+        FOR EACH ROW
+        WHEN NEW.created_at = ''
+        BEGIN
+            UPDATE miniature_types SET created_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END;
+        """
+    )
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        _add_sqlite_created_at()
+    else:
+        _add_postgresql_created_at()
+    # Existing types get the upgrade time; move them back to their earliest
+    # history row or snapshot so past ``as_of`` queries still list them.
+    for table, column in (("history_logs", "created_at"), ("stage_count_snapshots", "taken_at")):
+        earliest = f"(SELECT MIN({column}) FROM {table} WHERE type_id = miniature_types.id)"
+        op.execute(
+            f"UPDATE miniature_types SET created_at = {earliest} WHERE {earliest} < created_at"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute(f"DROP TRIGGER IF EXISTS {_SQLITE_TRIGGER_NAME}")
+    op.drop_column("miniature_types", "created_at")
@@ -0,0 +1,39 @@
+"""Hold back the verifier's totals marks until in-flight writers finish.
+
+Revision ID: 0015_consistency_pending_marks
+Revises: 0014_miniature_type_created_at
+Create Date: 2026-10-20 10:00:00.000000
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0015_consistency_pending_marks"
+down_revision: str | None = "0014_miniature_type_created_at"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+_COLUMNS = ("pending_history_mark", "pending_adjustment_mark", "pending_xmax")
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("consistency_checks") as batch_op:
+        for name in _COLUMNS:
+            batch_op.add_column(
+                sa.Column(name, sa.BigInteger(), nullable=False, server_default=sa.text("0"))
+            )
+    # Totals folded under the old fixed lookback may have skipped rows that
+    # committed late, so they are summed again from scratch.
+    op.execute("DELETE FROM consistency_expected_counts")
+    op.execute("UPDATE consistency_checks SET totals_history_mark = 0, totals_adjustment_mark = 0")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("consistency_checks") as batch_op:
+        for name in reversed(_COLUMNS):
+            batch_op.drop_column(name)
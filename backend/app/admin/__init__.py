@@ -0,0 +1 @@
+"""Administrative command-line tools that talk to the database directly."""
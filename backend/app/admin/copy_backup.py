@@ -0,0 +1,276 @@
+"""Full backup and restore through PostgreSQL ``COPY``.
+
+Usage::
+
+    python -m app.admin.copy_backup dump /backups/2026-10-19 [--format csv|binary]
+    python -m app.admin.copy_backup restore /backups/2026-10-19
+
+A dump holds the two flat export tables, ``types`` and ``history``. The CSV
+files have the columns, header and value rendering of
+``GET /api/v1/export?format=csv&table=...``, so such downloads can be
+restored as well. Binary dumps skip text rendering on both ends and are the
+fastest option between PostgreSQL servers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import asdict, dataclass
+from enum import StrEnum
+from pathlib import Path
+from typing import Final
+
+from sqlalchemy import (
+    ColumnElement,
+    Integer,
+    String,
+    case,
+    cast,
+    extract,
+    func,
+    text,
+    type_coerce,
+    update,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.v1.columnar import build_columnar_statement
+from app.api.v1.delta import hold_import_lock
+from app.api.v1.schemas import ExportTable
+from app.db.models import DataRevision, HistoryLog
+from app.db.session import get_session_factory
+from app.domain.stages import STAGE_COUNT_FIELD_BY_STAGE
+from app.workers.consistency import rebuild_adjustment_ledger
+
+COPY_CHUNK_BYTES: Final[int] = 1024 * 1024
+MANIFEST_FILE_NAME: Final[str] = "manifest.json"
+
+
+class BackupFormat(StrEnum):
+    CSV = "csv"
+    BINARY = "binary"
+
+
+_FILE_SUFFIX_BY_FORMAT: Final[dict[BackupFormat, str]] = {
+    BackupFormat.CSV: "csv",
+    BackupFormat.BINARY: "bin",
+}
+_COPY_OPTIONS_BY_FORMAT: Final[dict[BackupFormat, str]] = {
+    BackupFormat.CSV: "FORMAT csv, HEADER true",
+    BackupFormat.BINARY: "FORMAT binary",
+}
+# Column types match the dumped expressions exactly, which binary COPY
+# requires; ``position`` keeps the file order for equal timestamps.
+_RESTORE_COLUMNS: Final[dict[ExportTable, tuple[tuple[str, str], ...]]] = {
+    ExportTable.TYPES: (
+        ("name", "varchar(255)"),
+        *((field, "bigint") for field in STAGE_COUNT_FIELD_BY_STAGE.values()),
+    ),
+    ExportTable.HISTORY: (
+        ("name", "varchar(255)"),
+        ("from_stage", "varchar(32)"),
+        ("to_stage", "varchar(32)"),
+        ("qty", "integer"),
+        ("created_at", "timestamptz"),
+    ),
+}
+
+
+@dataclass
+class BackupManifest:
+    format: BackupFormat
+    types: int
+    history: int
+
+
+def _backup_file(directory: Path, table: ExportTable, backup_format: BackupFormat) -> Path:
+    return directory / f"{table.value}.{_FILE_SUFFIX_BY_FORMAT[backup_format]}"
+
+
+def _export_timestamp_sql() -> ColumnElement[str]:
+    """``created_at`` rendered the way the JSON/CSV export renders it."""
+    utc_created_at = func.timezone("UTC", HistoryLog.created_at)
+    microseconds = cast(extract("microseconds", HistoryLog.created_at), Integer)
+    # mod() rather than %, which the compiled COPY query would escape as %%.
+    whole_seconds = func.mod(microseconds, 1_000_000) == 0
+    rendered = case(
+        (whole_seconds, func.to_char(utc_created_at, 'YYYY-MM-DD"T"HH24:MI:SS"Z"')),
+        else_=func.to_char(utc_created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"'),
+    )
+    return type_coerce(rendered, String).label("created_at")
+
+
+def _render_copy_query(table: ExportTable, backup_format: BackupFormat) -> str:
+    created_at = _export_timestamp_sql() if backup_format == BackupFormat.CSV else None
+    stmt = build_columnar_statement(table, created_at=created_at)
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def _copy_table_out(
+    db_session: Session, table: ExportTable, backup_format: BackupFormat, path: Path
+) -> int:
+    query = _render_copy_query(table, backup_format)
+    options = _COPY_OPTIONS_BY_FORMAT[backup_format]
+    cursor = db_session.connection().connection.driver_connection.cursor()
+    with cursor, path.open("wb") as backup_file:
+        with cursor.copy(f"COPY ({query}) TO STDOUT ({options})") as copy:
+            for data in copy:
+                backup_file.write(data)
+        return cursor.rowcount
+
+
+def _copy_table_in(
+    db_session: Session, table: ExportTable, backup_format: BackupFormat, path: Path
+) -> int:
+    columns = _RESTORE_COLUMNS[table]
+    column_ddl = ", ".join(f"{name} {sql_type} NOT NULL" for name, sql_type in columns)
+    db_session.execute(
+        text(
+            f"CREATE TEMPORARY TABLE restore_{table.value} "
+            f"(position bigint GENERATED ALWAYS AS IDENTITY, {column_ddl}) ON COMMIT DROP"
+        )
+    )
+    column_list = ", ".join(name for name, _sql_type in columns)
+    options = _COPY_OPTIONS_BY_FORMAT[backup_format]
+    cursor = db_session.connection().connection.driver_connection.cursor()
+    copy_sql = f"COPY restore_{table.value} ({column_list}) FROM STDIN ({options})"
+    with cursor, path.open("rb") as backup_file:
+        with cursor.copy(copy_sql) as copy:
+            while data := backup_file.read(COPY_CHUNK_BYTES):
+                copy.write(data)
+        return cursor.rowcount
+
+
+def dump_backup(
+    session_factory: sessionmaker[Session], directory: Path, backup_format: BackupFormat
+) -> BackupManifest:
+    directory.mkdir(parents=True, exist_ok=True)
+    with session_factory() as db_session, db_session.begin():
+        # Both tables come from one snapshot, so history always matches types.
+        db_session.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY"))
+        row_counts = {
+            table: _copy_table_out(
+                db_session, table, backup_format, _backup_file(directory, table, backup_format)
+            )
+            for table in ExportTable
+        }
+
+    manifest = BackupManifest(
+        format=backup_format,
+        types=row_counts[ExportTable.TYPES],
+        history=row_counts[ExportTable.HISTORY],
+    )
+    (directory / MANIFEST_FILE_NAME).write_text(json.dumps(asdict(manifest)))
+    return manifest
+
+
+def _detect_backup_format(directory: Path) -> BackupFormat:
+    manifest_path = directory / MANIFEST_FILE_NAME
+    if manifest_path.is_file():
+        return BackupFormat(json.loads(manifest_path.read_text())["format"])
+    # A pair of CSV downloads from the export endpoint has no manifest.
+    return BackupFormat.CSV
+
+
+def restore_backup(session_factory: sessionmaker[Session], directory: Path) -> BackupManifest:
+    """Replace all types, counts and history with the backup in one transaction."""
+    backup_format = _detect_backup_format(directory)
+    with session_factory() as db_session, db_session.begin():
+        row_counts = {
+            table: _copy_table_in(
+                db_session, table, backup_format, _backup_file(directory, table, backup_format)
+            )
+            for table in ExportTable
+        }
+
+        # A TRUNCATE queued behind one worker of a parallel import would stall
+        # the others, so the restore waits for such imports to finish first.
+        hold_import_lock(db_session, exclusive=True)
+        # Cascades to stage counts, history, snapshots and the ledger. Ids keep
+        # growing, so delta tokens issued before the restore stay ordered.
+        db_session.execute(text("TRUNCATE miniature_types CASCADE"))
+        # A restored type dates from its earliest history row, as after an import.
+        db_session.execute(
+            text(
+                """
+                INSERT INTO miniature_types (name, created_at)
+                SELECT rt.name, LEAST(now(), first_events.created_at)
+                FROM restore_types rt
+                LEFT JOIN (
+                    SELECT name, min(created_at) AS created_at
+                    FROM restore_history
+                    GROUP BY name
+                ) AS first_events ON first_events.name = rt.name
+                ORDER BY rt.name
+                """
+            )
+        )
+        count_by_stage_sql = " ".join(
+            f"WHEN '{stage.value}' THEN rt.{field}"
+            for stage, field in STAGE_COUNT_FIELD_BY_STAGE.items()
+        )
+        db_session.execute(
+            text(
+                f"""
+                UPDATE stage_counts sc
+                SET count = CASE sc.stage_name {count_by_stage_sql} END
+                FROM restore_types rt
+                JOIN miniature_types mt ON mt.name = rt.name
+                WHERE sc.type_id = mt.id
+                """
+            )
+        )
+        restored_history = db_session.execute(
+            text(
+                """
+                INSERT INTO history_logs (type_id, from_stage, to_stage, qty, created_at)
+                SELECT mt.id, rh.from_stage, rh.to_stage, rh.qty, rh.created_at
+                FROM restore_history rh
+                JOIN miniature_types mt ON mt.name = rh.name
+                ORDER BY rh.position
+                """
+            )
+        ).rowcount
+        if restored_history != row_counts[ExportTable.HISTORY]:
+            raise ValueError("History rows reference types that are missing from the backup.")
+
+        rebuild_adjustment_ledger(db_session)
+        db_session.execute(
+            update(DataRevision)
+            .where(DataRevision.id == 1)
+            .values(bulk_revision=DataRevision.bulk_revision + 1, applied_delta_token=None)
+        )
+
+    with session_factory() as db_session, db_session.begin():
+        db_session.execute(text("ANALYZE miniature_types, stage_counts, history_logs"))
+
+    return BackupManifest(
+        format=backup_format,
+        types=row_counts[ExportTable.TYPES],
+        history=row_counts[ExportTable.HISTORY],
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.admin.copy_backup")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    dump_parser = subcommands.add_parser("dump", help="write a backup of all data")
+    dump_parser.add_argument("directory", type=Path)
+    dump_parser.add_argument(
+        "--format", type=BackupFormat, choices=list(BackupFormat), default=BackupFormat.CSV
+    )
+    restore_parser = subcommands.add_parser("restore", help="replace all data with a backup")
+    restore_parser.add_argument("directory", type=Path)
+    args = parser.parse_args(argv)
+
+    if args.command == "dump":
+        manifest = dump_backup(get_session_factory(), args.directory, args.format)
+    else:
+        manifest = restore_backup(get_session_factory(), args.directory)
+    print(f"{args.command}: {manifest.types} types, {manifest.history} history rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Latency, throughput and in-flight requests per endpoint for ``/metrics``."""
+
+from __future__ import annotations
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics import REQUEST_DURATION, REQUESTS, REQUESTS_IN_PROGRESS
+
+
+class RequestMetricsMiddleware:
+    """Time every HTTP request and count it by endpoint name and status code.
+
+    Endpoint names come from the matched route, which keeps the label set as
+    small as the API; requests that match no route share ``unmatched``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            handler = getattr(scope.get("route"), "name", None) or "unmatched"
+            REQUEST_DURATION.labels(method, handler).observe(time.perf_counter() - started_at)
+            REQUESTS.labels(method, handler, str(status_code)).inc()
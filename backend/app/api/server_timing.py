@@ -0,0 +1,74 @@
+"""Per-request SQL statement counts in ``Server-Timing`` headers."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Mapping
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.query_stats import QueryStats, collect_query_stats
+
+logger = logging.getLogger(__name__)
+
+
+def format_server_timing(stats: QueryStats) -> str:
+    return f"db;dur={stats.duration_seconds * 1000:.3f}, db_count;desc={stats.count}"
+
+
+class ServerTimingMiddleware:
+    """Report the statements each request ran and log requests that ran too many.
+
+    ``db`` carries the time spent executing statements and ``db_count`` their
+    number. Both are taken when the response starts, so statements a
+    streaming response runs while sending its body are not included.
+
+    ``log_threshold`` (0 disables) applies to every route unless
+    ``route_log_thresholds`` has an entry for it, keyed by endpoint name,
+    e.g. ``"import_state"``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        log_threshold: int = 0,
+        route_log_thresholds: Mapping[str, int] | None = None,
+    ) -> None:
+        self.app = app
+        self.log_threshold = log_threshold
+        self.route_log_thresholds = dict(route_log_thresholds or {})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with collect_query_stats() as stats:
+
+            async def send_with_server_timing(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", format_server_timing(stats)
+                    )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_server_timing)
+            finally:
+                self._log_if_over_threshold(scope, stats)
+
+    def _log_if_over_threshold(self, scope: Scope, stats: QueryStats) -> None:
+        # The router records the matched route in the scope it was given.
+        route_name = getattr(scope.get("route"), "name", "")
+        threshold = self.route_log_thresholds.get(route_name, self.log_threshold)
+        if threshold and stats.count > threshold:
+            logger.warning(
+                "%s %s (%s) ran %d SQL statements (threshold %d) in %.1f ms",
+                scope["method"],
+                scope["path"],
+                route_name,
+                stats.count,
+                threshold,
+                stats.duration_seconds * 1000,
+            )
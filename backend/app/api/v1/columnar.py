@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import csv
+import importlib
+import io
+from collections.abc import Iterator, Sequence
+from types import ModuleType
+from typing import Any, Final
+
+from fastapi import HTTPException, status
+from sqlalchemy import ColumnElement, Row, Select, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.v1.exporting import (
+    ALL_DATA,
+    EXPORT_STREAM_CHUNK_BYTES,
+    EXPORT_STREAM_YIELD_PER,
+    ExportFilter,
+    build_type_counts_subquery,
+    format_export_timestamp,
+)
+from app.api.v1.schemas import ExportTable
+from app.db.models import HistoryLog, MiniatureType
+from app.domain.stages import STAGE_COUNT_FIELD_BY_STAGE, STAGE_INDEX, StageCode
+
+PARQUET_COMPRESSION: Final[str] = "zstd"
+
+TYPES_TABLE_COLUMNS: Final[tuple[str, ...]] = ("name", *STAGE_COUNT_FIELD_BY_STAGE.values())
+HISTORY_TABLE_COLUMNS: Final[tuple[str, ...]] = (
+    "name",
+    "from_stage",
+    "to_stage",
+    "qty",
+    "created_at",
+)
+
+
+def build_columnar_statement(
+    table: ExportTable,
+    created_at: ColumnElement[Any] | None = None,
+    export_filter: ExportFilter = ALL_DATA,
+) -> Select:
+    """Rows of one flat export table, in the same order as the JSON export.
+
+    ``created_at`` replaces the history timestamp column, e.g. with a rendered
+    string when the rows are written by the database itself.
+    """
+    if table == ExportTable.TYPES:
+        counts = build_type_counts_subquery()
+        return (
+            select(
+                MiniatureType.name,
+                *[counts.c[field_name] for field_name in STAGE_COUNT_FIELD_BY_STAGE.values()],
+            )
+            .join(counts, counts.c.type_id == MiniatureType.id)
+            .where(*export_filter.type_criteria())
+            .order_by(MiniatureType.name.asc())
+        )
+    return (
+        select(
+            MiniatureType.name,
+            HistoryLog.from_stage,
+            HistoryLog.to_stage,
+            HistoryLog.qty,
+            HistoryLog.created_at if created_at is None else created_at,
+        )
+        .join(MiniatureType, MiniatureType.id == HistoryLog.type_id)
+        .where(*export_filter.type_criteria(), *export_filter.history_window_criteria())
+        .order_by(MiniatureType.name.asc(), HistoryLog.created_at.asc(), HistoryLog.id.asc())
+    )
+
+
+def _iter_row_partitions(
+    db_session: Session, table: ExportTable, export_filter: ExportFilter
+) -> Iterator[Sequence[Row]]:
+    stmt = build_columnar_statement(table, export_filter=export_filter)
+    result = db_session.execute(stmt.execution_options(yield_per=EXPORT_STREAM_YIELD_PER))
+    yield from result.partitions()
+
+
+def iter_csv_export(
+    session_factory: sessionmaker[Session],
+    table: ExportTable,
+    export_filter: ExportFilter = ALL_DATA,
+) -> Iterator[bytes]:
+    """Stream one export table as CSV with a header row.
+
+    Timestamps use the JSON export's rendering so both formats load identically.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    is_history = table == ExportTable.HISTORY
+    writer.writerow(HISTORY_TABLE_COLUMNS if is_history else TYPES_TABLE_COLUMNS)
+
+    with session_factory() as db_session:
+        for rows in _iter_row_partitions(db_session, table, export_filter):
+            if is_history:
+                writer.writerows(
+                    (name, from_stage, to_stage, qty, format_export_timestamp(created_at))
+                    for name, from_stage, to_stage, qty, created_at in rows
+                )
+            else:
+                writer.writerows(rows)
+            if buffer.tell() >= EXPORT_STREAM_CHUNK_BYTES:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def import_pyarrow() -> tuple[ModuleType, ModuleType]:
+    """Load ``pyarrow`` and ``pyarrow.parquet``, which ship in the ``analytics`` extra."""
+    try:
+        return importlib.import_module("pyarrow"), importlib.import_module("pyarrow.parquet")
+    except ImportError as error:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet export requires the 'analytics' extra (pyarrow).",
+        ) from error
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back to the generator."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> Iterator[bytes]:
+        if self._chunks:
+            yield b"".join(self._chunks)
+            self._chunks.clear()
+
+
+def _build_parquet_schema(pa: ModuleType, table: ExportTable) -> Any:
+    if table == ExportTable.TYPES:
+        return pa.schema(
+            [("name", pa.string())]
+            + [(field_name, pa.int32()) for field_name in STAGE_COUNT_FIELD_BY_STAGE.values()]
+        )
+    stage_type = pa.dictionary(pa.int8(), pa.string())
+    return pa.schema(
+        [
+            ("name", pa.string()),
+            ("from_stage", stage_type),
+            ("to_stage", stage_type),
+            ("qty", pa.int32()),
+            ("created_at", pa.timestamp("us", tz="UTC")),
+        ]
+    )
+
+
+def _build_record_batch(
+    pa: ModuleType, schema: Any, table: ExportTable, rows: Sequence[Row]
+) -> Any:
+    columns = list(zip(*rows, strict=True))
+    if table == ExportTable.TYPES:
+        arrays = [pa.array(column, type=field.type) for column, field in zip(columns, schema)]
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    # Every stage column shares one fixed dictionary, so indices mean the
+    # same stage in every batch and file.
+    stage_dictionary = pa.array([stage.value for stage in StageCode], type=pa.string())
+    names, from_stages, to_stages, quantities, created_ats = columns
+    arrays = [
+        pa.array(names, type=pa.string()),
+        *[
+            pa.DictionaryArray.from_arrays(
+                pa.array([STAGE_INDEX[stage] for stage in stages], type=pa.int8()),
+                stage_dictionary,
+            )
+            for stages in (from_stages, to_stages)
+        ],
+        pa.array(quantities, type=pa.int32()),
+        pa.array(created_ats, type=pa.timestamp("us", tz="UTC")),
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def iter_parquet_export(
+    session_factory: sessionmaker[Session],
+    table: ExportTable,
+    export_filter: ExportFilter = ALL_DATA,
+) -> Iterator[bytes]:
+    """Stream one export table as Parquet, one row group per fetched partition."""
+    pa, pq = import_pyarrow()
+    schema = _build_parquet_schema(pa, table)
+    sink = _ChunkSink()
+
+    with session_factory() as db_session:
+        writer = pq.ParquetWriter(sink, schema, compression=PARQUET_COMPRESSION)
+        try:
+            for rows in _iter_row_partitions(db_session, table, export_filter):
+                writer.write_batch(_build_record_batch(pa, schema, table, rows))
+                yield from sink.drain()
+        finally:
+            writer.close()
+    yield from sink.drain()
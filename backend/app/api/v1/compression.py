@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import gzip
+import zlib
+from collections.abc import Iterable, Iterator
+from enum import StrEnum
+from typing import BinaryIO, Final
+
+import zstandard
+
+from app.api.v1.errors import ApiContractError, ErrorCode
+
+DECOMPRESS_READ_SIZE: Final[int] = 64 * 1024
+GZIP_COMPRESSION_LEVEL: Final[int] = 6
+ZSTD_COMPRESSION_LEVEL: Final[int] = 3
+
+
+class ContentEncoding(StrEnum):
+    ZSTD = "zstd"
+    GZIP = "gzip"
+
+
+# Preference order when the client accepts several encodings with equal weight.
+_ENCODING_PREFERENCE: Final[tuple[ContentEncoding, ...]] = (
+    ContentEncoding.ZSTD,
+    ContentEncoding.GZIP,
+)
+
+
+def _parse_accept_encoding(header_value: str) -> dict[str, float]:
+    weights: dict[str, float] = {}
+    for part in header_value.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[token] = weight
+    return weights
+
+
+def negotiate_content_encoding(accept_encoding: str | None) -> ContentEncoding | None:
+    if not accept_encoding:
+        return None
+
+    weights = _parse_accept_encoding(accept_encoding)
+    wildcard_weight = weights.get("*", 0.0)
+    best: ContentEncoding | None = None
+    best_weight = 0.0
+    for encoding in _ENCODING_PREFERENCE:
+        weight = weights.get(encoding.value, wildcard_weight)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def iter_compressed(chunks: Iterable[bytes], encoding: ContentEncoding) -> Iterator[bytes]:
+    """Compress a byte stream chunk by chunk without buffering the whole body."""
+    if encoding == ContentEncoding.ZSTD:
+        compressor = zstandard.ZstdCompressor(level=ZSTD_COMPRESSION_LEVEL).compressobj()
+    else:
+        compressor = zlib.compressobj(GZIP_COMPRESSION_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    tail = compressor.flush()
+    if tail:
+        yield tail
+
+
+def parse_content_encoding(header_value: str | None) -> ContentEncoding | None:
+    normalized = (header_value or "").strip().lower()
+    if normalized in ("", "identity"):
+        return None
+    try:
+        return ContentEncoding(normalized)
+    except ValueError as error:
+        raise ApiContractError(
+            code=ErrorCode.ERR_INVALID_IMPORT_FORMAT,
+            message="Import payload is invalid.",
+        ) from error
+
+
+def open_decompressed(raw_body: BinaryIO, encoding: ContentEncoding | None) -> BinaryIO:
+    if encoding == ContentEncoding.GZIP:
+        return gzip.GzipFile(fileobj=raw_body, mode="rb")
+    if encoding == ContentEncoding.ZSTD:
+        return zstandard.ZstdDecompressor().stream_reader(raw_body, read_across_frames=True)
+    return raw_body
+
+
+class LimitedDecompressedReader:
+    """Decompressed view of the spooled request body with a size ceiling.
+
+    ``max_bytes`` applies to the bytes actually produced, and each read is
+    bounded to ``DECOMPRESS_READ_SIZE`` so a small, highly compressed body
+    cannot inflate past the limit before it is noticed.
+    """
+
+    def __init__(self, raw_body: BinaryIO, encoding: ContentEncoding | None, max_bytes: int):
+        self._decompressed = open_decompressed(raw_body, encoding)
+        self._max_bytes = max_bytes
+        self._total_bytes = 0
+
+    def read(self, size: int = DECOMPRESS_READ_SIZE) -> bytes:
+        if size < 0 or size > DECOMPRESS_READ_SIZE:
+            size = DECOMPRESS_READ_SIZE
+        try:
+            chunk = self._decompressed.read(size)
+        except (OSError, EOFError, zlib.error, zstandard.ZstdError) as error:
+            raise ApiContractError(
+                code=ErrorCode.ERR_INVALID_IMPORT_FORMAT,
+                message="Import payload is invalid.",
+            ) from error
+        self._total_bytes += len(chunk)
+        if self._total_bytes > self._max_bytes:
+            raise payload_too_large_error(self._max_bytes)
+        return chunk
+
+
+def _format_byte_limit(max_bytes: int) -> str:
+    for unit, unit_bytes in (("MB", 1024 * 1024), ("KB", 1024)):
+        if max_bytes >= unit_bytes:
+            return f"{round(max_bytes / unit_bytes, 1):g}{unit}"
+    return f"{max_bytes} bytes"
+
+
+def payload_too_large_error(max_bytes: int) -> ApiContractError:
+    return ApiContractError(
+        code=ErrorCode.ERR_PAYLOAD_TOO_LARGE,
+        message=f"Import payload exceeds the {_format_byte_limit(max_bytes)} limit.",
+    )
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from collections.abc import Collection
+from dataclasses import dataclass
+from typing import Final
+
+from sqlalchemy import ColumnElement, func, literal_column, select, text, update
+from sqlalchemy.orm import Session
+
+from app.api.v1.errors import ApiContractError, ErrorCode
+from app.api.v1.schemas import DELTA_TOKEN_PATTERN
+from app.db.models import DataRevision, HistoryLog, MiniatureType
+
+_DELTA_TOKEN_RE: Final[re.Pattern[str]] = re.compile(DELTA_TOKEN_PATTERN)
+_IMPORT_LOCK_KEY: Final[str] = "imports"
+_IN_PROGRESS_DIGEST_LENGTH: Final[int] = 16
+
+
+@dataclass(frozen=True, slots=True)
+class DeltaToken:
+    """Watermarks of a delta export: the last ``history_logs.id`` and type ``change_seq``."""
+
+    history_id: int
+    change_seq: int
+
+    @classmethod
+    def parse(cls, raw_token: str) -> DeltaToken:
+        if not _DELTA_TOKEN_RE.match(raw_token):
+            raise ApiContractError(
+                code=ErrorCode.ERR_VALIDATION,
+                message="Request validation failed.",
+            )
+        history_id, change_seq = raw_token.split(".")
+        return cls(history_id=int(history_id), change_seq=int(change_seq))
+
+    def __str__(self) -> str:
+        return f"{self.history_id}.{self.change_seq}"
+
+
+INITIAL_DELTA_TOKEN: Final[DeltaToken] = DeltaToken(history_id=0, change_seq=0)
+
+
+def hold_import_lock(db_session: Session, *, exclusive: bool = False) -> None:
+    """Take the import advisory lock until the end of the transaction.
+
+    Imports hold it shared and do not block each other. Watermark readers hold
+    it exclusively, so they wait for running imports before locking any table.
+    A parallel import holds it exclusively too: its worker connections wait on
+    each other inside the application, where PostgreSQL cannot see a deadlock,
+    so nothing that could queue behind one worker may run alongside it.
+    """
+    if db_session.get_bind().dialect.name != "postgresql":
+        return
+    lock_function = "pg_advisory_xact_lock" if exclusive else "pg_advisory_xact_lock_shared"
+    db_session.execute(text(f"SELECT {lock_function}(hashtext(:key))"), {"key": _IMPORT_LOCK_KEY})
+
+
+def read_delta_watermarks(db_session: Session) -> DeltaToken:
+    """Read the current watermarks; must run in its own short transaction.
+
+    Ids and markers are drawn from sequences before their transaction commits,
+    so a plain ``MAX()`` may skip a row that becomes visible later with a
+    smaller value. ``SHARE`` mode waits for every in-flight writer of the two
+    tables and blocks new ones until commit, which makes everything at or below
+    the returned maxima final. Writers take ``miniature_types`` before
+    ``history_logs``; locking in the same order keeps this deadlock-free.
+
+    The import lock is taken first: a table lock requested behind a long
+    import would queue every later writer behind it as well, while waiting on
+    the advisory lock leaves moves and creates running.
+    """
+    if db_session.get_bind().dialect.name == "postgresql":
+        hold_import_lock(db_session, exclusive=True)
+        db_session.execute(text("LOCK TABLE miniature_types, history_logs IN SHARE MODE"))
+    history_id = db_session.execute(select(func.max(HistoryLog.id))).scalar_one()
+    change_seq = db_session.execute(select(func.max(MiniatureType.change_seq))).scalar_one()
+    return DeltaToken(history_id=history_id or 0, change_seq=change_seq or 0)
+
+
+def _in_flight_writers_sql() -> str:
+    # Writers hold ROW EXCLUSIVE on the tables they write until they finish,
+    # prepared transactions included. Transactions the snapshot lists that
+    # have finished since cannot be told apart, so they count as writers.
+    tables = ", ".join(
+        f"'{table.name}'::regclass"
+        for table in (DataRevision.__table__, MiniatureType.__table__, HistoryLog.__table__)
+    )
+    return (
+        "ARRAY(SELECT 'v' || virtualtransaction FROM pg_locks"
+        " WHERE locktype = 'relation' AND mode = 'RowExclusiveLock' AND granted"
+        " AND database = (SELECT oid FROM pg_database WHERE datname = current_database())"
+        f" AND relation IN ({tables}) AND pid IS DISTINCT FROM pg_backend_pid()"
+        " UNION SELECT 'x' || xid FROM"
+        " (SELECT pg_snapshot_xip(pg_current_snapshot())::text AS xid) AS snapshot_xip"
+        " WHERE xid NOT IN (SELECT backend_xid::text FROM pg_stat_activity"
+        " WHERE backend_xid IS NOT NULL)"
+        " AND xid NOT IN (SELECT transaction::text FROM pg_prepared_xacts)"
+        " ORDER BY 1)"
+    )
+
+
+def read_data_revision(db_session: Session) -> str:
+    """Identify the data visible to the current snapshot, without locking.
+
+    The bulk revision covers bulk rewrites that may reuse ids, the maxima cover
+    appends and re-marked types. A transaction still in flight may already hold
+    ids below the maxima, so on PostgreSQL the transactions writing these
+    tables when the revision is read are part of it too. Transactions that
+    start later draw larger ids, so equal revisions mean the same data without
+    locking any table; transactions of other tables or databases leave the
+    revision alone. Reading everything in one statement keeps it within one
+    snapshot.
+    """
+    columns = [
+        select(DataRevision.bulk_revision).where(DataRevision.id == 1).scalar_subquery(),
+        select(func.max(HistoryLog.id)).scalar_subquery(),
+        select(func.max(MiniatureType.change_seq)).scalar_subquery(),
+    ]
+    if db_session.get_bind().dialect.name == "postgresql":
+        columns.append(literal_column(_in_flight_writers_sql()))
+    bulk_revision, history_id, change_seq, *in_flight = db_session.execute(select(*columns)).one()
+    watermarks = DeltaToken(history_id=history_id or 0, change_seq=change_seq or 0)
+    revision = f"{bulk_revision or 0}:{watermarks}"
+    if in_flight and in_flight[0]:
+        digest = hashlib.sha256(",".join(in_flight[0]).encode()).hexdigest()
+        revision += f":{digest[:_IN_PROGRESS_DIGEST_LENGTH]}"
+    return revision
+
+
+def delta_type_criteria(since: DeltaToken, until: DeltaToken) -> ColumnElement[bool]:
+    """Types re-marked in the window or with history appended in it."""
+    touched_by_history = select(HistoryLog.type_id).where(*delta_history_criteria(since, until))
+    return MiniatureType.change_seq.between(since.change_seq + 1, until.change_seq) | (
+        MiniatureType.id.in_(touched_by_history)
+    )
+
+
+def delta_history_criteria(since: DeltaToken, until: DeltaToken) -> tuple[ColumnElement[bool], ...]:
+    return (HistoryLog.id > since.history_id, HistoryLog.id <= until.history_id)
+
+
+def mark_types_changed(db_session: Session, type_ids: Collection[int]) -> None:
+    """Draw fresh change markers for types whose counts were rewritten.
+
+    Call it before appending the types' history to keep the lock order
+    ``read_delta_watermarks`` relies on.
+    """
+    if not type_ids:
+        return
+    if db_session.get_bind().dialect.name == "postgresql":
+        next_marker = func.nextval("miniature_types_change_seq")
+    else:
+        # SQLite serializes writers, so MAX() + 1 is as good as a sequence there.
+        next_marker = select(
+            func.coalesce(func.max(MiniatureType.change_seq), 0) + 1
+        ).scalar_subquery()
+    db_session.execute(
+        update(MiniatureType)
+        .where(MiniatureType.id.in_(sorted(type_ids)))
+        .values(change_seq=next_marker)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def check_delta_chain(db_session: Session, since: DeltaToken, token: DeltaToken) -> bool:
+    """Lock the applied-token row and check that the payload continues it.
+
+    Returns ``False`` when ``token`` is already applied so retries are no-ops.
+    """
+    applied_token = db_session.execute(
+        select(DataRevision.applied_delta_token).where(DataRevision.id == 1).with_for_update()
+    ).scalar_one_or_none()
+    applied = DeltaToken.parse(applied_token) if applied_token else INITIAL_DELTA_TOKEN
+    if applied == token and token != since:
+        return False
+    if applied != since:
+        raise ApiContractError(
+            code=ErrorCode.ERR_INVALID_IMPORT_FORMAT,
+            message=f"Delta starts at {since} but the last applied delta ends at {applied}.",
+        )
+    return True
+
+
+def store_applied_delta_token(db_session: Session, token: DeltaToken) -> None:
+    db_session.execute(
+        update(DataRevision).where(DataRevision.id == 1).values(applied_delta_token=str(token))
+    )
+
+
+def bump_bulk_revision(db_session: Session, *, reset_delta_chain: bool = False) -> None:
+    """Invalidate data revisions; ``reset_delta_chain`` also forgets the applied delta."""
+    values: dict[str, object] = {"bulk_revision": DataRevision.bulk_revision + 1}
+    if reset_delta_chain:
+        values["applied_delta_token"] = None
+    db_session.execute(update(DataRevision).where(DataRevision.id == 1).values(**values))
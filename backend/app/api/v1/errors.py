@@ -7,6 +7,7 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 
 from app.api.v1.schemas import ErrorResponse
+from app.metrics import API_CONTRACT_ERRORS
 
 
 class ErrorCode(StrEnum):
@@ -28,6 +29,7 @@ class ApiContractError(Exception):
 def register_api_exception_handlers(app) -> None:
     @app.exception_handler(ApiContractError)
     async def handle_api_contract_error(_request: Request, exc: ApiContractError) -> JSONResponse:
+        API_CONTRACT_ERRORS.labels(exc.code.value).inc()
         payload = ErrorResponse(code=exc.code.value, message=exc.message)
         return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=payload.model_dump())
 
@@ -35,6 +37,7 @@ def register_api_exception_handlers(app) -> None:
     async def handle_request_validation_error(
         _request: Request, _exc: RequestValidationError
     ) -> JSONResponse:
+        API_CONTRACT_ERRORS.labels(ErrorCode.ERR_VALIDATION.value).inc()
         payload = ErrorResponse(
             code=ErrorCode.ERR_VALIDATION.value,
             message="Request validation failed.",
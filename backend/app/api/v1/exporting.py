@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Final
+
+from pydantic_core import to_json
+from sqlalchemy import ColumnElement, Select, Subquery, and_, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models import HistoryLog, MiniatureType, StageCount
+from app.domain.stages import STAGE_COUNT_FIELD_BY_STAGE, StageCode
+
+EXPORT_STREAM_YIELD_PER: Final[int] = 2_000
+EXPORT_STREAM_CHUNK_BYTES: Final[int] = 64 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class ExportFilter:
+    """Subset of the data an export covers; the default covers everything.
+
+    ``history_from`` is inclusive and ``history_to`` exclusive. Name prefixes
+    are matched with ``LIKE 'prefix%'``, which PostgreSQL serves from
+    ``ix_miniature_types_name_pattern``; history windows use
+    ``ix_history_logs_type_id_created_at``.
+    """
+
+    type_ids: tuple[int, ...] = ()
+    name_prefix: str | None = None
+    history_from: datetime | None = None
+    history_to: datetime | None = None
+
+    def type_criteria(self) -> tuple[ColumnElement[bool], ...]:
+        criteria: list[ColumnElement[bool]] = []
+        if self.type_ids:
+            criteria.append(MiniatureType.id.in_(self.type_ids))
+        if self.name_prefix is not None:
+            escaped_prefix = (
+                self.name_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            )
+            criteria.append(MiniatureType.name.like(f"{escaped_prefix}%", escape="\\"))
+        return tuple(criteria)
+
+    def history_window_criteria(self) -> tuple[ColumnElement[bool], ...]:
+        criteria: list[ColumnElement[bool]] = []
+        if self.history_from is not None:
+            criteria.append(HistoryLog.created_at >= self.history_from)
+        if self.history_to is not None:
+            criteria.append(HistoryLog.created_at < self.history_to)
+        return tuple(criteria)
+
+    def history_criteria(self) -> tuple[ColumnElement[bool], ...]:
+        """Criteria for history queries that do not join ``miniature_types``."""
+        type_criteria = self.type_criteria()
+        if not type_criteria:
+            return self.history_window_criteria()
+        selected_type_ids = select(MiniatureType.id).where(*type_criteria)
+        return (HistoryLog.type_id.in_(selected_type_ids), *self.history_window_criteria())
+
+
+ALL_DATA: Final[ExportFilter] = ExportFilter()
+
+
+def format_export_timestamp(value: datetime) -> str:
+    """Render a timestamp exactly like the Pydantic-serialized JSON export does."""
+    return to_json(value).decode()[1:-1]
+
+
+def _dump_json(value: object) -> str:
+    # Same serializer as the ``ExportResponse`` body, so both formats agree byte for byte.
+    return to_json(value).decode()
+
+
+def build_type_counts_subquery() -> Subquery:
+    """Stage counts pivoted into one row per type, one column per stage field."""
+    return (
+        select(
+            StageCount.type_id,
+            *[
+                func.coalesce(
+                    func.sum(StageCount.count).filter(StageCount.stage_name == stage.value), 0
+                ).label(field_name)
+                for stage, field_name in STAGE_COUNT_FIELD_BY_STAGE.items()
+            ],
+        )
+        .group_by(StageCount.type_id)
+        .subquery("type_counts")
+    )
+
+
+def build_export_stream_statement(export_filter: ExportFilter = ALL_DATA) -> Select:
+    """One ordered statement joining every type with its counts and full history.
+
+    Types come out by name (unique, hence deterministic) and each type's
+    history by ``created_at, id``, which lets PostgreSQL walk the name index and
+    ``ix_history_logs_type_id_created_at`` instead of sorting the whole log.
+    """
+    counts = build_type_counts_subquery()
+    return (
+        select(
+            MiniatureType.id,
+            MiniatureType.name,
+            *[counts.c[field_name] for field_name in STAGE_COUNT_FIELD_BY_STAGE.values()],
+            HistoryLog.from_stage,
+            HistoryLog.to_stage,
+            HistoryLog.qty,
+            HistoryLog.created_at,
+        )
+        .select_from(MiniatureType)
+        .join(counts, counts.c.type_id == MiniatureType.id)
+        .outerjoin(
+            HistoryLog,
+            and_(HistoryLog.type_id == MiniatureType.id, *export_filter.history_window_criteria()),
+        )
+        .where(*export_filter.type_criteria())
+        .order_by(MiniatureType.name.asc(), HistoryLog.created_at.asc(), HistoryLog.id.asc())
+    )
+
+
+def _render_ndjson_line_head(name: str, counts: tuple[int, ...]) -> str:
+    stage_counts = [
+        {"stage": stage.value, "count": count}
+        for stage, count in zip(StageCode, counts, strict=True)
+    ]
+    return f'{{"name":{_dump_json(name)},"stage_counts":{_dump_json(stage_counts)},"history":['
+
+
+def _render_ndjson_history_item(
+    from_stage: str, to_stage: str, qty: int, created_at: datetime
+) -> str:
+    return _dump_json(
+        {"from_stage": from_stage, "to_stage": to_stage, "qty": qty, "created_at": created_at}
+    )
+
+
+def iter_ndjson_chunks(
+    db_session: Session, export_filter: ExportFilter = ALL_DATA
+) -> Iterator[tuple[bytes, int]]:
+    """Render the NDJSON export from an open session.
+
+    Yields each chunk together with the number of types completed so far, so
+    callers writing to disk can report progress.
+    """
+    stage_count = len(StageCode)
+    result = db_session.execute(
+        build_export_stream_statement(export_filter).execution_options(
+            yield_per=EXPORT_STREAM_YIELD_PER
+        )
+    )
+
+    pending: list[str] = []
+    pending_size = 0
+    completed_types = 0
+    current_type_id: int | None = None
+    has_history = False
+
+    for row in result:
+        type_id, name = row[0], row[1]
+        if type_id != current_type_id:
+            head = _render_ndjson_line_head(name, tuple(row[2 : 2 + stage_count]))
+            if current_type_id is not None:
+                head = "]}\n" + head
+                completed_types += 1
+            pending.append(head)
+            pending_size += len(head)
+            current_type_id = type_id
+            has_history = False
+
+        from_stage, to_stage, qty, created_at = row[2 + stage_count :]
+        if from_stage is not None:
+            item = _render_ndjson_history_item(from_stage, to_stage, qty, created_at)
+            if has_history:
+                item = "," + item
+            pending.append(item)
+            pending_size += len(item)
+            has_history = True
+
+        if pending_size >= EXPORT_STREAM_CHUNK_BYTES:
+            yield "".join(pending).encode(), completed_types
+            pending.clear()
+            pending_size = 0
+
+    if current_type_id is not None:
+        pending.append("]}\n")
+        completed_types += 1
+    if pending:
+        yield "".join(pending).encode(), completed_types
+
+
+def iter_ndjson_export(
+    session_factory: sessionmaker[Session], export_filter: ExportFilter = ALL_DATA
+) -> Iterator[bytes]:
+    """Stream the export as one JSON object per type, each on its own line.
+
+    Rows arrive through a server-side cursor and are written out in
+    ``EXPORT_STREAM_CHUNK_BYTES`` pieces, so memory does not grow with the
+    number of types or history events.
+    """
+    with session_factory() as db_session:
+        for chunk, _completed_types in iter_ndjson_chunks(db_session, export_filter):
+            yield chunk
+
+
+def iter_json_export(
+    session_factory: sessionmaker[Session], export_filter: ExportFilter = ALL_DATA
+) -> Iterator[bytes]:
+    """Stream the ``{"types": [...]}`` JSON export in NDJSON-sized chunks.
+
+    The NDJSON lines are the body's type items and their line ends are the
+    only raw newlines, so turning those into commas yields the array; the
+    chunk after the last line end is held back to drop its trailing comma.
+    """
+    yield b'{"types":['
+    held_back = b""
+    for chunk in iter_ndjson_export(session_factory, export_filter):
+        if held_back:
+            yield held_back
+        held_back = chunk.replace(b"\n", b",")
+    yield held_back.removesuffix(b",") + b"]}"
@@ -0,0 +1,903 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import zlib
+from collections import Counter
+from collections.abc import Callable, Collection, Iterable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import UTC, datetime
+from typing import Any, Final, Protocol
+
+import ijson
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import (
+    Index,
+    Integer,
+    String,
+    bindparam,
+    column,
+    delete,
+    insert,
+    select,
+    text,
+    update,
+    values,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine, TwoPhaseTransaction
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.api.v1.delta import (
+    DeltaToken,
+    bump_bulk_revision,
+    check_delta_chain,
+    hold_import_lock,
+    mark_types_changed,
+    store_applied_delta_token,
+)
+from app.api.v1.errors import ApiContractError, ErrorCode
+from app.api.v1.schemas import (
+    IMPORT_MAX_TYPES,
+    DeltaImportRequest,
+    ImportMode,
+    ImportRequest,
+    ImportTypeItem,
+)
+from app.db.models import (
+    ConsistencyCheckState,
+    HistoryLog,
+    MiniatureType,
+    StageCount,
+    StageCountAdjustment,
+)
+from app.db.session import hold_write_lock
+from app.domain.stages import StageCode
+
+logger = logging.getLogger(__name__)
+
+IMPORT_PARSE_BUFFER_BYTES: Final[int] = 64 * 1024
+HISTORY_INSERT_BATCH_ROWS: Final[int] = 10_000
+IMPORT_CHUNK_HISTORY_ROWS: Final[int] = 50_000
+HISTORY_COPY_COLUMNS: Final[tuple[str, ...]] = (
+    "type_id",
+    "from_stage",
+    "to_stage",
+    "qty",
+    "created_at",
+)
+_ENVELOPE_FIELDS_BY_MODE: Final[dict[ImportMode, frozenset[str]]] = {
+    ImportMode.MERGE: frozenset(),
+    ImportMode.DELTA: frozenset({"since", "token"}),
+    ImportMode.IDEMPOTENT: frozenset(),
+    ImportMode.REPLACE: frozenset(),
+}
+# Rebuilt once after a replace import instead of being maintained row by row.
+_REPLACE_DEFERRED_INDEX_NAME: Final[str] = "ix_history_logs_type_id_created_at"
+_ANALYZED_TABLES: Final[tuple[str, ...]] = ("miniature_types", "stage_counts", "history_logs")
+_CONTAINER_START_EVENTS: Final[frozenset[str]] = frozenset({"start_map", "start_array"})
+_CONTAINER_END_EVENTS: Final[frozenset[str]] = frozenset({"end_map", "end_array"})
+# Worker transactions of a parallel import are prepared as
+# "<prefix>:<coordinator txid>:<worker index>".
+_PREPARED_IMPORT_XID_PREFIX: Final[str] = "parallel-import"
+
+
+class SupportsRead(Protocol):
+    def read(self, size: int, /) -> bytes: ...
+
+
+def _request_validation_error() -> ApiContractError:
+    return ApiContractError(
+        code=ErrorCode.ERR_VALIDATION,
+        message="Request validation failed.",
+    )
+
+
+def _invalid_import_error() -> ApiContractError:
+    return ApiContractError(
+        code=ErrorCode.ERR_INVALID_IMPORT_FORMAT,
+        message="Import payload is invalid.",
+    )
+
+
+class ImportStream:
+    """An import body parsed incrementally, one ``types`` item at a time.
+
+    Only the item being parsed is held in memory, so the body size is bounded
+    by the byte limit of ``body`` rather than by memory. Errors keep the
+    contract of a whole-body parse: malformed JSON is ``ERR_VALIDATION`` and
+    a schema violation is ``ERR_INVALID_IMPORT_FORMAT``, but they surface
+    when the parser reaches them, after earlier items have been yielded.
+    """
+
+    def __init__(self, body: SupportsRead, mode: ImportMode) -> None:
+        self._events = ijson.basic_parse(body, buf_size=IMPORT_PARSE_BUFFER_BYTES, use_float=True)
+        self._mode = mode
+        self._envelope: dict[str, object] = {}
+        self._has_types = False
+        self._finished = False
+        # Type items and history events read so far, for throughput metrics.
+        self.type_count = 0
+        self.history_row_count = 0
+
+    def _next_event(self) -> tuple[str, Any]:
+        try:
+            return next(self._events)
+        except (StopIteration, ijson.JSONError, UnicodeDecodeError) as error:
+            raise _request_validation_error() from error
+
+    def _build_value(self, event: str, value: Any) -> object:
+        if event not in _CONTAINER_START_EVENTS:
+            return value
+        builder = ijson.ObjectBuilder()
+        builder.event(event, value)
+        depth = 1
+        while depth:
+            event, value = self._next_event()
+            builder.event(event, value)
+            if event in _CONTAINER_START_EVENTS:
+                depth += 1
+            elif event in _CONTAINER_END_EVENTS:
+                depth -= 1
+        return builder.value
+
+    def _iter_type_items(self) -> Iterator[ImportTypeItem]:
+        event, _value = self._next_event()
+        if event != "start_array":
+            raise _invalid_import_error()
+
+        while True:
+            event, value = self._next_event()
+            if event == "end_array":
+                return
+            self.type_count += 1
+            if self.type_count > IMPORT_MAX_TYPES:
+                raise _invalid_import_error()
+            raw_item = self._build_value(event, value)
+            try:
+                type_item = ImportTypeItem.model_validate(raw_item)
+            except ValidationError as error:
+                raise _invalid_import_error() from error
+            self.history_row_count += len(type_item.history)
+            yield type_item
+
+    def _check_end_of_body(self) -> None:
+        try:
+            next(self._events)
+        except StopIteration:
+            return
+        except (ijson.JSONError, UnicodeDecodeError) as error:
+            raise _request_validation_error() from error
+        raise _request_validation_error()
+
+    def iter_types(self) -> Iterator[ImportTypeItem]:
+        """Yield validated ``types`` items in body order, then read the rest of the body."""
+        event, _value = self._next_event()
+        if event != "start_map":
+            raise _request_validation_error()
+
+        while True:
+            event, key = self._next_event()
+            if event == "end_map":
+                break
+            if key == "types" and not self._has_types:
+                self._has_types = True
+                yield from self._iter_type_items()
+            elif key in _ENVELOPE_FIELDS_BY_MODE[self._mode] and key not in self._envelope:
+                self._envelope[key] = self._build_value(*self._next_event())
+            else:
+                # Unknown or repeated fields are rejected before their value
+                # is read, so they cannot make the parser buffer anything.
+                raise _invalid_import_error()
+
+        self._check_end_of_body()
+        self._finished = True
+
+    def read_envelope(self) -> ImportRequest:
+        """Validate the top-level fields once ``iter_types`` is exhausted.
+
+        The returned request carries every field except ``types``, which is
+        left empty because the items have already been consumed.
+        """
+        if not self._finished:
+            raise RuntimeError("The import body has not been read to the end.")
+        payload_model = DeltaImportRequest if self._mode == ImportMode.DELTA else ImportRequest
+        raw_envelope = dict(self._envelope)
+        if self._has_types:
+            raw_envelope["types"] = []
+        try:
+            return payload_model.model_validate(raw_envelope)
+        except ValidationError as error:
+            raise _invalid_import_error() from error
+
+
+HistoryRow = tuple[int, str, str, int, datetime]
+
+
+def _import_history_rows(type_id: int, type_item: ImportTypeItem) -> Iterator[HistoryRow]:
+    for history_item in type_item.history:
+        yield (
+            type_id,
+            history_item.from_stage.value,
+            history_item.to_stage.value,
+            history_item.qty,
+            history_item.created_at,
+        )
+
+
+def insert_history_rows(db_session: Session, rows: Iterable[HistoryRow]) -> int:
+    """Append history rows in bulk, bypassing the ORM unit of work.
+
+    PostgreSQL gets one ``COPY ... FROM STDIN`` on the session's connection;
+    other databases get batched ``executemany`` inserts. Nothing is added to
+    the identity map, so pending ORM changes are unaffected.
+    """
+    if db_session.get_bind().dialect.name == "postgresql":
+        cursor = db_session.connection().connection.driver_connection.cursor()
+        copy_sql = f"COPY history_logs ({', '.join(HISTORY_COPY_COLUMNS)}) FROM STDIN"
+        with cursor:
+            with cursor.copy(copy_sql) as copy:
+                for row in rows:
+                    copy.write_row(row)
+            return cursor.rowcount
+
+    inserted_rows = 0
+    batch: list[dict[str, object]] = []
+    for row in rows:
+        batch.append(dict(zip(HISTORY_COPY_COLUMNS, row, strict=True)))
+        if len(batch) >= HISTORY_INSERT_BATCH_ROWS:
+            db_session.execute(insert(HistoryLog), batch)
+            inserted_rows += len(batch)
+            batch = []
+    if batch:
+        db_session.execute(insert(HistoryLog), batch)
+        inserted_rows += len(batch)
+    return inserted_rows
+
+
+def _dialect_insert(db_session: Session) -> Callable[..., Any]:
+    if db_session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+
+def history_event_hashes(type_id: int, type_item: ImportTypeItem) -> list[bytes]:
+    """Content hashes of the history events of ``type_item``, in body order.
+
+    A hash covers the type, stages, quantity, creation time (in UTC) and the
+    ordinal of the event among identical ones in the item, so an event hashes
+    the same on every re-import while genuinely repeated events stay distinct.
+    """
+    ordinals: Counter[tuple[str, str, int, str]] = Counter()
+    event_hashes: list[bytes] = []
+    for history_item in type_item.history:
+        created_at = history_item.created_at
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=UTC)
+        event = (
+            history_item.from_stage.value,
+            history_item.to_stage.value,
+            history_item.qty,
+            created_at.astimezone(UTC).isoformat(),
+        )
+        key = "\x1f".join(str(part) for part in (type_id, *event, ordinals[event]))
+        ordinals[event] += 1
+        event_hashes.append(hashlib.sha256(key.encode()).digest())
+    return event_hashes
+
+
+def insert_new_history_rows(
+    db_session: Session, rows: Iterable[tuple[HistoryRow, bytes]]
+) -> set[bytes]:
+    """Append hashed history rows, skipping events whose hash is already stored.
+
+    Rows go in batched ``INSERT ... ON CONFLICT DO NOTHING RETURNING``
+    statements; the hashes of the rows actually inserted are returned.
+    """
+    statement = (
+        _dialect_insert(db_session)(HistoryLog)
+        .on_conflict_do_nothing(
+            index_elements=[HistoryLog.event_hash],
+            index_where=HistoryLog.event_hash.is_not(None),
+        )
+        .returning(HistoryLog.event_hash)
+    )
+    inserted_hashes: set[bytes] = set()
+    batch: list[dict[str, object]] = []
+    for row, event_hash in rows:
+        batch.append(
+            {**dict(zip(HISTORY_COPY_COLUMNS, row, strict=True)), "event_hash": event_hash}
+        )
+        if len(batch) >= HISTORY_INSERT_BATCH_ROWS:
+            inserted_hashes.update(db_session.execute(statement, batch).scalars())
+            batch = []
+    if batch:
+        inserted_hashes.update(db_session.execute(statement, batch).scalars())
+    return inserted_hashes
+
+
+def resolve_import_types(
+    db_session: Session, names: Iterable[str]
+) -> tuple[dict[str, int], set[str]]:
+    """Map type names to ids, creating the missing types.
+
+    One ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` creates the new types
+    and one ``SELECT`` finds the rest. Names go in sorted order, so concurrent
+    imports wait on each other instead of deadlocking on the unique index.
+    The names of the types created here are returned alongside the mapping.
+    """
+    unique_names = sorted(set(names))
+    if not unique_names:
+        return {}, set()
+    created = db_session.execute(
+        _dialect_insert(db_session)(MiniatureType)
+        .values([{"name": name} for name in unique_names])
+        .on_conflict_do_nothing(index_elements=[MiniatureType.name])
+        .returning(MiniatureType.name, MiniatureType.id)
+    )
+    type_id_by_name: dict[str, int] = {name: type_id for name, type_id in created}
+    created_names = set(type_id_by_name)
+    existing_names = [name for name in unique_names if name not in type_id_by_name]
+    if existing_names:
+        existing = db_session.execute(
+            select(MiniatureType.name, MiniatureType.id).where(
+                MiniatureType.name.in_(existing_names)
+            )
+        )
+        type_id_by_name.update((name, type_id) for name, type_id in existing)
+    return type_id_by_name, created_names
+
+
+def _backdate_created_types(
+    db_session: Session,
+    type_items: Iterable[ImportTypeItem],
+    type_id_by_name: dict[str, int],
+    created_names: Collection[str],
+) -> None:
+    """Move types created by an import back to their earliest imported history row.
+
+    A type then shows up in ``as_of`` queries from its first event rather than
+    from the import. Types without history, or whose history only starts
+    later, keep the insert time.
+    """
+    earliest_by_type_id: dict[int, datetime] = {}
+    for type_item in type_items:
+        if type_item.name not in created_names:
+            continue
+        type_id = type_id_by_name[type_item.name]
+        for history_item in type_item.history:
+            created_at = history_item.created_at
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=UTC)
+            earliest = earliest_by_type_id.get(type_id)
+            if earliest is None or created_at < earliest:
+                earliest_by_type_id[type_id] = created_at
+    if not earliest_by_type_id:
+        return
+    types_table = MiniatureType.__table__
+    db_session.execute(
+        update(types_table)
+        .where(
+            types_table.c.id == bindparam("row_type_id"),
+            types_table.c.created_at > bindparam("row_created_at"),
+        )
+        .values(created_at=bindparam("row_created_at")),
+        [
+            {"row_type_id": type_id, "row_created_at": created_at}
+            for type_id, created_at in earliest_by_type_id.items()
+        ],
+    )
+
+
+def lock_stage_counts(db_session: Session, type_ids: Collection[int]) -> dict[int, dict[str, int]]:
+    """Lock the stage count rows of ``type_ids`` in one ordered statement."""
+    rows = db_session.execute(
+        select(StageCount.type_id, StageCount.stage_name, StageCount.count)
+        .where(StageCount.type_id.in_(sorted(type_ids)))
+        .order_by(StageCount.type_id, StageCount.stage_name)
+        .with_for_update()
+    )
+    counts_by_type: dict[int, dict[str, int]] = {type_id: {} for type_id in type_ids}
+    for type_id, stage_name, count in rows:
+        counts_by_type[type_id][stage_name] = count
+    for counts in counts_by_type.values():
+        if len(counts) != len(StageCode):
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Stage counts are not initialized for this type.",
+            )
+    return counts_by_type
+
+
+def write_stage_counts(db_session: Session, counts_by_type: dict[int, dict[str, int]]) -> None:
+    """Store the counts of already locked rows with a single statement."""
+    new_counts = [
+        (type_id, stage_name, count)
+        for type_id, counts in counts_by_type.items()
+        for stage_name, count in counts.items()
+    ]
+    if not new_counts:
+        return
+    if db_session.get_bind().dialect.name == "postgresql":
+        new_counts_table = values(
+            column("type_id", Integer),
+            column("stage_name", String),
+            column("count", Integer),
+            name="new_counts",
+        ).data(new_counts)
+        db_session.execute(
+            update(StageCount)
+            .where(
+                StageCount.type_id == new_counts_table.c.type_id,
+                StageCount.stage_name == new_counts_table.c.stage_name,
+            )
+            .values(count=new_counts_table.c.count)
+            .execution_options(synchronize_session=False)
+        )
+        return
+
+    # SQLite cannot name the columns of a VALUES list, so it gets executemany.
+    stage_counts = StageCount.__table__
+    db_session.execute(
+        update(stage_counts)
+        .where(
+            stage_counts.c.type_id == bindparam("row_type_id"),
+            stage_counts.c.stage_name == bindparam("row_stage_name"),
+        )
+        .values(count=bindparam("row_count")),
+        [
+            {"row_type_id": type_id, "row_stage_name": stage_name, "row_count": count}
+            for type_id, stage_name, count in new_counts
+        ],
+    )
+
+
+def _apply_new_history_flow(
+    counts: dict[str, int],
+    type_item: ImportTypeItem,
+    event_hashes: Sequence[bytes],
+    new_event_hashes: set[bytes],
+) -> bool:
+    # Each inserted event moves its quantity once, even if the body repeats it.
+    applied = False
+    for history_item, event_hash in zip(type_item.history, event_hashes, strict=True):
+        if event_hash in new_event_hashes:
+            new_event_hashes.discard(event_hash)
+            counts[history_item.from_stage.value] -= history_item.qty
+            counts[history_item.to_stage.value] += history_item.qty
+            applied = True
+    return applied
+
+
+def apply_import_chunk(
+    db_session: Session,
+    type_items: Sequence[ImportTypeItem],
+    mode: ImportMode,
+    *,
+    take_import_lock: bool = True,
+) -> None:
+    """Apply a run of import items with a fixed number of statements.
+
+    ``MERGE`` adds the item counts to the current ones and ``DELTA`` replaces
+    them. ``IDEMPOTENT`` stores history under content hashes and moves the
+    counts of existing types only by the flow of events not stored before, so
+    a re-import is a no-op; a type it creates takes the item counts as they are.
+    Items repeating a name apply in body order, as separate imports would.
+    Workers of a parallel import skip the import lock their coordinator holds.
+    """
+    if not type_items:
+        return
+    if take_import_lock:
+        hold_import_lock(db_session)
+    type_id_by_name, created_names = resolve_import_types(
+        db_session, (item.name for item in type_items)
+    )
+    created_type_ids = [type_id_by_name[name] for name in created_names]
+    _backdate_created_types(db_session, type_items, type_id_by_name, created_names)
+    counts_by_type = lock_stage_counts(db_session, type_id_by_name.values())
+
+    hashes_by_item: list[list[bytes]] = []
+    new_event_hashes: set[bytes] = set()
+    if mode == ImportMode.IDEMPOTENT:
+        # Counts depend on which events are new, so history goes in first;
+        # the type insert above already took miniature_types before history_logs.
+        hashes_by_item = [
+            history_event_hashes(type_id_by_name[type_item.name], type_item)
+            for type_item in type_items
+        ]
+        new_event_hashes = insert_new_history_rows(
+            db_session,
+            (
+                hashed_row
+                for type_item, event_hashes in zip(type_items, hashes_by_item, strict=True)
+                for hashed_row in zip(
+                    _import_history_rows(type_id_by_name[type_item.name], type_item),
+                    event_hashes,
+                    strict=True,
+                )
+            ),
+        )
+
+    changed_type_ids: set[int] = set()
+    adjustments: list[dict[str, object]] = []
+    for index, type_item in enumerate(type_items):
+        type_id = type_id_by_name[type_item.name]
+        counts = counts_by_type[type_id]
+        if mode == ImportMode.IDEMPOTENT:
+            if type_item.name not in created_names:
+                if _apply_new_history_flow(
+                    counts, type_item, hashes_by_item[index], new_event_hashes
+                ):
+                    changed_type_ids.add(type_id)
+                continue
+            # The first item of a created type applies like a merge into zeros.
+            created_names.discard(type_item.name)
+            new_event_hashes.difference_update(hashes_by_item[index])
+
+        changed_type_ids.add(type_id)
+        adjustment_by_stage: dict[str, int] = {}
+        for stage_count in type_item.stage_counts:
+            stage_name = stage_count.stage.value
+            new_count = stage_count.count
+            if mode != ImportMode.DELTA:
+                new_count += counts[stage_name]
+            adjustment_by_stage[stage_name] = new_count - counts[stage_name]
+            counts[stage_name] = new_count
+
+        # Imported history is accounted for by its own net flow; only the part
+        # of the count changes it does not explain goes to the adjustment ledger.
+        for history_item in type_item.history:
+            adjustment_by_stage[history_item.to_stage.value] -= history_item.qty
+            adjustment_by_stage[history_item.from_stage.value] += history_item.qty
+        adjustments.extend(
+            {"type_id": type_id, "stage_name": stage_name, "delta": delta}
+            for stage_name, delta in adjustment_by_stage.items()
+            if delta
+        )
+
+    # Types an idempotent import leaves untouched keep their counts and markers,
+    # so a re-import does not show up in delta exports.
+    write_stage_counts(
+        db_session, {type_id: counts_by_type[type_id] for type_id in changed_type_ids}
+    )
+    if adjustments:
+        db_session.execute(insert(StageCountAdjustment), adjustments)
+        if created_type_ids:
+            # The counts a created type starts with date from its creation, so
+            # replaying its history and ledger up to any later time adds up.
+            db_session.execute(
+                update(StageCountAdjustment)
+                .where(StageCountAdjustment.type_id.in_(created_type_ids))
+                .values(
+                    created_at=select(MiniatureType.created_at)
+                    .where(MiniatureType.id == StageCountAdjustment.type_id)
+                    .scalar_subquery()
+                )
+                .execution_options(synchronize_session=False)
+            )
+    mark_types_changed(db_session, changed_type_ids)
+    if mode != ImportMode.IDEMPOTENT and any(type_item.history for type_item in type_items):
+        insert_history_rows(
+            db_session,
+            (
+                row
+                for type_item in type_items
+                for row in _import_history_rows(type_id_by_name[type_item.name], type_item)
+            ),
+        )
+
+
+ChunkCallback = Callable[[Sequence[ImportTypeItem]], None]
+
+
+def _iter_import_chunks(import_stream: ImportStream) -> Iterator[list[ImportTypeItem]]:
+    chunk: list[ImportTypeItem] = []
+    chunk_history_rows = 0
+    for type_item in import_stream.iter_types():
+        chunk.append(type_item)
+        chunk_history_rows += len(type_item.history)
+        if chunk_history_rows >= IMPORT_CHUNK_HISTORY_ROWS:
+            yield chunk
+            chunk, chunk_history_rows = [], 0
+    if chunk:
+        yield chunk
+
+
+def apply_import_stream(
+    db_session: Session,
+    import_stream: ImportStream,
+    mode: ImportMode,
+    on_chunk: ChunkCallback | None = None,
+) -> None:
+    """Apply every item of ``import_stream``, calling ``on_chunk`` after each chunk.
+
+    Chunks are bounded by their history size; a typical import fits one chunk
+    and so locks all its stage counts in one ordered statement.
+    """
+    for chunk in _iter_import_chunks(import_stream):
+        apply_import_chunk(db_session, chunk, mode)
+        if on_chunk is not None:
+            on_chunk(chunk)
+
+
+def apply_merge_import(
+    db_session: Session,
+    import_stream: ImportStream,
+    on_chunk: ChunkCallback | None = None,
+    *,
+    mode: ImportMode = ImportMode.MERGE,
+) -> None:
+    """Apply a ``MERGE`` or ``IDEMPOTENT`` import, which add to the current state."""
+    apply_import_stream(db_session, import_stream, mode, on_chunk)
+    import_stream.read_envelope()
+    bump_bulk_revision(db_session)
+
+
+def _clear_type_tables(db_session: Session) -> None:
+    types_table = MiniatureType.__table__
+    # The consistency verifier's running totals go with the history, and
+    # SQLite may hand out the deleted ids again, so its marks restart at 0.
+    db_session.execute(
+        update(ConsistencyCheckState).values(
+            totals_history_mark=0,
+            totals_adjustment_mark=0,
+            pending_history_mark=0,
+            pending_adjustment_mark=0,
+            pending_xmax=0,
+        )
+    )
+    if db_session.get_bind().dialect.name == "postgresql":
+        # Cascades to stage counts, history, snapshots and the ledger. Ids keep
+        # growing, so delta tokens issued before the replace stay ordered.
+        db_session.execute(text(f"TRUNCATE {types_table.name} CASCADE"))
+        return
+    for table in reversed(types_table.metadata.sorted_tables):
+        if any(foreign_key.references(types_table) for foreign_key in table.foreign_keys):
+            db_session.execute(delete(table))
+    db_session.execute(delete(types_table))
+
+
+def _deferred_history_index() -> Index:
+    return next(
+        index
+        for index in HistoryLog.__table__.indexes
+        if index.name == _REPLACE_DEFERRED_INDEX_NAME
+    )
+
+
+def apply_replace_import(
+    db_session: Session, import_stream: ImportStream, on_chunk: ChunkCallback | None = None
+) -> None:
+    """Replace all types, counts and history with the import body.
+
+    The type tables are truncated and the body is loaded with the set-based
+    chunk path; the history index on ``(type_id, created_at)`` is dropped for
+    the load and built once at the end. Everything happens in the caller's
+    transaction, so a failed replace leaves the previous data in place. Run
+    ``analyze_import_tables`` once it has committed.
+    """
+    # Nothing may queue behind the TRUNCATE, see hold_import_lock.
+    hold_import_lock(db_session, exclusive=True)
+    _clear_type_tables(db_session)
+    deferred_index = _deferred_history_index()
+    deferred_index.drop(db_session.connection())
+    apply_import_stream(db_session, import_stream, ImportMode.MERGE, on_chunk)
+    import_stream.read_envelope()
+    deferred_index.create(db_session.connection())
+    bump_bulk_revision(db_session, reset_delta_chain=True)
+
+
+def analyze_import_tables(db_session: Session) -> None:
+    """Refresh planner statistics after a replace import rewrote the type tables."""
+    if db_session.get_bind().dialect.name == "postgresql":
+        db_session.execute(text(f"ANALYZE {', '.join(_ANALYZED_TABLES)}"))
+        return
+    for table_name in _ANALYZED_TABLES:
+        db_session.execute(text(f"ANALYZE {table_name}"))
+
+
+def apply_delta_import(
+    db_session: Session, import_stream: ImportStream, on_chunk: ChunkCallback | None = None
+) -> bool:
+    """Apply a delta import; returns ``False`` when its token was already applied.
+
+    A delta carries absolute counts and only the history appended since
+    ``since``; the chain check makes sure no history is applied twice.
+    ``since`` and ``token`` may follow the types in the body, so the types
+    are applied in a savepoint and dropped again if the check says so.
+    """
+    with db_session.begin_nested() as applied_types:
+        apply_import_stream(db_session, import_stream, ImportMode.DELTA, on_chunk)
+        envelope = import_stream.read_envelope()
+        if not isinstance(envelope, DeltaImportRequest):
+            raise TypeError("A delta import envelope must be a DeltaImportRequest.")
+        token = DeltaToken.parse(envelope.token)
+        if not check_delta_chain(db_session, DeltaToken.parse(envelope.since), token):
+            applied_types.rollback()
+            return False
+    store_applied_delta_token(db_session, token)
+    bump_bulk_revision(db_session)
+    return True
+
+
+def import_worker_index(name: str, workers: int) -> int:
+    """Pin a type name to one worker of a parallel import."""
+    return zlib.crc32(name.encode()) % workers
+
+
+def _can_prepare_worker_transactions(db_session: Session, workers: int) -> bool:
+    if db_session.get_bind().dialect.name != "postgresql":
+        return False
+    capacity = db_session.execute(text("SHOW max_prepared_transactions")).scalar_one()
+    return int(capacity) >= workers
+
+
+def _finish_worker_transactions(connections: Sequence[Connection], *, commit: bool) -> None:
+    """Commit or roll back the worker transactions and close their connections.
+
+    Run it once the coordinator's transaction has ended. A worker transaction
+    that fails to finish is left prepared and handed to
+    ``resolve_prepared_imports``, which applies the coordinator's outcome.
+    """
+    unfinished = False
+    for connection in connections:
+        transaction = connection.get_transaction()
+        try:
+            if transaction is not None:
+                if commit:
+                    transaction.commit()
+                else:
+                    transaction.rollback()
+        except DBAPIError:
+            logger.exception("Could not finish a worker transaction of a parallel import")
+            # Closing would roll a prepared transaction back regardless of the outcome.
+            connection.invalidate()
+            unfinished = True
+        finally:
+            connection.close()
+    if unfinished and connections:
+        try:
+            resolve_prepared_imports(connections[0].engine)
+        except DBAPIError:
+            logger.exception("Prepared import transactions are left for the next startup")
+
+
+def _prepare_parallel_import(
+    db_session: Session,
+    import_stream: ImportStream,
+    mode: ImportMode,
+    workers: int,
+    connections: list[Connection],
+) -> None:
+    """Apply the body over ``workers`` connections and prepare their transactions.
+
+    Worker connections are appended to ``connections`` as they are opened, so
+    the caller can finish them whatever happens here.
+    """
+    hold_import_lock(db_session, exclusive=True)
+    coordinator_xid = db_session.execute(text("SELECT txid_current()")).scalar_one()
+    engine = db_session.get_bind()
+    transactions: list[TwoPhaseTransaction] = []
+    # One thread per worker keeps each session on a single thread and its
+    # chunks in body order.
+    executors = [
+        ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"import-worker-{index}")
+        for index in range(workers)
+    ]
+    try:
+        worker_sessions: list[Session] = []
+        for index in range(workers):
+            connection = engine.connect()
+            connections.append(connection)
+            transactions.append(
+                connection.begin_twophase(
+                    xid=f"{_PREPARED_IMPORT_XID_PREFIX}:{coordinator_xid}:{index}"
+                )
+            )
+            worker_sessions.append(Session(bind=connection, autoflush=False))
+
+        in_flight: list[Future[None]] = []
+        for chunk in _iter_import_chunks(import_stream):
+            for future in in_flight:
+                future.result()
+            shares: list[list[ImportTypeItem]] = [[] for _worker in range(workers)]
+            for type_item in chunk:
+                shares[import_worker_index(type_item.name, workers)].append(type_item)
+            in_flight = [
+                executors[index].submit(
+                    apply_import_chunk,
+                    worker_sessions[index],
+                    share,
+                    mode,
+                    take_import_lock=False,
+                )
+                for index, share in enumerate(shares)
+                if share
+            ]
+        for future in in_flight:
+            future.result()
+
+        import_stream.read_envelope()
+        bump_bulk_revision(db_session)
+        for transaction in transactions:
+            transaction.prepare()
+    finally:
+        for executor in executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def apply_parallel_import(
+    db_session: Session, import_stream: ImportStream, mode: ImportMode, workers: int
+) -> None:
+    """Apply and commit a ``MERGE`` or ``IDEMPOTENT`` import over ``workers`` connections.
+
+    Every type name is pinned to one worker, so workers lock disjoint rows,
+    each its share in sorted order, and items repeating a name keep body
+    order. While workers apply a chunk the next one is parsed. ``db_session``
+    holds the import lock exclusively, so no other import can wait on one
+    worker while holding rows another worker needs.
+
+    Worker transactions are committed in two phases: once the whole body is
+    applied every worker prepares its transaction, then ``db_session``
+    commits, and only then are the prepared transactions committed. Any
+    error before the coordinator's commit rolls all of them back. Its commit
+    decides the import: a worker transaction a crash leaves prepared is
+    committed or rolled back by ``resolve_prepared_imports`` accordingly.
+
+    This runs the transaction of ``db_session`` itself. Workers need
+    PostgreSQL with ``max_prepared_transactions`` of at least ``workers``;
+    otherwise, or for a single worker, the import is ``apply_merge_import``
+    in one transaction.
+    """
+    worker_connections: list[Connection] = []
+    try:
+        with db_session.begin():
+            hold_write_lock(db_session)
+            if workers <= 1 or not _can_prepare_worker_transactions(db_session, workers):
+                apply_merge_import(db_session, import_stream, mode=mode)
+                return
+            _prepare_parallel_import(db_session, import_stream, mode, workers, worker_connections)
+    except BaseException:
+        _finish_worker_transactions(worker_connections, commit=False)
+        raise
+    _finish_worker_transactions(worker_connections, commit=True)
+
+
+def resolve_prepared_imports(engine: Engine) -> None:
+    """Finish worker transactions an interrupted parallel import left prepared.
+
+    Each is committed if its coordinator committed and rolled back if the
+    coordinator aborted or is unknown; those of running imports are kept.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.connect() as connection:
+        prepared_xids = (
+            connection.execute(
+                text(
+                    "SELECT gid FROM pg_prepared_xacts "
+                    "WHERE database = current_database() AND gid LIKE :pattern"
+                ),
+                {"pattern": f"{_PREPARED_IMPORT_XID_PREFIX}:%"},
+            )
+            .scalars()
+            .all()
+        )
+        for xid in prepared_xids:
+            coordinator_xid = int(xid.split(":")[1])
+            coordinator_status = connection.execute(
+                text("SELECT txid_status(:xid)"), {"xid": coordinator_xid}
+            ).scalar_one()
+            if coordinator_status == "in progress":
+                continue
+            if coordinator_status == "committed":
+                connection.commit_prepared(xid, recover=True)
+            else:
+                connection.rollback_prepared(xid, recover=True)
+            logger.warning(
+                "Resolved prepared import transaction %s (coordinator %s)",
+                xid,
+                coordinator_status or "unknown",
+            )
@@ -0,0 +1,80 @@
+"""Routing of read-only requests to the read replica.
+
+Replication is asynchronous, so the replica may not show yet what a caller
+has just written. Write endpoints hand the caller the primary's WAL position
+in a cookie; the caller's reads go to the replica only once it has replayed
+that far, and to the primary until then.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Generator
+from typing import Final
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.session import get_read_session_factory, get_session_factory
+
+WRITE_LSN_COOKIE: Final[str] = "write_lsn"
+# Comfortably above any replication lag worth waiting out on the primary.
+WRITE_LSN_COOKIE_MAX_AGE_SECONDS: Final[int] = 300
+_LSN_RE: Final[re.Pattern[str]] = re.compile(r"[0-9A-F]{1,8}/[0-9A-F]{1,8}")
+
+
+def _replica_has_replayed(session_factory: sessionmaker[Session], lsn: str) -> bool:
+    with session_factory() as db_session:
+        if db_session.get_bind().dialect.name != "postgresql":
+            # Nothing to compare the position with; stay on the primary.
+            return False
+        # NULL means the server is not in recovery: it is a primary itself.
+        return db_session.execute(
+            text("SELECT COALESCE(pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn), true)"),
+            {"lsn": lsn},
+        ).scalar_one()
+
+
+def select_read_session_factory(request: Request) -> sessionmaker[Session]:
+    """Pick the sessions a read-only request runs on: replica unless it lags the caller."""
+    primary_factory = get_session_factory()
+    read_factory = get_read_session_factory()
+    if read_factory is primary_factory:
+        return primary_factory
+
+    lsn = request.cookies.get(WRITE_LSN_COOKIE)
+    if lsn is None or not _LSN_RE.fullmatch(lsn) or _replica_has_replayed(read_factory, lsn):
+        return read_factory
+    return primary_factory
+
+
+def get_read_db_session(
+    session_factory: sessionmaker[Session] = Depends(select_read_session_factory),
+) -> Generator[Session, None, None]:
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def remember_write_position(db_session: Session, response: Response) -> None:
+    """Send the caller the primary's WAL position after a committed write.
+
+    Only needed when reads go to a replica, and only PostgreSQL has a position
+    to send. Runs outside the write's transaction, so the position covers its
+    commit record.
+    """
+    if get_read_session_factory() is get_session_factory():
+        return
+    if db_session.get_bind().dialect.name != "postgresql":
+        return
+    lsn = db_session.execute(text("SELECT CAST(pg_current_wal_lsn() AS text)")).scalar_one()
+    response.set_cookie(
+        WRITE_LSN_COOKIE,
+        lsn,
+        max_age=WRITE_LSN_COOKIE_MAX_AGE_SECONDS,
+        httponly=True,
+        samesite="lax",
+    )
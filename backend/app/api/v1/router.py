@@ -1,26 +1,108 @@
 from __future__ import annotations
 
-from collections.abc import Iterator
+import base64
+import binascii
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Final
-
-from fastapi import APIRouter, Body, Depends, HTTPException, Request, status
-from pydantic import ValidationError
-from sqlalchemy import Select, select
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from typing import BinaryIO, Final
+
+import numpy as np
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import (
+    BigInteger,
+    ColumnElement,
+    Date,
+    Select,
+    Subquery,
+    bindparam,
+    case,
+    cast,
+    func,
+    literal,
+    select,
+    tuple_,
+    type_coerce,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
-
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.v1.columnar import import_pyarrow, iter_csv_export, iter_parquet_export
+from app.api.v1.compression import (
+    ContentEncoding,
+    LimitedDecompressedReader,
+    iter_compressed,
+    negotiate_content_encoding,
+    parse_content_encoding,
+    payload_too_large_error,
+)
+from app.api.v1.delta import (
+    DeltaToken,
+    delta_history_criteria,
+    delta_type_criteria,
+    read_data_revision,
+    read_delta_watermarks,
+)
 from app.api.v1.errors import ApiContractError, ErrorCode
+from app.api.v1.exporting import ALL_DATA, ExportFilter, iter_json_export, iter_ndjson_export
+from app.api.v1.importing import (
+    ImportStream,
+    analyze_import_tables,
+    apply_delta_import,
+    apply_merge_import,
+    apply_parallel_import,
+    apply_replace_import,
+)
+from app.api.v1.replica import (
+    get_read_db_session,
+    remember_write_position,
+    select_read_session_factory,
+)
 from app.api.v1.schemas import (
+    IMPORT_MAX_WORKERS,
+    ActivityItem,
+    ActivityResponse,
     ApiStatusResponse,
+    ConsistencyDiscrepancyItem,
+    ConsistencyReportResponse,
+    DeltaExportResponse,
+    ExportFormat,
     ExportHistoryItem,
+    ExportJobCreateRequest,
+    ExportJobResponse,
+    ExportJobStatus,
     ExportResponse,
     ExportStageCount,
+    ExportTable,
     ExportTypeItem,
-    ImportRequest,
+    FlowBucketSize,
+    FlowStatsBucket,
+    FlowStatsResponse,
+    ImportCommitMode,
+    ImportJobResponse,
+    ImportJobStatus,
+    ImportJobTypeResult,
+    ImportMode,
     ImportResponse,
-    ImportTypeItem,
+    ImportTypeOutcome,
+    PoolStatusResponse,
     TypeCreateRequest,
     TypeHistoryGroup,
     TypeHistoryResponse,
@@ -29,19 +111,69 @@ from app.api.v1.schemas import (
     TypeMoveRequest,
     TypeStageCounts,
 )
-from app.db.models import HistoryLog, MiniatureType, StageCount
-from app.db.session import get_db_session
-from app.domain.stages import StageCode, is_forward_transition
+from app.config import Settings, get_settings
+from app.db.models import (
+    ConsistencyCheckState,
+    ConsistencyDiscrepancy,
+    DataRevision,
+    ExportJob,
+    HistoryLog,
+    ImportJob,
+    ImportJobType,
+    MiniatureType,
+    StageCount,
+    StageCountAdjustment,
+    StageCountSnapshot,
+)
+from app.db.session import (
+    MonitoredQueuePool,
+    get_db_session,
+    get_engine,
+    get_session_factory,
+    hold_write_lock,
+)
+from app.domain.stages import (
+    STAGE_COUNT_FIELD_BY_STAGE,
+    STAGE_INDEX,
+    StageCode,
+    is_forward_transition,
+)
+from app.metrics import (
+    EXPORT_JOB_LOOKUPS,
+    FLOW_CACHE_BUCKETS,
+    MOVE_LOCK_WAIT,
+    STAGE_MOVED_ITEMS,
+    STAGE_MOVES,
+    record_import,
+)
+from app.workers.exports import export_artifact_path, run_export_job, submit_export_job
+from app.workers.imports import (
+    UPLOAD_FILE_PREFIX,
+    import_body_path,
+    run_import_job,
+    submit_import_job,
+)
 
 router = APIRouter()
 
-STAGE_COUNT_FIELD_BY_STAGE: Final[dict[StageCode, str]] = {
-    StageCode.IN_BOX: "in_box",
-    StageCode.BUILDING: "building",
-    StageCode.PRIMING: "priming",
-    StageCode.PAINTING: "painting",
-    StageCode.DONE: "done",
-}
+IMPORT_SPOOL_MEMORY_BYTES: Final[int] = 1024 * 1024
+_PARALLEL_IMPORT_MODES: Final[frozenset[ImportMode]] = frozenset(
+    {ImportMode.MERGE, ImportMode.IDEMPOTENT}
+)
+_SINGLE_COMMIT_IMPORT_MODES: Final[frozenset[ImportMode]] = frozenset(
+    {ImportMode.DELTA, ImportMode.REPLACE}
+)
+
+HISTORY_GROUP_WINDOW_SECONDS: Final[int] = 300
+HISTORY_COLUMNAR_THRESHOLD: Final[int] = 5_000
+STAGE_CODES_BY_INDEX: Final[tuple[StageCode, ...]] = tuple(StageCode)
+_UNIX_EPOCH: Final[datetime] = datetime(1970, 1, 1, tzinfo=UTC)
+
+ACTIVITY_DEFAULT_LIMIT: Final[int] = 50
+ACTIVITY_MAX_LIMIT: Final[int] = 200
+FLOW_CLOSED_BUCKET_GRACE: Final[timedelta] = timedelta(minutes=5)
+FLOW_MAX_BUCKETS: Final[int] = 1000
+FLOW_DEFAULT_WINDOW: Final[timedelta] = timedelta(days=30)
 
 
 @router.get("/status", tags=["system"], response_model=ApiStatusResponse)
@@ -49,6 +181,29 @@ def api_status() -> ApiStatusResponse:
     return ApiStatusResponse(status="ok", version="v1")
 
 
+@router.get("/pool", tags=["system"], response_model=PoolStatusResponse)
+def pool_status() -> PoolStatusResponse:
+    """Connection pool usage of this API process since it started."""
+    pool = get_engine().pool
+    if not isinstance(pool, MonitoredQueuePool):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Connection pool metrics are not available.",
+        )
+    checkout_stats = pool.checkout_stats()
+    return PoolStatusResponse(
+        size=pool.size(),
+        max_overflow=get_settings().db_max_overflow,
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=max(pool.overflow(), 0),
+        checkouts=checkout_stats.checkouts,
+        wait_seconds_total=checkout_stats.wait_seconds_total,
+        wait_seconds_max=checkout_stats.wait_seconds_max,
+        timeouts=checkout_stats.timeouts,
+    )
+
+
 def _base_counts() -> dict[str, int]:
     return {stage.value: 0 for stage in StageCode}
 
@@ -76,37 +231,50 @@ def _apply_stage_count(item: TypeListItem, stage_name: str, count: int) -> None:
         setattr(item.counts, field_name, count)
 
 
-def _iter_type_stage_rows(db_session: Session) -> Iterator[tuple[int, str, str | None, int | None]]:
-    stmt: Select[tuple[int, str, str | None, int | None]] = (
-        select(
-            MiniatureType.id,
-            MiniatureType.name,
-            StageCount.stage_name,
-            StageCount.count,
-        )
-        .select_from(MiniatureType)
-        .outerjoin(StageCount, StageCount.type_id == MiniatureType.id)
-        .order_by(MiniatureType.name.asc(), MiniatureType.id.asc())
+# Statements of the per-request hot paths are built once and take their
+# values as bound parameters: the SQL text never changes, so SQLAlchemy's
+# compiled cache always hits and psycopg can prepare it on the server once
+# ``db_prepare_threshold`` executions are reached on a connection.
+_TYPE_STAGE_ROWS: Final[Select[tuple[int, str, str | None, int | None]]] = (
+    select(
+        MiniatureType.id,
+        MiniatureType.name,
+        StageCount.stage_name,
+        StageCount.count,
     )
-    rows = db_session.execute(stmt).all()
+    .select_from(MiniatureType)
+    .outerjoin(StageCount, StageCount.type_id == MiniatureType.id)
+)
+_ALL_TYPE_STAGE_ROWS: Final[Select[tuple[int, str, str | None, int | None]]] = (
+    _TYPE_STAGE_ROWS.order_by(MiniatureType.name.asc(), MiniatureType.id.asc())
+)
+_TYPE_STAGE_ROWS_BY_ID: Final[Select[tuple[int, str, str | None, int | None]]] = (
+    _TYPE_STAGE_ROWS.where(MiniatureType.id == bindparam("type_id"))
+)
+_HISTORY_ROWS_BY_TYPE: Final[Select[tuple[str, str, int, datetime]]] = (
+    select(HistoryLog.from_stage, HistoryLog.to_stage, HistoryLog.qty, HistoryLog.created_at)
+    .where(HistoryLog.type_id == bindparam("type_id"))
+    .order_by(HistoryLog.created_at.asc(), HistoryLog.id.asc())
+)
+_MOVE_STAGE_ROWS: Final[Select[tuple[StageCount]]] = (
+    select(StageCount)
+    .where(
+        StageCount.type_id == bindparam("type_id"),
+        StageCount.stage_name.in_([bindparam("from_stage"), bindparam("to_stage")]),
+    )
+    .with_for_update()
+)
+
+
+def _iter_type_stage_rows(db_session: Session) -> Iterator[tuple[int, str, str | None, int | None]]:
+    rows = db_session.execute(_ALL_TYPE_STAGE_ROWS).all()
     return ((row[0], row[1], row[2], row[3]) for row in rows)
 
 
 def _iter_type_rows_by_id(
     db_session: Session, type_id: int
 ) -> Iterator[tuple[int, str, str | None, int | None]]:
-    stmt: Select[tuple[int, str, str | None, int | None]] = (
-        select(
-            MiniatureType.id,
-            MiniatureType.name,
-            StageCount.stage_name,
-            StageCount.count,
-        )
-        .select_from(MiniatureType)
-        .outerjoin(StageCount, StageCount.type_id == MiniatureType.id)
-        .where(MiniatureType.id == type_id)
-    )
-    rows = db_session.execute(stmt).all()
+    rows = db_session.execute(_TYPE_STAGE_ROWS_BY_ID, {"type_id": type_id}).all()
     return ((row[0], row[1], row[2], row[3]) for row in rows)
 
 
@@ -125,6 +293,207 @@ def _build_type_item_by_id(db_session: Session, type_id: int) -> TypeListItem |
     return item
 
 
+def _normalize_as_of(as_of: datetime) -> datetime:
+    if as_of.tzinfo is None:
+        return as_of.replace(tzinfo=UTC)
+    return as_of
+
+
+def _iter_type_names(
+    db_session: Session, type_id: int | None = None, created_by: datetime | None = None
+) -> Iterator[tuple[int, str]]:
+    stmt: Select[tuple[int, str]] = select(MiniatureType.id, MiniatureType.name).order_by(
+        MiniatureType.name.asc(), MiniatureType.id.asc()
+    )
+    if type_id is not None:
+        stmt = stmt.where(MiniatureType.id == type_id)
+    if created_by is not None:
+        stmt = stmt.where(MiniatureType.created_at <= created_by)
+    rows = db_session.execute(stmt).all()
+    return ((row[0], row[1]) for row in rows)
+
+
+def _load_snapshot_counts(db_session: Session, anchor: Subquery) -> dict[int, dict[str, int]]:
+    rows = db_session.execute(
+        select(StageCountSnapshot).join(
+            anchor,
+            (StageCountSnapshot.type_id == anchor.c.type_id)
+            & (StageCountSnapshot.taken_at == anchor.c.taken_at),
+        )
+    ).scalars()
+    return {
+        row.type_id: {
+            stage.value: getattr(row, field_name)
+            for stage, field_name in STAGE_COUNT_FIELD_BY_STAGE.items()
+        }
+        for row in rows
+    }
+
+
+def _load_current_counts(
+    db_session: Session, type_id: int | None, created_by: datetime | None = None
+) -> dict[int, dict[str, int]]:
+    stmt = select(StageCount.type_id, StageCount.stage_name, StageCount.count)
+    if type_id is not None:
+        stmt = stmt.where(StageCount.type_id == type_id)
+    if created_by is not None:
+        stmt = stmt.join(MiniatureType, MiniatureType.id == StageCount.type_id).where(
+            MiniatureType.created_at <= created_by
+        )
+
+    counts_by_type_id: dict[int, dict[str, int]] = {}
+    for row_type_id, stage_name, count in db_session.execute(stmt):
+        counts_by_type_id.setdefault(row_type_id, _base_counts())[stage_name] = count
+    return counts_by_type_id
+
+
+_ChangeWindow = Callable[[ColumnElement[datetime]], tuple[ColumnElement[bool], ...]]
+
+
+def _replay_changes(
+    db_session: Session,
+    counts_by_type_id: dict[int, dict[str, int]],
+    window: _ChangeWindow,
+    direction: int,
+    *,
+    anchor: Subquery | None = None,
+    type_ids: list[int] | None = None,
+) -> None:
+    """Apply the history flows and ledger adjustments inside ``window`` to the counts.
+
+    ``window`` builds the time criteria for a ``created_at`` column; it may
+    refer to ``anchor``, which is joined on the type. ``direction`` is ``1``
+    to replay forwards and ``-1`` to undo the changes.
+    """
+    history = select(
+        HistoryLog.type_id,
+        HistoryLog.from_stage,
+        HistoryLog.to_stage,
+        func.sum(HistoryLog.qty),
+    ).where(*window(HistoryLog.created_at))
+    adjustments = select(
+        StageCountAdjustment.type_id,
+        StageCountAdjustment.stage_name,
+        func.sum(StageCountAdjustment.delta),
+    ).where(*window(StageCountAdjustment.created_at))
+    if anchor is not None:
+        history = history.join(anchor, anchor.c.type_id == HistoryLog.type_id)
+        adjustments = adjustments.join(anchor, anchor.c.type_id == StageCountAdjustment.type_id)
+    if type_ids is not None:
+        history = history.where(HistoryLog.type_id.in_(type_ids))
+        adjustments = adjustments.where(StageCountAdjustment.type_id.in_(type_ids))
+
+    for row_type_id, from_stage, to_stage, qty in db_session.execute(
+        history.group_by(HistoryLog.type_id, HistoryLog.from_stage, HistoryLog.to_stage)
+    ):
+        counts = counts_by_type_id.get(row_type_id)
+        if counts is None:
+            continue
+        counts[from_stage] -= direction * qty
+        counts[to_stage] += direction * qty
+    for row_type_id, stage_name, delta in db_session.execute(
+        adjustments.group_by(StageCountAdjustment.type_id, StageCountAdjustment.stage_name)
+    ):
+        counts = counts_by_type_id.get(row_type_id)
+        if counts is None:
+            continue
+        counts[stage_name] += direction * delta
+
+
+def _load_counts_as_of(
+    db_session: Session, as_of: datetime, type_id: int | None = None
+) -> dict[int, dict[str, int]]:
+    """Reconstruct stage counts at ``as_of`` from the nearest snapshot.
+
+    Types with a snapshot at or before ``as_of`` replay history and the
+    adjustment ledger forward from it; the rest undo them from the first later
+    snapshot or, when there is none yet, from the live ``stage_counts``.
+    Snapshots are taken every ``snapshot_interval_seconds``, which bounds the
+    replayed window. Types created after ``as_of`` are left out.
+    """
+    snapshot_type_filter = () if type_id is None else (StageCountSnapshot.type_id == type_id,)
+    base_anchor = (
+        select(
+            StageCountSnapshot.type_id,
+            func.max(StageCountSnapshot.taken_at).label("taken_at"),
+        )
+        .where(StageCountSnapshot.taken_at <= as_of, *snapshot_type_filter)
+        .group_by(StageCountSnapshot.type_id)
+        .subquery("base_anchor")
+    )
+    next_anchor = (
+        select(
+            StageCountSnapshot.type_id,
+            func.min(StageCountSnapshot.taken_at).label("taken_at"),
+        )
+        .join(MiniatureType, MiniatureType.id == StageCountSnapshot.type_id)
+        .where(
+            StageCountSnapshot.taken_at > as_of,
+            MiniatureType.created_at <= as_of,
+            *snapshot_type_filter,
+        )
+        .group_by(StageCountSnapshot.type_id)
+        .subquery("next_anchor")
+    )
+
+    base_counts = _load_snapshot_counts(db_session, base_anchor)
+    _replay_changes(
+        db_session,
+        base_counts,
+        lambda created_at: (created_at > base_anchor.c.taken_at, created_at <= as_of),
+        direction=1,
+        anchor=base_anchor,
+    )
+
+    next_counts = {
+        row_type_id: counts
+        for row_type_id, counts in _load_snapshot_counts(db_session, next_anchor).items()
+        if row_type_id not in base_counts
+    }
+    if next_counts:
+        _replay_changes(
+            db_session,
+            next_counts,
+            lambda created_at: (created_at > as_of, created_at <= next_anchor.c.taken_at),
+            direction=-1,
+            anchor=next_anchor,
+            type_ids=list(next_counts),
+        )
+
+    live_counts = {
+        row_type_id: counts
+        for row_type_id, counts in _load_current_counts(db_session, type_id, as_of).items()
+        if row_type_id not in base_counts and row_type_id not in next_counts
+    }
+    if live_counts:
+        _replay_changes(
+            db_session,
+            live_counts,
+            lambda created_at: (created_at > as_of,),
+            direction=-1,
+            type_ids=list(live_counts),
+        )
+
+    return base_counts | next_counts | live_counts
+
+
+def _build_type_items_as_of(
+    db_session: Session, as_of: datetime, type_id: int | None = None
+) -> list[TypeListItem]:
+    as_of = _normalize_as_of(as_of)
+    counts_by_type_id = _load_counts_as_of(db_session, as_of, type_id)
+    return [
+        TypeListItem(
+            id=row_type_id,
+            name=name,
+            counts=_stage_counts_model_from_dict(
+                counts_by_type_id.get(row_type_id, _base_counts())
+            ),
+        )
+        for row_type_id, name in _iter_type_names(db_session, type_id, created_by=as_of)
+    ]
+
+
 def _is_duplicate_type_name_error(error: IntegrityError) -> bool:
     lowered_error = str(error.orig).lower()
     return "uq_miniature_types_name" in lowered_error or "miniature_types.name" in lowered_error
@@ -139,20 +508,10 @@ class _HistoryRow:
 
 
 def _iter_history_rows(db_session: Session, type_id: int) -> Iterator[_HistoryRow]:
-    stmt: Select[HistoryLog] = (
-        select(HistoryLog)
-        .where(HistoryLog.type_id == type_id)
-        .order_by(HistoryLog.created_at.asc(), HistoryLog.id.asc())
-    )
-    rows = db_session.execute(stmt).scalars().all()
+    rows = db_session.execute(_HISTORY_ROWS_BY_TYPE, {"type_id": type_id}).all()
     return (
-        _HistoryRow(
-            from_stage=row.from_stage,
-            to_stage=row.to_stage,
-            qty=row.qty,
-            created_at=row.created_at,
-        )
-        for row in rows
+        _HistoryRow(from_stage=from_stage, to_stage=to_stage, qty=qty, created_at=created_at)
+        for from_stage, to_stage, qty, created_at in rows
     )
 
 
@@ -178,8 +537,9 @@ def _group_history_rows(rows: Iterator[_HistoryRow]) -> list[TypeHistoryGroup]:
         is_same_transition = (
             previous_row.from_stage == row.from_stage and previous_row.to_stage == row.to_stage
         )
+        is_within_window = 0 <= seconds_since_previous_event <= HISTORY_GROUP_WINDOW_SECONDS
 
-        if is_same_transition and 0 <= seconds_since_previous_event <= 300:
+        if is_same_transition and is_within_window:
             groups[-1].qty += row.qty
             previous_row = row
             continue
@@ -197,7 +557,262 @@ def _group_history_rows(rows: Iterator[_HistoryRow]) -> list[TypeHistoryGroup]:
     return groups
 
 
-def _iter_export_rows(db_session: Session) -> Iterator[tuple[int, str, str, int]]:
+def _encode_activity_cursor(created_at: datetime, history_id: int) -> str:
+    raw_cursor = f"{created_at.isoformat()}|{history_id}".encode()
+    return base64.urlsafe_b64encode(raw_cursor).decode("ascii")
+
+
+def _decode_activity_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw_cursor = base64.urlsafe_b64decode(cursor.encode("ascii")).decode()
+        created_at_raw, history_id_raw = raw_cursor.split("|", 1)
+        created_at = datetime.fromisoformat(created_at_raw)
+        history_id = int(history_id_raw)
+    except (binascii.Error, UnicodeError, ValueError) as error:
+        raise ApiContractError(
+            code=ErrorCode.ERR_VALIDATION,
+            message="Activity cursor is invalid.",
+        ) from error
+
+    if created_at.tzinfo is None:
+        # Issued by SQLite deployments before timestamps were loaded as UTC.
+        created_at = created_at.replace(tzinfo=UTC)
+    return created_at, history_id
+
+
+def _iter_activity_rows(
+    db_session: Session, limit: int, after: tuple[datetime, int] | None
+) -> Iterator[tuple[int, int, str, str, str, int, datetime]]:
+    stmt: Select[tuple[int, int, str, str, str, int, datetime]] = (
+        select(
+            HistoryLog.id,
+            HistoryLog.type_id,
+            MiniatureType.name,
+            HistoryLog.from_stage,
+            HistoryLog.to_stage,
+            HistoryLog.qty,
+            HistoryLog.created_at,
+        )
+        .join(MiniatureType, MiniatureType.id == HistoryLog.type_id)
+        .order_by(HistoryLog.created_at.desc(), HistoryLog.id.desc())
+        .limit(limit)
+    )
+    if after is not None:
+        cursor_key = tuple_(*after, types=(HistoryLog.created_at.type, HistoryLog.id.type))
+        stmt = stmt.where(tuple_(HistoryLog.created_at, HistoryLog.id) < cursor_key)
+    rows = db_session.execute(stmt).all()
+    return ((row[0], row[1], row[2], row[3], row[4], row[5], row[6]) for row in rows)
+
+
+def _read_bulk_revision(db_session: Session) -> int:
+    revision = db_session.execute(
+        select(DataRevision.bulk_revision).where(DataRevision.id == 1)
+    ).scalar_one_or_none()
+    return revision or 0
+
+
+def _flow_bucket_start(bucket: FlowBucketSize, day: date) -> date:
+    if bucket == FlowBucketSize.WEEK:
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def _flow_bucket_end(bucket: FlowBucketSize, start: date) -> date:
+    if bucket == FlowBucketSize.WEEK:
+        return start + timedelta(weeks=1)
+    return start + timedelta(days=1)
+
+
+def _flow_bucket_starts(bucket: FlowBucketSize, from_date: date, to_date: date) -> list[date]:
+    starts: list[date] = []
+    current = _flow_bucket_start(bucket, from_date)
+    while current <= to_date:
+        starts.append(current)
+        current = _flow_bucket_end(bucket, current)
+    return starts
+
+
+def _utc_midnight(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=UTC)
+
+
+class _FlowBucketCache:
+    """Closed-bucket flow aggregates, keyed by bucket size and type filter.
+
+    Closed buckets only change when a bulk write (import) lands history in the
+    past, and every such write bumps ``data_revisions.bulk_revision``, so each
+    series remembers the revision it was computed under and is dropped when it
+    no longer matches.
+    """
+
+    def __init__(self, max_series: int = 256) -> None:
+        self._lock = threading.Lock()
+        self._max_series = max_series
+        self._series: OrderedDict[
+            tuple[FlowBucketSize, int | None], tuple[int, dict[date, dict[str, int]]]
+        ] = OrderedDict()
+
+    def get_many(
+        self,
+        key: tuple[FlowBucketSize, int | None],
+        revision: int,
+        starts: list[date],
+    ) -> dict[date, dict[str, int]]:
+        with self._lock:
+            entry = self._series.get(key)
+            if entry is None or entry[0] != revision:
+                return {}
+            self._series.move_to_end(key)
+            cached = entry[1]
+            return {start: cached[start] for start in starts if start in cached}
+
+    def put_many(
+        self,
+        key: tuple[FlowBucketSize, int | None],
+        revision: int,
+        values: dict[date, dict[str, int]],
+    ) -> None:
+        if not values:
+            return
+        with self._lock:
+            entry = self._series.get(key)
+            if entry is None or entry[0] != revision:
+                entry = (revision, {})
+                self._series[key] = entry
+            entry[1].update(values)
+            self._series.move_to_end(key)
+            while len(self._series) > self._max_series:
+                self._series.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+_flow_bucket_cache = _FlowBucketCache()
+
+
+def _flow_bucket_start_sql(db_session: Session, bucket: FlowBucketSize) -> ColumnElement[date]:
+    """The UTC date each history row's bucket starts on, computed in SQL."""
+    if db_session.get_bind().dialect.name == "postgresql":
+        utc_created_at = func.timezone("UTC", HistoryLog.created_at)
+        return cast(func.date_trunc(bucket.value, utc_created_at), Date)
+    # SQLite keeps timestamps as UTC text; weeks start on Monday like date_trunc.
+    modifiers = ("-6 days", "weekday 1") if bucket == FlowBucketSize.WEEK else ()
+    return type_coerce(func.date(HistoryLog.created_at, *modifiers), Date)
+
+
+def _aggregate_flow(
+    db_session: Session,
+    bucket: FlowBucketSize,
+    first_start: date,
+    end: date,
+    type_id: int | None,
+) -> dict[date, dict[str, int]]:
+    bucket_start = _flow_bucket_start_sql(db_session, bucket).label("bucket_start")
+    stmt = (
+        select(bucket_start, HistoryLog.to_stage, func.sum(HistoryLog.qty))
+        .where(
+            HistoryLog.created_at >= _utc_midnight(first_start),
+            HistoryLog.created_at < _utc_midnight(end),
+        )
+        .group_by(bucket_start, HistoryLog.to_stage)
+    )
+    if type_id is not None:
+        stmt = stmt.where(HistoryLog.type_id == type_id)
+
+    counts_by_start: dict[date, dict[str, int]] = {}
+    for started_at, to_stage, qty in db_session.execute(stmt):
+        counts = counts_by_start.setdefault(started_at, _base_counts())
+        counts[to_stage] = int(qty)
+    return counts_by_start
+
+
+@dataclass
+class _HistoryColumns:
+    from_stage: np.ndarray
+    to_stage: np.ndarray
+    qty: np.ndarray
+    created_at_us: np.ndarray
+
+
+def _has_history_rows(db_session: Session, type_id: int, at_least: int) -> bool:
+    # Probing for row ``at_least`` stops after that many index entries instead
+    # of counting a type's whole history.
+    probe = select(literal(1)).where(HistoryLog.type_id == type_id).offset(at_least - 1).limit(1)
+    return db_session.execute(probe).first() is not None
+
+
+def _fetch_history_columns(db_session: Session, type_id: int) -> _HistoryColumns:
+    row_order = (HistoryLog.created_at.asc(), HistoryLog.id.asc())
+    from_stage_index = case(STAGE_INDEX, value=HistoryLog.from_stage)
+    to_stage_index = case(STAGE_INDEX, value=HistoryLog.to_stage)
+    created_at_us = cast(func.extract("epoch", HistoryLog.created_at) * 1_000_000, BigInteger)
+    stmt = select(
+        func.array_agg(aggregate_order_by(from_stage_index, *row_order)),
+        func.array_agg(aggregate_order_by(to_stage_index, *row_order)),
+        func.array_agg(aggregate_order_by(HistoryLog.qty, *row_order)),
+        func.array_agg(aggregate_order_by(created_at_us, *row_order)),
+    ).where(HistoryLog.type_id == type_id)
+    from_stages, to_stages, quantities, timestamps = db_session.execute(stmt).one()
+
+    return _HistoryColumns(
+        from_stage=np.asarray(from_stages or [], dtype=np.int8),
+        to_stage=np.asarray(to_stages or [], dtype=np.int8),
+        qty=np.asarray(quantities or [], dtype=np.int64),
+        created_at_us=np.asarray(timestamps or [], dtype=np.int64),
+    )
+
+
+def _group_history_columns(columns: _HistoryColumns) -> list[TypeHistoryGroup]:
+    """Columnar equivalent of ``_group_history_rows`` for long histories."""
+    row_count = len(columns.qty)
+    if row_count == 0:
+        return []
+
+    is_group_start = np.ones(row_count, dtype=bool)
+    if row_count > 1:
+        micros_since_previous_event = np.diff(columns.created_at_us)
+        continues_previous_group = (
+            (columns.from_stage[1:] == columns.from_stage[:-1])
+            & (columns.to_stage[1:] == columns.to_stage[:-1])
+            & (micros_since_previous_event >= 0)
+            & (micros_since_previous_event <= HISTORY_GROUP_WINDOW_SECONDS * 1_000_000)
+        )
+        is_group_start[1:] = ~continues_previous_group
+
+    group_starts = np.flatnonzero(is_group_start)
+    group_quantities = np.add.reduceat(columns.qty, group_starts)
+
+    return [
+        TypeHistoryGroup.model_construct(
+            from_stage=STAGE_CODES_BY_INDEX[from_stage],
+            to_stage=STAGE_CODES_BY_INDEX[to_stage],
+            qty=qty,
+            timestamp=_UNIX_EPOCH + timedelta(microseconds=created_at_us),
+        )
+        for from_stage, to_stage, qty, created_at_us in zip(
+            columns.from_stage[group_starts].tolist(),
+            columns.to_stage[group_starts].tolist(),
+            group_quantities.tolist(),
+            columns.created_at_us[group_starts].tolist(),
+            strict=True,
+        )
+    ]
+
+
+def _load_history_groups(db_session: Session, type_id: int) -> list[TypeHistoryGroup]:
+    use_columnar_path = db_session.get_bind().dialect.name == "postgresql" and _has_history_rows(
+        db_session, type_id, HISTORY_COLUMNAR_THRESHOLD
+    )
+    if use_columnar_path:
+        return _group_history_columns(_fetch_history_columns(db_session, type_id))
+    return _group_history_rows(_iter_history_rows(db_session, type_id))
+
+
+def _iter_export_rows(
+    db_session: Session, *criteria: ColumnElement[bool]
+) -> Iterator[tuple[int, str, str, int]]:
     stmt: Select[tuple[int, str, str, int]] = (
         select(
             MiniatureType.id,
@@ -207,6 +822,7 @@ def _iter_export_rows(db_session: Session) -> Iterator[tuple[int, str, str, int]
         )
         .select_from(MiniatureType)
         .join(StageCount, StageCount.type_id == MiniatureType.id)
+        .where(*criteria)
         .order_by(MiniatureType.name.asc(), MiniatureType.id.asc())
     )
     rows = db_session.execute(stmt).all()
@@ -214,84 +830,258 @@ def _iter_export_rows(db_session: Session) -> Iterator[tuple[int, str, str, int]
 
 
 def _iter_export_history_rows(
-    db_session: Session,
+    db_session: Session, *criteria: ColumnElement[bool]
 ) -> Iterator[tuple[int, str, str, int, datetime]]:
-    stmt: Select[tuple[int, str, str, int, datetime]] = select(
-        HistoryLog.type_id,
-        HistoryLog.from_stage,
-        HistoryLog.to_stage,
-        HistoryLog.qty,
-        HistoryLog.created_at,
-    ).order_by(HistoryLog.type_id.asc(), HistoryLog.created_at.asc(), HistoryLog.id.asc())
+    stmt: Select[tuple[int, str, str, int, datetime]] = (
+        select(
+            HistoryLog.type_id,
+            HistoryLog.from_stage,
+            HistoryLog.to_stage,
+            HistoryLog.qty,
+            HistoryLog.created_at,
+        )
+        .where(*criteria)
+        .order_by(HistoryLog.type_id.asc(), HistoryLog.created_at.asc(), HistoryLog.id.asc())
+    )
     rows = db_session.execute(stmt).all()
     return ((row[0], row[1], row[2], row[3], row[4]) for row in rows)
 
 
-def _parse_import_payload(raw_payload: dict[str, object]) -> ImportRequest:
-    try:
-        return ImportRequest.model_validate(raw_payload)
-    except ValidationError as error:
-        raise ApiContractError(
-            code=ErrorCode.ERR_INVALID_IMPORT_FORMAT,
-            message="Import payload is invalid.",
-        ) from error
+def _build_export_response(
+    db_session: Session,
+    type_criteria: tuple[ColumnElement[bool], ...] = (),
+    history_criteria: tuple[ColumnElement[bool], ...] = (),
+) -> ExportResponse:
+    type_names: dict[int, str] = {}
+    stage_counts_by_type_id: dict[int, dict[str, int]] = {}
+    history_by_type_id: dict[int, list[ExportHistoryItem]] = {}
+
+    for type_id, name, stage_name, count in _iter_export_rows(db_session, *type_criteria):
+        type_names[type_id] = name
+        if type_id not in stage_counts_by_type_id:
+            stage_counts_by_type_id[type_id] = _base_counts()
+        stage_counts_by_type_id[type_id][stage_name] = count
 
+    for type_id, from_stage, to_stage, qty, created_at in _iter_export_history_rows(
+        db_session, *history_criteria
+    ):
+        if type_id not in history_by_type_id:
+            history_by_type_id[type_id] = []
+        history_by_type_id[type_id].append(
+            ExportHistoryItem(
+                from_stage=StageCode(from_stage),
+                to_stage=StageCode(to_stage),
+                qty=qty,
+                created_at=created_at,
+            )
+        )
 
-def _check_payload_size(request: Request) -> None:
-    content_length = request.headers.get("content-length")
-    if content_length and int(content_length) > 5 * 1024 * 1024:
-        raise ApiContractError(
-            code=ErrorCode.ERR_PAYLOAD_TOO_LARGE,
-            message="Import payload exceeds the 5MB limit.",
+    export_items: list[ExportTypeItem] = []
+    for type_id, name in type_names.items():
+        stage_counts = stage_counts_by_type_id.get(type_id, _base_counts())
+        export_items.append(
+            ExportTypeItem(
+                name=name,
+                stage_counts=[
+                    ExportStageCount(stage=stage, count=stage_counts[stage.value])
+                    for stage in StageCode
+                ],
+                history=history_by_type_id.get(type_id, []),
+            )
         )
 
+    return ExportResponse(types=export_items)
 
-def _build_stage_delta_map(item: ImportTypeItem) -> dict[str, int]:
-    return {stage_count.stage.value: stage_count.count for stage_count in item.stage_counts}
 
+def _build_delta_export_response(
+    db_session: Session, since: DeltaToken, export_filter: ExportFilter = ALL_DATA
+) -> DeltaExportResponse:
+    # The watermarks are read and committed first so that everything the
+    # export then reads up to them is final; see ``read_delta_watermarks``.
+    with db_session.begin():
+        until = read_delta_watermarks(db_session)
+
+    payload = _build_export_response(
+        db_session,
+        type_criteria=(delta_type_criteria(since, until), *export_filter.type_criteria()),
+        history_criteria=(
+            *delta_history_criteria(since, until),
+            *export_filter.history_criteria(),
+        ),
+    )
+    return DeltaExportResponse(types=payload.types, since=str(since), token=str(until))
+
+
+def _build_export_filter(
+    type_ids: list[int] | None,
+    name_prefix: str | None,
+    history_from: datetime | None,
+    history_to: datetime | None,
+) -> ExportFilter:
+    if history_from is not None:
+        history_from = _normalize_as_of(history_from)
+    if history_to is not None:
+        history_to = _normalize_as_of(history_to)
+    if history_from is not None and history_to is not None and history_from >= history_to:
+        raise ApiContractError(
+            code=ErrorCode.ERR_VALIDATION,
+            message="The 'from' time must be before the 'to' time.",
+        )
+    return ExportFilter(
+        type_ids=tuple(sorted(set(type_ids or ()))),
+        name_prefix=name_prefix,
+        history_from=history_from,
+        history_to=history_to,
+    )
 
-def _resolve_type_for_import(db_session: Session, type_name: str) -> MiniatureType:
-    existing_type = db_session.execute(
-        select(MiniatureType).where(MiniatureType.name == type_name)
-    ).scalar_one_or_none()
-    if existing_type is not None:
-        return existing_type
 
-    created_type = MiniatureType(name=type_name)
-    db_session.add(created_type)
-    db_session.flush()
-    return created_type
+def _stream_export(
+    chunks: Iterable[bytes],
+    media_type: str,
+    content_encoding: ContentEncoding | None,
+) -> StreamingResponse:
+    headers = {"Vary": "Accept-Encoding"}
+    if content_encoding is not None:
+        chunks = iter_compressed(chunks, content_encoding)
+        headers["Content-Encoding"] = content_encoding.value
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+def _build_export_job_response(job: ExportJob) -> ExportJobResponse:
+    download_url = None
+    if job.status == ExportJobStatus.COMPLETED.value:
+        download_url = f"/api/v1/exports/{job.id}/artifact"
+    return ExportJobResponse(
+        id=job.id,
+        format=ExportFormat(job.format),
+        status=ExportJobStatus(job.status),
+        data_revision=job.data_revision,
+        total_types=job.total_types,
+        exported_types=job.exported_types,
+        artifact_bytes=job.artifact_bytes,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        download_url=download_url,
+    )
 
 
-def _apply_import_stage_deltas(
-    db_session: Session, type_id: int, stage_delta_by_name: dict[str, int]
-) -> None:
-    stage_rows = db_session.execute(
-        select(StageCount).where(StageCount.type_id == type_id).with_for_update()
+def _find_reusable_export_job(
+    db_session: Session, export_format: ExportFormat, data_revision: str, export_dir: str
+) -> ExportJob | None:
+    # A job that has not started yet will snapshot data at least as new as
+    # the current revision, so it can be shared as well.
+    candidates = db_session.execute(
+        select(ExportJob)
+        .where(
+            ExportJob.format == export_format.value,
+            (ExportJob.status == ExportJobStatus.PENDING.value)
+            | (
+                (ExportJob.status == ExportJobStatus.COMPLETED.value)
+                & (ExportJob.data_revision == data_revision)
+            ),
+        )
+        .order_by(ExportJob.id.desc())
     ).scalars()
-    stage_rows_by_name = {row.stage_name: row for row in stage_rows}
+    for job in candidates:
+        if job.status == ExportJobStatus.PENDING.value:
+            return job
+        if export_artifact_path(export_dir, job.id, export_format).is_file():
+            return job
+    return None
 
-    for stage in StageCode:
-        stage_row = stage_rows_by_name.get(stage.value)
-        if stage_row is None:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Stage counts are not initialized for this type.",
-            )
-        stage_row.count += stage_delta_by_name[stage.value]
 
+def _dispatch_export_job(
+    background_tasks: BackgroundTasks, settings: Settings, job_id: int
+) -> None:
+    if settings.export_job_workers > 0:
+        submit_export_job(settings.export_job_workers, job_id, settings.export_jobs_dir)
+    else:
+        background_tasks.add_task(run_export_job, job_id, settings.export_jobs_dir)
 
-def _append_import_history(db_session: Session, type_id: int, item: ImportTypeItem) -> None:
-    for history_item in item.history:
-        db_session.add(
-            HistoryLog(
-                type_id=type_id,
-                from_stage=history_item.from_stage.value,
-                to_stage=history_item.to_stage.value,
-                qty=history_item.qty,
-                created_at=history_item.created_at,
+
+def _check_payload_size(request: Request) -> None:
+    # Cheap early rejection; the limit itself is enforced on the decompressed body.
+    max_bytes = get_settings().import_max_bytes
+    content_length = request.headers.get("content-length")
+    if content_length and int(content_length) > max_bytes:
+        raise payload_too_large_error(max_bytes)
+
+
+async def _receive_import_body(request: Request, body_file: BinaryIO) -> None:
+    max_bytes = get_settings().import_max_bytes
+    received_bytes = 0
+    async for chunk in request.stream():
+        received_bytes += len(chunk)
+        if received_bytes > max_bytes:
+            raise payload_too_large_error(max_bytes)
+        body_file.write(chunk)
+
+
+async def _spool_import_body(request: Request) -> AsyncIterator[BinaryIO]:
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_MEMORY_BYTES) as body_file:
+        await _receive_import_body(request, body_file)
+        body_file.seek(0)
+        yield body_file
+
+
+async def _spool_import_job_body(request: Request) -> AsyncIterator[Path]:
+    import_dir = Path(get_settings().import_jobs_dir)
+    import_dir.mkdir(parents=True, exist_ok=True)
+    body_fd, body_name = tempfile.mkstemp(
+        dir=import_dir, prefix=UPLOAD_FILE_PREFIX, suffix=".partial"
+    )
+    body_path = Path(body_name)
+    try:
+        with os.fdopen(body_fd, "wb") as body_file:
+            await _receive_import_body(request, body_file)
+        yield body_path
+    finally:
+        # Accepted bodies have been moved to their job's path by now.
+        body_path.unlink(missing_ok=True)
+
+
+def _build_import_job_response(
+    job: ImportJob, type_results: Iterable[ImportJobType]
+) -> ImportJobResponse:
+    rows_per_second = None
+    if job.started_at is not None:
+        finished_at = _normalize_as_of(job.finished_at or datetime.now(UTC))
+        elapsed = (finished_at - _normalize_as_of(job.started_at)).total_seconds()
+        if elapsed > 0:
+            rows_per_second = round(job.processed_rows / elapsed, 1)
+    return ImportJobResponse(
+        id=job.id,
+        mode=ImportMode(job.mode),
+        commit_mode=ImportCommitMode(job.commit_mode),
+        status=ImportJobStatus(job.status),
+        processed_types=job.processed_types,
+        processed_rows=job.processed_rows,
+        rows_per_second=rows_per_second,
+        error_code=job.error_code,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        types=[
+            ImportJobTypeResult(
+                position=result.position,
+                name=result.name,
+                history_rows=result.history_rows,
+                outcome=ImportTypeOutcome(result.outcome),
             )
-        )
+            for result in type_results
+        ],
+    )
+
+
+def _dispatch_import_job(
+    background_tasks: BackgroundTasks, settings: Settings, job_id: int
+) -> None:
+    if settings.import_job_workers > 0:
+        submit_import_job(settings.import_job_workers, job_id, settings.import_jobs_dir)
+    else:
+        background_tasks.add_task(run_import_job, job_id, settings.import_jobs_dir)
 
 
 @router.post(
@@ -302,6 +1092,7 @@ def _append_import_history(db_session: Session, type_id: int, item: ImportTypeIt
 )
 def create_type(
     payload: TypeCreateRequest,
+    response: Response,
     db_session: Session = Depends(get_db_session),
 ) -> TypeListItem:
     created_type = MiniatureType(name=payload.name)
@@ -319,12 +1110,21 @@ def create_type(
         raise
 
     db_session.refresh(created_type)
+    remember_write_position(db_session, response)
     return _build_type_item(type_id=created_type.id, name=created_type.name)
 
 
 @router.get("/types/{type_id}", tags=["types"], response_model=TypeListItem)
-def get_type(type_id: int, db_session: Session = Depends(get_db_session)) -> TypeListItem:
-    item = _build_type_item_by_id(db_session, type_id)
+def get_type(
+    type_id: int,
+    as_of: datetime | None = None,
+    db_session: Session = Depends(get_read_db_session),
+) -> TypeListItem:
+    if as_of is not None:
+        items = _build_type_items_as_of(db_session, as_of, type_id)
+        item = items[0] if items else None
+    else:
+        item = _build_type_item_by_id(db_session, type_id)
     if item is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Type not found.")
 
@@ -332,7 +1132,13 @@ def get_type(type_id: int, db_session: Session = Depends(get_db_session)) -> Typ
 
 
 @router.get("/types", tags=["types"], response_model=TypeListResponse)
-def list_types(db_session: Session = Depends(get_db_session)) -> TypeListResponse:
+def list_types(
+    as_of: datetime | None = None,
+    db_session: Session = Depends(get_read_db_session),
+) -> TypeListResponse:
+    if as_of is not None:
+        return TypeListResponse(items=_build_type_items_as_of(db_session, as_of))
+
     items_by_type_id: dict[int, TypeListItem] = {}
 
     for type_id, name, stage_name, count in _iter_type_stage_rows(db_session):
@@ -351,6 +1157,7 @@ def list_types(db_session: Session = Depends(get_db_session)) -> TypeListRespons
 def move_type(
     type_id: int,
     payload: TypeMoveRequest,
+    response: Response,
     db_session: Session = Depends(get_db_session),
 ) -> TypeListItem:
     if not is_forward_transition(payload.from_stage, payload.to_stage):
@@ -359,18 +1166,21 @@ def move_type(
             message="Transition must move forward in the pipeline.",
         )
 
+    lock_started_at = time.perf_counter()
+    hold_write_lock(db_session)
     selected_type = db_session.get(MiniatureType, type_id)
     if selected_type is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Type not found.")
 
     stage_rows = db_session.execute(
-        select(StageCount)
-        .where(
-            StageCount.type_id == type_id,
-            StageCount.stage_name.in_([payload.from_stage.value, payload.to_stage.value]),
-        )
-        .with_for_update()
+        _MOVE_STAGE_ROWS,
+        {
+            "type_id": type_id,
+            "from_stage": payload.from_stage.value,
+            "to_stage": payload.to_stage.value,
+        },
     ).scalars()
+    MOVE_LOCK_WAIT.observe(time.perf_counter() - lock_started_at)
     stage_rows_by_name = {row.stage_name: row for row in stage_rows}
     source_stage = stage_rows_by_name.get(payload.from_stage.value)
     destination_stage = stage_rows_by_name.get(payload.to_stage.value)
@@ -398,81 +1208,337 @@ def move_type(
         )
     )
     db_session.commit()
+    STAGE_MOVES.labels(payload.from_stage.value, payload.to_stage.value).inc()
+    STAGE_MOVED_ITEMS.labels(payload.from_stage.value, payload.to_stage.value).inc(payload.qty)
 
     item = _build_type_item_by_id(db_session, type_id)
     if item is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Type not found.")
+    remember_write_position(db_session, response)
     return item
 
 
 @router.get("/types/{type_id}/history", tags=["types"], response_model=TypeHistoryResponse)
 def get_type_history(
-    type_id: int, db_session: Session = Depends(get_db_session)
+    type_id: int, db_session: Session = Depends(get_read_db_session)
 ) -> TypeHistoryResponse:
     selected_type = db_session.get(MiniatureType, type_id)
     if selected_type is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Type not found.")
 
-    return TypeHistoryResponse(items=_group_history_rows(_iter_history_rows(db_session, type_id)))
+    return TypeHistoryResponse(items=_load_history_groups(db_session, type_id))
 
 
-@router.get("/export", tags=["import-export"], response_model=ExportResponse)
-def export_state(db_session: Session = Depends(get_db_session)) -> ExportResponse:
-    type_names: dict[int, str] = {}
-    stage_counts_by_type_id: dict[int, dict[str, int]] = {}
-    history_by_type_id: dict[int, list[ExportHistoryItem]] = {}
+@router.get("/activity", tags=["activity"], response_model=ActivityResponse)
+def get_activity(
+    limit: int = Query(default=ACTIVITY_DEFAULT_LIMIT, ge=1, le=ACTIVITY_MAX_LIMIT),
+    cursor: str | None = None,
+    db_session: Session = Depends(get_read_db_session),
+) -> ActivityResponse:
+    after = _decode_activity_cursor(cursor) if cursor else None
+    rows = list(_iter_activity_rows(db_session, limit + 1, after))
+    page = rows[:limit]
 
-    for type_id, name, stage_name, count in _iter_export_rows(db_session):
-        type_names[type_id] = name
-        if type_id not in stage_counts_by_type_id:
-            stage_counts_by_type_id[type_id] = _base_counts()
-        stage_counts_by_type_id[type_id][stage_name] = count
+    next_cursor: str | None = None
+    if len(rows) > limit:
+        last_row = page[-1]
+        next_cursor = _encode_activity_cursor(created_at=last_row[6], history_id=last_row[0])
 
-    for type_id, from_stage, to_stage, qty, created_at in _iter_export_history_rows(db_session):
-        if type_id not in history_by_type_id:
-            history_by_type_id[type_id] = []
-        history_by_type_id[type_id].append(
-            ExportHistoryItem(
+    return ActivityResponse(
+        items=[
+            ActivityItem(
+                id=history_id,
+                type_id=type_id,
+                type_name=type_name,
                 from_stage=StageCode(from_stage),
                 to_stage=StageCode(to_stage),
                 qty=qty,
                 created_at=created_at,
             )
+            for history_id, type_id, type_name, from_stage, to_stage, qty, created_at in page
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/consistency", tags=["system"], response_model=ConsistencyReportResponse)
+def get_consistency_report(
+    db_session: Session = Depends(get_read_db_session),
+) -> ConsistencyReportResponse:
+    state = db_session.get(ConsistencyCheckState, 1)
+    rows = db_session.execute(
+        select(ConsistencyDiscrepancy, MiniatureType.name)
+        .join(MiniatureType, MiniatureType.id == ConsistencyDiscrepancy.type_id)
+        .order_by(
+            MiniatureType.name.asc(),
+            ConsistencyDiscrepancy.type_id.asc(),
+            ConsistencyDiscrepancy.stage_name.asc(),
         )
+    ).all()
+
+    return ConsistencyReportResponse(
+        last_run_at=state.last_run_at if state is not None else None,
+        history_high_water_mark=state.history_high_water_mark if state is not None else 0,
+        checked_types=state.last_checked_types if state is not None else 0,
+        discrepancies=[
+            ConsistencyDiscrepancyItem(
+                type_id=discrepancy.type_id,
+                type_name=type_name,
+                stage=StageCode(discrepancy.stage_name),
+                actual=discrepancy.actual,
+                expected=discrepancy.expected,
+                detected_at=discrepancy.detected_at,
+            )
+            for discrepancy, type_name in rows
+        ],
+    )
 
-    export_items: list[ExportTypeItem] = []
-    for type_id, name in type_names.items():
-        stage_counts = stage_counts_by_type_id.get(type_id, _base_counts())
-        export_items.append(
-            ExportTypeItem(
-                name=name,
-                stage_counts=[
-                    ExportStageCount(stage=stage, count=stage_counts[stage.value])
-                    for stage in StageCode
-                ],
-                history=history_by_type_id.get(type_id, []),
+
+@router.get("/stats/flow", tags=["stats"], response_model=FlowStatsResponse)
+def get_flow_stats(
+    bucket: FlowBucketSize = FlowBucketSize.DAY,
+    from_date: date | None = Query(default=None, alias="from"),
+    to_date: date | None = Query(default=None, alias="to"),
+    type_id: int | None = None,
+    db_session: Session = Depends(get_read_db_session),
+) -> FlowStatsResponse:
+    now = datetime.now(UTC)
+    to_date = to_date or now.date()
+    from_date = from_date or to_date - FLOW_DEFAULT_WINDOW
+    if from_date > to_date:
+        raise ApiContractError(
+            code=ErrorCode.ERR_VALIDATION,
+            message="The 'from' date must not be after the 'to' date.",
+        )
+
+    starts = _flow_bucket_starts(bucket, from_date, to_date)
+    if len(starts) > FLOW_MAX_BUCKETS:
+        raise ApiContractError(
+            code=ErrorCode.ERR_VALIDATION,
+            message=f"Requested range spans more than {FLOW_MAX_BUCKETS} buckets.",
+        )
+
+    if type_id is not None and db_session.get(MiniatureType, type_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Type not found.")
+
+    cache_key = (bucket, type_id)
+    revision = _read_bulk_revision(db_session)
+    counts_by_start = _flow_bucket_cache.get_many(cache_key, revision, starts)
+    missing_starts = [start for start in starts if start not in counts_by_start]
+    FLOW_CACHE_BUCKETS.labels("hit").inc(len(counts_by_start))
+    FLOW_CACHE_BUCKETS.labels("miss").inc(len(missing_starts))
+
+    if missing_starts:
+        computed = _aggregate_flow(
+            db_session,
+            bucket,
+            missing_starts[0],
+            _flow_bucket_end(bucket, missing_starts[-1]),
+            type_id,
+        )
+        fresh = {start: computed.get(start, _base_counts()) for start in missing_starts}
+        closed = {
+            start: counts
+            for start, counts in fresh.items()
+            if _utc_midnight(_flow_bucket_end(bucket, start)) + FLOW_CLOSED_BUCKET_GRACE <= now
+        }
+        _flow_bucket_cache.put_many(cache_key, revision, closed)
+        counts_by_start.update(fresh)
+
+    return FlowStatsResponse(
+        bucket=bucket,
+        type_id=type_id,
+        items=[
+            FlowStatsBucket(
+                start=start,
+                counts=_stage_counts_model_from_dict(counts_by_start[start]),
             )
+            for start in starts
+        ],
+    )
+
+
+@router.get(
+    "/export",
+    tags=["import-export"],
+    response_model=ExportResponse | DeltaExportResponse,
+)
+def export_state(
+    request: Request,
+    response: Response,
+    format: ExportFormat = ExportFormat.JSON,
+    table: ExportTable = ExportTable.TYPES,
+    since: str | None = Query(default=None, max_length=64),
+    type_ids: list[int] | None = Query(default=None, max_length=1000),
+    name: str | None = Query(default=None, min_length=1, max_length=255),
+    history_from: datetime | None = Query(default=None, alias="from"),
+    history_to: datetime | None = Query(default=None, alias="to"),
+    read_session_factory: sessionmaker[Session] = Depends(select_read_session_factory),
+) -> ExportResponse | StreamingResponse:
+    content_encoding = negotiate_content_encoding(request.headers.get("accept-encoding"))
+    export_filter = _build_export_filter(type_ids, name, history_from, history_to)
+    if since is not None and format != ExportFormat.JSON:
+        raise ApiContractError(
+            code=ErrorCode.ERR_VALIDATION,
+            message="Request validation failed.",
+        )
+    if format == ExportFormat.NDJSON:
+        return _stream_export(
+            iter_ndjson_export(read_session_factory, export_filter),
+            media_type="application/x-ndjson",
+            content_encoding=content_encoding,
+        )
+    if format == ExportFormat.CSV:
+        return _stream_export(
+            iter_csv_export(read_session_factory, table, export_filter),
+            media_type="text/csv; charset=utf-8",
+            content_encoding=content_encoding,
+        )
+    if format == ExportFormat.PARQUET:
+        # Checked before streaming starts so a missing extra is a clean 501;
+        # Parquet pages are compressed already, so no Content-Encoding on top.
+        import_pyarrow()
+        return _stream_export(
+            iter_parquet_export(read_session_factory, table, export_filter),
+            media_type="application/vnd.apache.parquet",
+            content_encoding=None,
         )
 
-    return ExportResponse(types=export_items)
+    if since is not None:
+        # The watermarks lock tables, which a hot standby does not allow, so
+        # delta exports always read the primary.
+        primary_session_factory = get_session_factory()
+        with primary_session_factory() as db_session:
+            payload = _build_delta_export_response(
+                db_session, DeltaToken.parse(since), export_filter
+            )
+    elif content_encoding is not None:
+        return _stream_export(
+            iter_json_export(read_session_factory, export_filter),
+            media_type="application/json",
+            content_encoding=content_encoding,
+        )
+    else:
+        with read_session_factory() as db_session:
+            payload = _build_export_response(
+                db_session,
+                type_criteria=export_filter.type_criteria(),
+                history_criteria=export_filter.history_criteria(),
+            )
+    if content_encoding is None:
+        response.headers["Vary"] = "Accept-Encoding"
+        return payload
+    # Only delta exports get here; they are built in memory to find the types.
+    return _stream_export(
+        [payload.model_dump_json().encode()],
+        media_type="application/json",
+        content_encoding=content_encoding,
+    )
+
+
+@router.post(
+    "/exports",
+    tags=["import-export"],
+    response_model=ExportJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def create_export_job(
+    response: Response,
+    background_tasks: BackgroundTasks,
+    payload: ExportJobCreateRequest | None = None,
+    db_session: Session = Depends(get_db_session),
+) -> ExportJobResponse:
+    settings = get_settings()
+    export_format = payload.format if payload is not None else ExportFormat.JSON
+
+    with db_session.begin():
+        data_revision = read_data_revision(db_session)
+        job = _find_reusable_export_job(
+            db_session, export_format, data_revision, settings.export_jobs_dir
+        )
+        EXPORT_JOB_LOOKUPS.labels("miss" if job is None else "hit").inc()
+        if job is None:
+            job = ExportJob(format=export_format.value, status=ExportJobStatus.PENDING.value)
+            db_session.add(job)
+            db_session.flush()
+
+    if job.status == ExportJobStatus.COMPLETED.value:
+        response.status_code = status.HTTP_200_OK
+    else:
+        # Re-dispatching a shared pending job is harmless: only one run can
+        # claim it, and it revives jobs whose worker went away before starting.
+        _dispatch_export_job(background_tasks, settings, job.id)
+    return _build_export_job_response(job)
+
+
+@router.get("/exports/{job_id}", tags=["import-export"], response_model=ExportJobResponse)
+def get_export_job(
+    job_id: int,
+    db_session: Session = Depends(get_db_session),
+) -> ExportJobResponse:
+    job = db_session.get(ExportJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found.")
+    return _build_export_job_response(job)
+
+
+@router.get("/exports/{job_id}/artifact", tags=["import-export"], response_class=FileResponse)
+def download_export_artifact(
+    job_id: int,
+    db_session: Session = Depends(get_db_session),
+) -> FileResponse:
+    job = db_session.get(ExportJob, job_id)
+    artifact_path = None
+    if job is not None and job.status == ExportJobStatus.COMPLETED.value:
+        artifact_path = export_artifact_path(
+            get_settings().export_jobs_dir, job.id, ExportFormat(job.format)
+        )
+    if artifact_path is None or not artifact_path.is_file():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Export artifact not found."
+        )
+
+    media_type = "application/x-ndjson" if job.format == ExportFormat.NDJSON else "application/json"
+    # FileResponse answers Range requests, so interrupted downloads can resume.
+    return FileResponse(artifact_path, media_type=media_type, filename=artifact_path.name)
 
 
 @router.post("/import", tags=["import-export"], response_model=ImportResponse)
 def import_state(
     request: Request,
-    raw_payload: dict[str, object] = Body(...),
-    db_session: Session = Depends(get_db_session),
+    response: Response,
     _size_check: None = Depends(_check_payload_size),
+    body_file: BinaryIO = Depends(_spool_import_body),
+    mode: ImportMode = ImportMode.MERGE,
+    workers: int = Query(default=1, ge=1, le=IMPORT_MAX_WORKERS),
+    db_session: Session = Depends(get_db_session),
 ) -> ImportResponse:
-    payload = _parse_import_payload(raw_payload)
+    if workers > 1 and mode not in _PARALLEL_IMPORT_MODES:
+        raise ApiContractError(
+            code=ErrorCode.ERR_VALIDATION,
+            message="Only merge and idempotent imports can use several workers.",
+        )
+    body = LimitedDecompressedReader(
+        body_file,
+        parse_content_encoding(request.headers.get("content-encoding")),
+        get_settings().import_max_bytes,
+    )
+    import_stream = ImportStream(body, mode)
 
     try:
-        with db_session.begin():
-            for type_item in payload.types:
-                stage_delta_by_name = _build_stage_delta_map(type_item)
-                target_type = _resolve_type_for_import(db_session, type_item.name)
-                _apply_import_stage_deltas(db_session, target_type.id, stage_delta_by_name)
-                _append_import_history(db_session, target_type.id, type_item)
+        # Types are applied as they are parsed; any later error, including
+        # malformed JSON near the end of the body, rolls back the whole import.
+        if workers > 1:
+            apply_parallel_import(db_session, import_stream, mode, workers)
+        else:
+            with db_session.begin():
+                hold_write_lock(db_session)
+                if mode == ImportMode.DELTA:
+                    apply_delta_import(db_session, import_stream)
+                elif mode == ImportMode.REPLACE:
+                    apply_replace_import(db_session, import_stream)
+                else:
+                    apply_merge_import(db_session, import_stream, mode=mode)
     except ApiContractError:
         raise
     except IntegrityError as error:
@@ -481,4 +1547,62 @@ def import_state(
             message="Import payload is invalid.",
         ) from error
 
+    record_import(mode.value, import_stream.type_count, import_stream.history_row_count)
+    if mode == ImportMode.REPLACE:
+        with db_session.begin():
+            analyze_import_tables(db_session)
+    remember_write_position(db_session, response)
     return ImportResponse(status="ok")
+
+
+@router.post(
+    "/imports",
+    tags=["import-export"],
+    response_model=ImportJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def create_import_job(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    _size_check: None = Depends(_check_payload_size),
+    body_path: Path = Depends(_spool_import_job_body),
+    mode: ImportMode = ImportMode.MERGE,
+    commit: ImportCommitMode = ImportCommitMode.SINGLE,
+    db_session: Session = Depends(get_db_session),
+) -> ImportJobResponse:
+    if commit == ImportCommitMode.CHUNKED and mode in _SINGLE_COMMIT_IMPORT_MODES:
+        raise ApiContractError(
+            code=ErrorCode.ERR_VALIDATION,
+            message="Delta and replace imports can only be committed at once.",
+        )
+    content_encoding = parse_content_encoding(request.headers.get("content-encoding"))
+    settings = get_settings()
+
+    with db_session.begin():
+        job = ImportJob(
+            mode=mode.value,
+            commit_mode=commit.value,
+            status=ImportJobStatus.PENDING.value,
+            content_encoding=content_encoding.value if content_encoding else None,
+            body_bytes=body_path.stat().st_size,
+        )
+        db_session.add(job)
+        db_session.flush()
+    os.replace(body_path, import_body_path(settings.import_jobs_dir, job.id))
+
+    _dispatch_import_job(background_tasks, settings, job.id)
+    return _build_import_job_response(job, [])
+
+
+@router.get("/imports/{job_id}", tags=["import-export"], response_model=ImportJobResponse)
+def get_import_job(
+    job_id: int,
+    db_session: Session = Depends(get_db_session),
+) -> ImportJobResponse:
+    job = db_session.get(ImportJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found.")
+    type_results = db_session.execute(
+        select(ImportJobType).where(ImportJobType.job_id == job_id).order_by(ImportJobType.position)
+    ).scalars()
+    return _build_import_job_response(job, type_results)
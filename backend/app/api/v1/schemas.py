@@ -1,17 +1,35 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
+from enum import StrEnum
 
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from app.domain.stages import StageCode
 
+# ``<last history_logs.id>.<last miniature_types.change_seq>``
+DELTA_TOKEN_PATTERN = r"^\d{1,19}\.\d{1,19}$"
+IMPORT_MAX_TYPES = 1000
+IMPORT_MAX_WORKERS = 8
+
 
 class ApiStatusResponse(BaseModel):
     status: str
     version: str
 
 
+class PoolStatusResponse(BaseModel):
+    size: int
+    max_overflow: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+    timeouts: int
+
+
 class ErrorResponse(BaseModel):
     code: str
     message: str
@@ -60,6 +78,99 @@ class TypeHistoryResponse(BaseModel):
     items: list[TypeHistoryGroup]
 
 
+class ActivityItem(BaseModel):
+    id: int
+    type_id: int
+    type_name: str
+    from_stage: StageCode
+    to_stage: StageCode
+    qty: int
+    created_at: datetime
+
+
+class ActivityResponse(BaseModel):
+    items: list[ActivityItem]
+    next_cursor: str | None
+
+
+class ConsistencyDiscrepancyItem(BaseModel):
+    type_id: int
+    type_name: str
+    stage: StageCode
+    actual: int
+    expected: int
+    detected_at: datetime
+
+
+class ConsistencyReportResponse(BaseModel):
+    last_run_at: datetime | None
+    history_high_water_mark: int
+    checked_types: int
+    discrepancies: list[ConsistencyDiscrepancyItem]
+
+
+class FlowBucketSize(StrEnum):
+    DAY = "day"
+    WEEK = "week"
+
+
+class FlowStatsBucket(BaseModel):
+    start: date
+    counts: TypeStageCounts
+
+
+class FlowStatsResponse(BaseModel):
+    bucket: FlowBucketSize
+    type_id: int | None
+    items: list[FlowStatsBucket]
+
+
+class ExportFormat(StrEnum):
+    JSON = "json"
+    NDJSON = "ndjson"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+class ExportTable(StrEnum):
+    TYPES = "types"
+    HISTORY = "history"
+
+
+class ExportJobStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    EXPIRED = "expired"
+
+
+class ExportJobCreateRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    format: ExportFormat = ExportFormat.JSON
+
+    @model_validator(mode="after")
+    def validate_document_format(self) -> "ExportJobCreateRequest":
+        if self.format not in (ExportFormat.JSON, ExportFormat.NDJSON):
+            raise ValueError("export jobs support json and ndjson only")
+        return self
+
+
+class ExportJobResponse(BaseModel):
+    id: int
+    format: ExportFormat
+    status: ExportJobStatus
+    data_revision: str | None
+    total_types: int | None
+    exported_types: int
+    artifact_bytes: int | None
+    error: str | None
+    created_at: datetime
+    finished_at: datetime | None
+    download_url: str | None
+
+
 class ExportStageCount(BaseModel):
     stage: StageCode
     count: int
@@ -82,6 +193,11 @@ class ExportResponse(BaseModel):
     types: list[ExportTypeItem]
 
 
+class DeltaExportResponse(ExportResponse):
+    since: str
+    token: str
+
+
 class ImportStageCount(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -118,8 +234,62 @@ class ImportTypeItem(BaseModel):
 class ImportRequest(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
-    types: list[ImportTypeItem] = Field(max_length=1000)
+    types: list[ImportTypeItem] = Field(max_length=IMPORT_MAX_TYPES)
+
+
+class DeltaImportRequest(ImportRequest):
+    since: str = Field(pattern=DELTA_TOKEN_PATTERN)
+    token: str = Field(pattern=DELTA_TOKEN_PATTERN)
+
+
+class ImportMode(StrEnum):
+    MERGE = "merge"
+    DELTA = "delta"
+    IDEMPOTENT = "idempotent"
+    REPLACE = "replace"
 
 
 class ImportResponse(BaseModel):
     status: str
+
+
+class ImportCommitMode(StrEnum):
+    SINGLE = "single"
+    CHUNKED = "chunked"
+
+
+class ImportJobStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ImportTypeOutcome(StrEnum):
+    PENDING = "pending"
+    APPLIED = "applied"
+    SKIPPED = "skipped"
+    ROLLED_BACK = "rolled_back"
+
+
+class ImportJobTypeResult(BaseModel):
+    position: int
+    name: str
+    history_rows: int
+    outcome: ImportTypeOutcome
+
+
+class ImportJobResponse(BaseModel):
+    id: int
+    mode: ImportMode
+    commit_mode: ImportCommitMode
+    status: ImportJobStatus
+    processed_types: int
+    processed_rows: int
+    rows_per_second: float | None
+    error_code: str | None
+    error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+    types: list[ImportJobTypeResult]
@@ -1,4 +1,29 @@
 from app.db.base import Base
-from app.db.models import HistoryLog, MiniatureType, StageCount
+from app.db.models import (
+    ConsistencyCheckState,
+    ConsistencyDiscrepancy,
+    DataRevision,
+    ExportJob,
+    HistoryLog,
+    ImportJob,
+    ImportJobType,
+    MiniatureType,
+    StageCount,
+    StageCountAdjustment,
+    StageCountSnapshot,
+)
 
-__all__ = ["Base", "HistoryLog", "MiniatureType", "StageCount"]
+__all__ = [
+    "Base",
+    "ConsistencyCheckState",
+    "ConsistencyDiscrepancy",
+    "DataRevision",
+    "ExportJob",
+    "HistoryLog",
+    "ImportJob",
+    "ImportJobType",
+    "MiniatureType",
+    "StageCount",
+    "StageCountAdjustment",
+    "StageCountSnapshot",
+]
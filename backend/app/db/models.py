@@ -1,29 +1,57 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Any, ClassVar
 
 from sqlalchemy import (
+    BigInteger,
     CheckConstraint,
-    DateTime,
+    FetchedValue,
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     String,
     UniqueConstraint,
     func,
+    text,
 )
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
+from app.db.types import UtcDateTime
 from app.domain.stages import STAGES_SQL_LIST
 
 
 class MiniatureType(Base):
     __tablename__ = "miniature_types"
-    __table_args__ = (UniqueConstraint("name", name="uq_miniature_types_name"),)
+    __table_args__ = (
+        UniqueConstraint("name", name="uq_miniature_types_name"),
+        Index("ix_miniature_types_change_seq", "change_seq"),
+        Index(
+            "ix_miniature_types_name_pattern",
+            "name",
+            postgresql_ops={"name": "varchar_pattern_ops"},
+        ),
+    )
+    # SQLite fills ``change_seq`` and ``created_at`` in insert triggers, after
+    # RETURNING has read them, so the ORM loads them on access instead.
+    __mapper_args__: ClassVar[dict[str, Any]] = {"eager_defaults": False}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Assigned from ``miniature_types_change_seq`` on insert and re-drawn by
+    # imports, so delta exports can find types whose counts were rewritten.
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=FetchedValue()
+    )
+    # Imports and restores move it back to the earliest history row they load,
+    # so ``as_of`` queries list a type from the first moment it has data.
+    created_at: Mapped[datetime] = mapped_column(
+        UtcDateTime(),
+        nullable=False,
+        server_default=func.now(),
+    )
 
 
 class StageCount(Base):
@@ -50,6 +78,20 @@ class HistoryLog(Base):
     __tablename__ = "history_logs"
     __table_args__ = (
         Index("ix_history_logs_type_id_created_at", "type_id", "created_at"),
+        Index(
+            "uq_history_logs_event_hash",
+            "event_hash",
+            unique=True,
+            postgresql_where=text("event_hash IS NOT NULL"),
+            sqlite_where=text("event_hash IS NOT NULL"),
+        ),
+        Index(
+            "ix_history_logs_created_at_type_id_to_stage",
+            "created_at",
+            "type_id",
+            "to_stage",
+            postgresql_include=["qty"],
+        ),
         CheckConstraint(
             f"from_stage IN ({STAGES_SQL_LIST})", name="ck_history_logs_from_stage_valid"
         ),
@@ -66,7 +108,246 @@ class HistoryLog(Base):
     to_stage: Mapped[str] = mapped_column(String(32), nullable=False)
     qty: Mapped[int] = mapped_column(Integer, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
+        UtcDateTime(),
+        nullable=False,
+        server_default=func.now(),
+    )
+    # Set only by idempotent imports, see app.api.v1.importing.history_event_hashes.
+    event_hash: Mapped[bytes | None] = mapped_column(LargeBinary(32), nullable=True)
+
+
+Index(
+    "ix_history_logs_created_at_id_desc",
+    HistoryLog.created_at.desc(),
+    HistoryLog.id.desc(),
+)
+
+
+class DataRevision(Base):
+    __tablename__ = "data_revisions"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    bulk_revision: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
+    applied_delta_token: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
+
+class StageCountSnapshot(Base):
+    __tablename__ = "stage_count_snapshots"
+    __table_args__ = (
+        UniqueConstraint("type_id", "taken_at", name="uq_stage_count_snapshots_type_taken_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    type_id: Mapped[int] = mapped_column(
+        ForeignKey("miniature_types.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    taken_at: Mapped[datetime] = mapped_column(
+        UtcDateTime(),
+        nullable=False,
+        server_default=func.now(),
+    )
+    in_box: Mapped[int] = mapped_column(Integer, nullable=False)
+    building: Mapped[int] = mapped_column(Integer, nullable=False)
+    priming: Mapped[int] = mapped_column(Integer, nullable=False)
+    painting: Mapped[int] = mapped_column(Integer, nullable=False)
+    done: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class StageCountAdjustment(Base):
+    """Ledger of stage count changes that are not backed by ``history_logs``.
+
+    Together with the net history flow it must add up to ``stage_counts``.
+    """
+
+    __tablename__ = "stage_count_adjustments"
+    __table_args__ = (
+        Index("ix_stage_count_adjustments_type_id", "type_id"),
+        CheckConstraint(
+            f"stage_name IN ({STAGES_SQL_LIST})",
+            name="ck_stage_count_adjustments_stage_name_valid",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    type_id: Mapped[int] = mapped_column(
+        ForeignKey("miniature_types.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    stage_name: Mapped[str] = mapped_column(String(32), nullable=False)
+    delta: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        UtcDateTime(),
         nullable=False,
         server_default=func.now(),
     )
+
+
+class ConsistencyCheckState(Base):
+    __tablename__ = "consistency_checks"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    history_high_water_mark: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
+    adjustment_high_water_mark: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
+    sweep_type_id: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    last_run_at: Mapped[datetime | None] = mapped_column(UtcDateTime(), nullable=True)
+    last_checked_types: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    # History and ledger rows at or below these ids are summed into
+    # ``consistency_expected_counts``.
+    totals_history_mark: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
+    totals_adjustment_mark: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
+    # The maxima seen while transactions below ``pending_xmax`` were still in
+    # flight; they become the totals marks once all of those have finished.
+    pending_history_mark: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
+    pending_adjustment_mark: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
+    pending_xmax: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
+
+
+class ConsistencyDiscrepancy(Base):
+    __tablename__ = "consistency_discrepancies"
+
+    type_id: Mapped[int] = mapped_column(
+        ForeignKey("miniature_types.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    stage_name: Mapped[str] = mapped_column(String(32), primary_key=True)
+    actual: Mapped[int] = mapped_column(Integer, nullable=False)
+    expected: Mapped[int] = mapped_column(Integer, nullable=False)
+    detected_at: Mapped[datetime] = mapped_column(
+        UtcDateTime(),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+
+class ConsistencyExpectedCount(Base):
+    """Running per-stage net flow of a type's summed history and ledger rows."""
+
+    __tablename__ = "consistency_expected_counts"
+
+    type_id: Mapped[int] = mapped_column(
+        ForeignKey("miniature_types.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    stage_name: Mapped[str] = mapped_column(String(32), primary_key=True)
+    expected: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+    __table_args__ = (
+        Index("ix_export_jobs_format_data_revision", "format", "data_revision"),
+        CheckConstraint(
+            "status IN ('pending', 'running', 'completed', 'failed', 'expired')",
+            name="ck_export_jobs_status_valid",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    format: Mapped[str] = mapped_column(String(16), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    data_revision: Mapped[str | None] = mapped_column(String(96), nullable=True)
+    total_types: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    exported_types: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    artifact_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    error: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        UtcDateTime(),
+        nullable=False,
+        server_default=func.now(),
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        UtcDateTime(),
+        nullable=False,
+        server_default=func.now(),
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(UtcDateTime(), nullable=True)
+
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending', 'running', 'completed', 'failed')",
+            name="ck_import_jobs_status_valid",
+        ),
+        CheckConstraint(
+            "mode IN ('merge', 'delta', 'idempotent', 'replace')",
+            name="ck_import_jobs_mode_valid",
+        ),
+        CheckConstraint(
+            "commit_mode IN ('single', 'chunked')", name="ck_import_jobs_commit_mode_valid"
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    mode: Mapped[str] = mapped_column(String(16), nullable=False)
+    commit_mode: Mapped[str] = mapped_column(String(16), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    content_encoding: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    body_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    processed_types: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    processed_rows: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
+    error_code: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    error: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        UtcDateTime(),
+        nullable=False,
+        server_default=func.now(),
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        UtcDateTime(),
+        nullable=False,
+        server_default=func.now(),
+    )
+    started_at: Mapped[datetime | None] = mapped_column(UtcDateTime(), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(UtcDateTime(), nullable=True)
+
+
+class ImportJobType(Base):
+    """Outcome of one ``types`` item of an import job, in body order."""
+
+    __tablename__ = "import_job_types"
+    __table_args__ = (
+        UniqueConstraint("job_id", "position", name="uq_import_job_types_job_position"),
+        CheckConstraint(
+            "outcome IN ('pending', 'applied', 'skipped', 'rolled_back')",
+            name="ck_import_job_types_outcome_valid",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_id: Mapped[int] = mapped_column(
+        ForeignKey("import_jobs.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    history_rows: Mapped[int] = mapped_column(Integer, nullable=False)
+    outcome: Mapped[str] = mapped_column(String(16), nullable=False)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Final
+
+from sqlalchemy import Connection, Engine, event
+from sqlalchemy.engine import ExceptionContext
+
+_STARTED_AT_KEY: Final[str] = "query_stats_started_at"
+
+
+@dataclass(slots=True)
+class QueryStats:
+    """SQL statements run on behalf of one request and the time spent in them."""
+
+    count: int = 0
+    duration_seconds: float = 0.0
+
+
+_current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+@contextmanager
+def collect_query_stats() -> Iterator[QueryStats]:
+    """Count the statements run in this context until the block exits.
+
+    Threads started with a copy of the context, like the pool FastAPI runs
+    sync endpoints on, add to the same stats; the worker connections of a
+    parallel import run outside it and are not counted.
+    """
+    stats = QueryStats()
+    token = _current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_query_stats.reset(token)
+
+
+def track_query_stats(engine: Engine) -> None:
+    """Add each statement ``engine`` executes to the stats being collected."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(connection: Connection, *_args: Any) -> None:
+        if _current_query_stats.get() is not None:
+            connection.info.setdefault(_STARTED_AT_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(connection: Connection, *_args: Any) -> None:
+        stats = _current_query_stats.get()
+        started_at = connection.info.get(_STARTED_AT_KEY)
+        if stats is None or not started_at:
+            return
+        stats.count += 1
+        stats.duration_seconds += time.perf_counter() - started_at.pop()
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context: ExceptionContext) -> None:
+        # A failed statement never reaches ``after_cursor_execute``.
+        if context.connection is not None:
+            started_at = context.connection.info.get(_STARTED_AT_KEY)
+            if started_at:
+                started_at.pop()
@@ -1,22 +1,203 @@
 from __future__ import annotations
 
+import threading
+import time
 from collections.abc import Generator
+from dataclasses import dataclass
 from functools import lru_cache
+from typing import Any, Final
 
-from sqlalchemy import create_engine
+from sqlalchemy import Connection, Engine, create_engine, event, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import ConnectionPoolEntry, QueuePool
 
-from app.config import get_settings
+from app.config import Settings, get_settings
+from app.db.query_stats import track_query_stats
+from app.metrics import (
+    DB_POOL_CAPACITY,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_TIMEOUTS,
+    DB_POOL_CHECKOUT_WAIT,
+)
+
+_SQLITE_BEGIN_IMMEDIATE: Final[str] = "sqlite_begin_immediate"
+
+
+@dataclass(frozen=True, slots=True)
+class PoolCheckoutStats:
+    checkouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+    timeouts: int
+
+
+class MonitoredQueuePool(QueuePool):
+    """``QueuePool`` that records how long checkouts take and how many time out.
+
+    A checkout's time covers waiting for a free connection and, within the
+    overflow, opening a new one; that is what a request spends before its
+    first query.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        self._timeouts = 0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started_at = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            waited = time.perf_counter() - started_at
+            DB_POOL_CHECKOUT_WAIT.observe(waited)
+            if timed_out:
+                DB_POOL_CHECKOUT_TIMEOUTS.inc()
+            with self._stats_lock:
+                self._checkouts += 1
+                self._wait_seconds_total += waited
+                self._wait_seconds_max = max(self._wait_seconds_max, waited)
+                if timed_out:
+                    self._timeouts += 1
+
+    def checkout_stats(self) -> PoolCheckoutStats:
+        with self._stats_lock:
+            return PoolCheckoutStats(
+                checkouts=self._checkouts,
+                wait_seconds_total=self._wait_seconds_total,
+                wait_seconds_max=self._wait_seconds_max,
+                timeouts=self._timeouts,
+            )
+
+
+def _pool_options(database_url: str, settings: Settings) -> dict[str, Any]:
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection; keep SQLAlchemy's pool.
+        return {}
+    return {
+        "poolclass": MonitoredQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_use_lifo": settings.db_pool_use_lifo,
+    }
+
+
+def _connect_args(database_url: str, settings: Settings) -> dict[str, Any]:
+    if make_url(database_url).get_driver_name() != "psycopg":
+        return {}
+    threshold = settings.db_prepare_threshold
+    return {"prepare_threshold": None if threshold < 0 else threshold}
+
+
+def _configure_sqlite(engine: Engine, settings: Settings) -> None:
+    """Tune every SQLite connection and let SQLAlchemy emit ``BEGIN`` itself.
+
+    pysqlite defers ``BEGIN`` until the first write of a transaction; with
+    that turned off, the ``begin`` event starts every transaction, which lets
+    ``hold_write_lock`` make it ``BEGIN IMMEDIATE``.
+    """
+    pragmas = (
+        "PRAGMA journal_mode = WAL",
+        f"PRAGMA synchronous = {settings.sqlite_synchronous}",
+        f"PRAGMA cache_size = -{settings.sqlite_cache_size_kib}",
+        f"PRAGMA mmap_size = {settings.sqlite_mmap_size_bytes}",
+        f"PRAGMA busy_timeout = {settings.sqlite_busy_timeout_ms}",
+        "PRAGMA foreign_keys = ON",
+    )
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection: Any, _connection_record: Any) -> None:
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(connection: Connection) -> None:
+        immediate = connection.get_execution_options().get(_SQLITE_BEGIN_IMMEDIATE, False)
+        connection.exec_driver_sql("BEGIN IMMEDIATE" if immediate else "BEGIN")
+
+
+def _track_pool_metrics(engine: Engine, database: str, settings: Settings) -> None:
+    if isinstance(engine.pool, QueuePool):
+        DB_POOL_CAPACITY.labels(database).set(settings.db_pool_size + settings.db_max_overflow)
+    checked_out = DB_POOL_CHECKED_OUT.labels(database)
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(*_args: Any) -> None:
+        checked_out.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(*_args: Any) -> None:
+        checked_out.dec()
+
+
+@lru_cache
+def _build_engine(database_url: str) -> Engine:
+    settings = get_settings()
+    engine = create_engine(
+        database_url,
+        future=True,
+        connect_args=_connect_args(database_url, settings),
+        **_pool_options(database_url, settings),
+    )
+    if engine.dialect.name == "sqlite":
+        _configure_sqlite(engine, settings)
+    track_query_stats(engine)
+    database = "primary" if database_url == settings.database_url else "replica"
+    _track_pool_metrics(engine, database, settings)
+    return engine
 
 
 @lru_cache
 def _build_session_factory(database_url: str):
-    engine = create_engine(database_url, future=True)
-    return sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    return sessionmaker(
+        bind=_build_engine(database_url), autoflush=False, autocommit=False, future=True
+    )
+
+
+def get_engine() -> Engine:
+    return _build_engine(get_settings().database_url)
+
+
+def get_session_factory() -> sessionmaker[Session]:
+    return _build_session_factory(get_settings().database_url)
+
+
+def get_read_session_factory() -> sessionmaker[Session]:
+    """Sessions on the read replica, or on the primary when none is configured."""
+    settings = get_settings()
+    return _build_session_factory(settings.database_read_url or settings.database_url)
+
+
+def hold_write_lock(db_session: Session) -> None:
+    """Begin the session's transaction as a writer; call before its first query.
+
+    PostgreSQL orders writers that read before they write through row locks
+    (``FOR UPDATE``). SQLite ignores those and takes its single write lock at
+    the first write, after the transaction's reads, so there the transaction
+    starts with ``BEGIN IMMEDIATE`` and waits for other writers up front.
+    """
+    db_session.connection(execution_options={_SQLITE_BEGIN_IMMEDIATE: True})
 
 
 def get_db_session() -> Generator[Session, None, None]:
-    session_factory = _build_session_factory(get_settings().database_url)
+    session_factory = get_session_factory()
     db = session_factory()
     try:
         yield db
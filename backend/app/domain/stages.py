@@ -17,6 +17,13 @@ STAGES: Final[tuple[str, str, str, str, str]] = tuple(stage.value for stage in S
 FINAL_STAGE: Final[str] = "DONE"
 STAGES_SQL_LIST: Final[str] = ", ".join(f"'{stage}'" for stage in STAGES)
 STAGE_INDEX: Final[dict[str, int]] = {stage.value: idx for idx, stage in enumerate(StageCode)}
+STAGE_COUNT_FIELD_BY_STAGE: Final[dict[StageCode, str]] = {
+    StageCode.IN_BOX: "in_box",
+    StageCode.BUILDING: "building",
+    StageCode.PRIMING: "priming",
+    StageCode.PAINTING: "painting",
+    StageCode.DONE: "done",
+}
 
 
 def is_forward_transition(from_stage: StageCode, to_stage: StageCode) -> bool:
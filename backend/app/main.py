@@ -1,11 +1,23 @@
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.request_metrics import RequestMetricsMiddleware
+from app.api.server_timing import ServerTimingMiddleware
 from app.api.v1.errors import register_api_exception_handlers
 from app.api.v1.router import router as api_v1_router
 from app.config import get_settings
+from app.metrics import METRICS_CONTENT_TYPE, mark_process_dead, render_metrics
+from app.workers import (
+    recover_interrupted_work,
+    shutdown_export_executor,
+    shutdown_import_executor,
+    start_background_workers,
+    stop_background_workers,
+)
 
 
 def create_app() -> FastAPI:
@@ -16,7 +28,19 @@ def create_app() -> FastAPI:
         format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
     )
 
-    app = FastAPI(title="Miniatures Progress Tracker API", version="0.1.0")
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+        recover_interrupted_work(settings)
+        workers = start_background_workers(settings)
+        try:
+            yield
+        finally:
+            stop_background_workers(workers)
+            shutdown_export_executor()
+            shutdown_import_executor()
+            mark_process_dead()
+
+    app = FastAPI(title="Miniatures Progress Tracker API", version="0.1.0", lifespan=lifespan)
     register_api_exception_handlers(app)
     app.add_middleware(
         CORSMiddleware,
@@ -25,6 +49,12 @@ def create_app() -> FastAPI:
         allow_methods=["GET", "POST", "OPTIONS"],
         allow_headers=["*"],
     )
+    app.add_middleware(
+        ServerTimingMiddleware,
+        log_threshold=settings.query_count_log_threshold,
+        route_log_thresholds=settings.query_count_log_route_thresholds,
+    )
+    app.add_middleware(RequestMetricsMiddleware)
 
     app.include_router(api_v1_router, prefix="/api/v1")
 
@@ -32,6 +62,10 @@ def create_app() -> FastAPI:
     def health() -> dict[str, str]:
         return {"status": "ok", "env": settings.app_env}
 
+    @app.get("/metrics", tags=["system"], response_class=Response)
+    def metrics() -> Response:
+        return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
     return app
 
 
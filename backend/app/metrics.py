@@ -0,0 +1,157 @@
+"""Prometheus metrics of the API process and its background job processes.
+
+Updating a metric only touches a value owned by the current process, which
+keeps it cheap on every request. When ``PROMETHEUS_MULTIPROC_DIR`` is set
+before the app is imported, every process (uvicorn workers and the job pools
+they spawn) writes its values to files there and ``GET /metrics`` reports
+them aggregated across processes; the directory must be emptied before the
+server starts. Without it, ``/metrics`` covers only the process that answers.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Mapping
+from typing import Final
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+METRICS_CONTENT_TYPE: Final[str] = CONTENT_TYPE_LATEST
+_MULTIPROCESS_DIR_ENV: Final[str] = "PROMETHEUS_MULTIPROC_DIR"
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request until its response is complete.",
+    ["method", "handler"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+REQUESTS = Counter(
+    "http_requests",
+    "Completed requests by endpoint and status code.",
+    ["method", "handler", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests being handled right now.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+API_CONTRACT_ERRORS = Counter(
+    "api_contract_errors",
+    "Contract error responses by error code.",
+    ["code"],
+)
+
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_connections_capacity",
+    "Pool size plus overflow of one process's engine.",
+    ["database"],
+    multiprocess_mode="max",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_connections_checked_out",
+    "Connections handed out by the pool and not yet returned.",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to get a connection from a pool, including opening one within the overflow.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts",
+    "Checkouts that gave up after the pool timeout.",
+)
+
+STAGE_MOVES = Counter(
+    "stage_moves",
+    "Committed moves between stages.",
+    ["from_stage", "to_stage"],
+)
+STAGE_MOVED_ITEMS = Counter(
+    "stage_moved_items",
+    "Miniatures moved by committed moves.",
+    ["from_stage", "to_stage"],
+)
+MOVE_LOCK_WAIT = Histogram(
+    "move_lock_wait_seconds",
+    "Time a move spends taking its locks on the type's stage counts.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+IMPORTED_TYPES = Counter(
+    "imported_types",
+    "Type items of committed imports.",
+    ["mode"],
+)
+IMPORTED_HISTORY_ROWS = Counter(
+    "imported_history_rows",
+    "History events of committed imports.",
+    ["mode"],
+)
+
+FLOW_CACHE_BUCKETS = Counter(
+    "flow_cache_buckets",
+    "Flow stats buckets looked up in the closed-bucket cache, by result (hit or miss).",
+    ["result"],
+)
+EXPORT_JOB_LOOKUPS = Counter(
+    "export_job_lookups",
+    "Export job requests, by whether an existing job was reused (hit) or created (miss).",
+    ["result"],
+)
+
+CONSISTENCY_DISCREPANCIES = Gauge(
+    "consistency_discrepancies",
+    "Stage counts that disagree with their history as of the last consistency check.",
+    ["stage"],
+    multiprocess_mode="mostrecent",
+)
+CONSISTENCY_LAST_RUN = Gauge(
+    "consistency_check_last_run_timestamp_seconds",
+    "Unix time at which the last consistency check committed.",
+    multiprocess_mode="mostrecent",
+)
+CONSISTENCY_CHECK_DURATION = Histogram(
+    "consistency_check_duration_seconds",
+    "Time a consistency check takes, including its commit.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
+
+def record_import(mode: str, type_count: int, history_row_count: int) -> None:
+    IMPORTED_TYPES.labels(mode).inc(type_count)
+    IMPORTED_HISTORY_ROWS.labels(mode).inc(history_row_count)
+
+
+def record_consistency_check(
+    discrepancies_by_stage: Mapping[str, int], duration_seconds: float
+) -> None:
+    for stage, discrepancies in discrepancies_by_stage.items():
+        CONSISTENCY_DISCREPANCIES.labels(stage).set(discrepancies)
+    CONSISTENCY_LAST_RUN.set_to_current_time()
+    CONSISTENCY_CHECK_DURATION.observe(duration_seconds)
+
+
+def render_metrics() -> bytes:
+    """All metrics in the Prometheus text exposition format."""
+    if os.environ.get(_MULTIPROCESS_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead() -> None:
+    """Drop this process's live gauges from the aggregate; call on shutdown."""
+    if os.environ.get(_MULTIPROCESS_DIR_ENV):
+        multiprocess.mark_process_dead(os.getpid())
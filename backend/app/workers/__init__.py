@@ -0,0 +1,17 @@
+from app.workers.exports import shutdown_export_executor
+from app.workers.imports import shutdown_import_executor
+from app.workers.lifecycle import (
+    recover_interrupted_work,
+    start_background_workers,
+    stop_background_workers,
+)
+from app.workers.periodic import PeriodicWorker
+
+__all__ = [
+    "PeriodicWorker",
+    "recover_interrupted_work",
+    "shutdown_export_executor",
+    "shutdown_import_executor",
+    "start_background_workers",
+    "stop_background_workers",
+]
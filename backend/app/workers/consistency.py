@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    text,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models import (
+    ConsistencyCheckState,
+    ConsistencyDiscrepancy,
+    ConsistencyExpectedCount,
+    HistoryLog,
+    MiniatureType,
+    StageCount,
+    StageCountAdjustment,
+)
+from app.db.session import hold_write_lock
+from app.domain.stages import STAGES
+from app.metrics import record_consistency_check
+
+logger = logging.getLogger(__name__)
+
+_CONSISTENCY_LOCK_KEY = "consistency_checks"
+TOUCHED_TYPES_CHUNK_SIZE = 1_000
+
+
+@dataclass
+class ConsistencyRunResult:
+    checked_types: int
+    discrepancies: int
+    # Every open discrepancy after the run, not only those it found.
+    discrepancies_by_stage: dict[str, int]
+
+
+def _read_high_water_marks(db_session: Session) -> tuple[int, int, tuple[int, int] | None]:
+    """Read the id maxima and, on PostgreSQL, the bounds of the same snapshot.
+
+    The snapshot's ``xmin`` and ``xmax`` tell which transactions were still in
+    flight while the maxima were read; see ``_advance_running_totals``.
+    """
+    columns = [
+        select(func.coalesce(func.max(HistoryLog.id), 0)).scalar_subquery(),
+        select(func.coalesce(func.max(StageCountAdjustment.id), 0)).scalar_subquery(),
+    ]
+    if db_session.get_bind().dialect.name == "postgresql":
+        columns.extend(
+            literal_column(f"pg_snapshot_{bound}(pg_current_snapshot())::text::bigint")
+            for bound in ("xmin", "xmax")
+        )
+    history_high_water_mark, adjustment_high_water_mark, *snapshot = db_session.execute(
+        select(*columns)
+    ).one()
+    snapshot_bounds = (snapshot[0], snapshot[1]) if snapshot else None
+    return history_high_water_mark, adjustment_high_water_mark, snapshot_bounds
+
+
+def _load_touched_type_ids(
+    db_session: Session, state: ConsistencyCheckState, sweep_batch_size: int
+) -> tuple[set[int], int]:
+    # Every row above the totals marks may have become visible since the last
+    # run, including rows of long imports that committed below newer ids.
+    touched = set(
+        db_session.execute(
+            union_all(
+                select(HistoryLog.type_id).where(HistoryLog.id > state.totals_history_mark),
+                select(StageCountAdjustment.type_id).where(
+                    StageCountAdjustment.id > state.totals_adjustment_mark
+                ),
+            )
+        ).scalars()
+    )
+
+    sweep_type_ids = list(
+        db_session.execute(
+            select(MiniatureType.id)
+            .where(MiniatureType.id > state.sweep_type_id)
+            .order_by(MiniatureType.id.asc())
+            .limit(sweep_batch_size)
+        ).scalars()
+    )
+    touched.update(sweep_type_ids)
+    next_sweep_type_id = sweep_type_ids[-1] if len(sweep_type_ids) == sweep_batch_size else 0
+    return touched, next_sweep_type_id
+
+
+def _flow_selects(
+    history_criteria: Sequence[ColumnElement[bool]],
+    adjustment_criteria: Sequence[ColumnElement[bool]],
+) -> tuple[Select[Any], ...]:
+    """Per-stage deltas of the matching history and ledger rows."""
+    return (
+        select(
+            HistoryLog.type_id,
+            HistoryLog.to_stage.label("stage_name"),
+            HistoryLog.qty.label("delta"),
+        ).where(*history_criteria),
+        select(
+            HistoryLog.type_id,
+            HistoryLog.from_stage.label("stage_name"),
+            (-HistoryLog.qty).label("delta"),
+        ).where(*history_criteria),
+        select(
+            StageCountAdjustment.type_id,
+            StageCountAdjustment.stage_name,
+            StageCountAdjustment.delta,
+        ).where(*adjustment_criteria),
+    )
+
+
+def _find_discrepancies(
+    db_session: Session, state: ConsistencyCheckState, type_ids: list[int]
+) -> list[tuple[int, str, int, int]]:
+    flows = union_all(
+        select(
+            ConsistencyExpectedCount.type_id,
+            ConsistencyExpectedCount.stage_name,
+            ConsistencyExpectedCount.expected.label("delta"),
+        ).where(ConsistencyExpectedCount.type_id.in_(type_ids)),
+        *_flow_selects(
+            (HistoryLog.type_id.in_(type_ids), HistoryLog.id > state.totals_history_mark),
+            (
+                StageCountAdjustment.type_id.in_(type_ids),
+                StageCountAdjustment.id > state.totals_adjustment_mark,
+            ),
+        ),
+    ).subquery("flows")
+    expected = (
+        select(
+            flows.c.type_id,
+            flows.c.stage_name,
+            func.sum(flows.c.delta).label("expected"),
+        )
+        .group_by(flows.c.type_id, flows.c.stage_name)
+        .subquery("expected")
+    )
+    expected_count = func.coalesce(expected.c.expected, literal(0))
+    stmt = (
+        select(StageCount.type_id, StageCount.stage_name, StageCount.count, expected_count)
+        .outerjoin(
+            expected,
+            (expected.c.type_id == StageCount.type_id)
+            & (expected.c.stage_name == StageCount.stage_name),
+        )
+        .where(StageCount.type_id.in_(type_ids), StageCount.count != expected_count)
+        .order_by(StageCount.type_id.asc(), StageCount.stage_name.asc())
+    )
+    return [(row[0], row[1], row[2], int(row[3])) for row in db_session.execute(stmt)]
+
+
+def _advance_running_totals(
+    db_session: Session,
+    state: ConsistencyCheckState,
+    history_high_water_mark: int,
+    adjustment_high_water_mark: int,
+    snapshot_bounds: tuple[int, int] | None,
+) -> None:
+    """Fold the rows that can no longer become visible late into the totals.
+
+    PostgreSQL draws ids before commit, so a long import may still hold ids
+    far below the maxima. The maxima of a run are therefore kept pending with
+    the snapshot's ``xmax`` and become the marks on the first later run whose
+    ``xmin`` shows that every transaction in flight back then has finished;
+    with nothing in flight they are final at once. Writers take their
+    transaction id before drawing ids: moves and imports lock their stage
+    counts first, and creates draw them in the inserting statement. SQLite
+    runs hold the write lock, so everything they see is final.
+    """
+    history_mark = state.totals_history_mark
+    adjustment_mark = state.totals_adjustment_mark
+    if snapshot_bounds is None:
+        history_mark, adjustment_mark = history_high_water_mark, adjustment_high_water_mark
+    else:
+        xmin, xmax = snapshot_bounds
+        if xmin >= state.pending_xmax:
+            history_mark = max(history_mark, state.pending_history_mark)
+            adjustment_mark = max(adjustment_mark, state.pending_adjustment_mark)
+            state.pending_history_mark = history_high_water_mark
+            state.pending_adjustment_mark = adjustment_high_water_mark
+            state.pending_xmax = xmax
+        if xmin >= xmax:
+            history_mark = max(history_mark, history_high_water_mark)
+            adjustment_mark = max(adjustment_mark, adjustment_high_water_mark)
+    flows = union_all(
+        *_flow_selects(
+            (HistoryLog.id > state.totals_history_mark, HistoryLog.id <= history_mark),
+            (
+                StageCountAdjustment.id > state.totals_adjustment_mark,
+                StageCountAdjustment.id <= adjustment_mark,
+            ),
+        )
+    ).subquery("flows")
+    added = db_session.execute(
+        select(flows.c.type_id, flows.c.stage_name, func.sum(flows.c.delta)).group_by(
+            flows.c.type_id, flows.c.stage_name
+        )
+    ).all()
+    if added:
+        dialect_insert = (
+            postgresql.insert
+            if db_session.get_bind().dialect.name == "postgresql"
+            else sqlite.insert
+        )
+        statement = dialect_insert(ConsistencyExpectedCount)
+        db_session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[
+                    ConsistencyExpectedCount.type_id,
+                    ConsistencyExpectedCount.stage_name,
+                ],
+                set_={"expected": ConsistencyExpectedCount.expected + statement.excluded.expected},
+            ),
+            [
+                {"type_id": type_id, "stage_name": stage_name, "expected": int(delta)}
+                for type_id, stage_name, delta in added
+            ],
+        )
+    state.totals_history_mark = history_mark
+    state.totals_adjustment_mark = adjustment_mark
+
+
+def reset_running_totals(db_session: Session) -> None:
+    """Drop the running totals after history or ledger rows were deleted."""
+    db_session.execute(delete(ConsistencyExpectedCount))
+    db_session.execute(
+        update(ConsistencyCheckState).values(
+            totals_history_mark=0,
+            totals_adjustment_mark=0,
+            pending_history_mark=0,
+            pending_adjustment_mark=0,
+            pending_xmax=0,
+        )
+    )
+
+
+def run_consistency_check(db_session: Session, sweep_batch_size: int) -> ConsistencyRunResult:
+    """Compare ``stage_counts`` against the history log for recently touched types.
+
+    Only plain reads run against ``stage_counts``, ``history_logs`` and the
+    adjustment ledger, so the check never waits on or blocks ``move_type``.
+    Expected counts come from the running totals plus the rows above their
+    marks, so a run reads only recent history rather than each type's whole.
+    """
+    state = db_session.get(ConsistencyCheckState, 1)
+    if state is None:
+        state = ConsistencyCheckState(id=1)
+        db_session.add(state)
+        db_session.flush()
+
+    history_high_water_mark, adjustment_high_water_mark, snapshot_bounds = _read_high_water_marks(
+        db_session
+    )
+    touched_type_ids, next_sweep_type_id = _load_touched_type_ids(
+        db_session, state, sweep_batch_size
+    )
+
+    ordered_type_ids = sorted(touched_type_ids)
+    found: list[tuple[int, str, int, int]] = []
+    for offset in range(0, len(ordered_type_ids), TOUCHED_TYPES_CHUNK_SIZE):
+        chunk = ordered_type_ids[offset : offset + TOUCHED_TYPES_CHUNK_SIZE]
+        found.extend(_find_discrepancies(db_session, state, chunk))
+        db_session.execute(
+            delete(ConsistencyDiscrepancy).where(ConsistencyDiscrepancy.type_id.in_(chunk))
+        )
+
+    if found:
+        db_session.execute(
+            insert(ConsistencyDiscrepancy),
+            [
+                {
+                    "type_id": type_id,
+                    "stage_name": stage_name,
+                    "actual": actual,
+                    "expected": expected,
+                }
+                for type_id, stage_name, actual, expected in found
+            ],
+        )
+
+    _advance_running_totals(
+        db_session, state, history_high_water_mark, adjustment_high_water_mark, snapshot_bounds
+    )
+    state.history_high_water_mark = history_high_water_mark
+    state.adjustment_high_water_mark = adjustment_high_water_mark
+    state.sweep_type_id = next_sweep_type_id
+    state.last_run_at = datetime.now(UTC)
+    state.last_checked_types = len(ordered_type_ids)
+    discrepancies_by_stage = dict.fromkeys(STAGES, 0)
+    discrepancies_by_stage.update(
+        db_session.execute(
+            select(ConsistencyDiscrepancy.stage_name, func.count()).group_by(
+                ConsistencyDiscrepancy.stage_name
+            )
+        ).all()
+    )
+    return ConsistencyRunResult(
+        checked_types=len(ordered_type_ids),
+        discrepancies=len(found),
+        discrepancies_by_stage=discrepancies_by_stage,
+    )
+
+
+def rebuild_adjustment_ledger(db_session: Session) -> None:
+    """Re-baseline the ledger after a bulk rewrite of counts and history.
+
+    Whatever the history does not explain becomes the new adjustment, dated
+    at the creation of its type, and the verifier restarts from the current
+    high-water marks with a clean report.
+    """
+    db_session.execute(delete(StageCountAdjustment))
+    db_session.execute(delete(ConsistencyDiscrepancy))
+    db_session.execute(
+        text(
+            """
+            INSERT INTO stage_count_adjustments (type_id, stage_name, delta, created_at)
+            SELECT
+                sc.type_id,
+                sc.stage_name,
+                sc.count - COALESCE(flows.net_qty, 0),
+                mt.created_at
+            FROM stage_counts sc
+            JOIN miniature_types mt ON mt.id = sc.type_id
+            LEFT JOIN (
+                SELECT type_id, stage_name, SUM(delta) AS net_qty
+                FROM (
+                    SELECT type_id, to_stage AS stage_name, qty AS delta FROM history_logs
+                    UNION ALL
+                    SELECT type_id, from_stage AS stage_name, -qty AS delta FROM history_logs
+                ) AS history_flows
+                GROUP BY type_id, stage_name
+            ) AS flows ON flows.type_id = sc.type_id AND flows.stage_name = sc.stage_name
+            WHERE sc.count - COALESCE(flows.net_qty, 0) <> 0
+            """
+        )
+    )
+    state = db_session.get(ConsistencyCheckState, 1, with_for_update=True)
+    if state is None:
+        state = ConsistencyCheckState(id=1)
+        db_session.add(state)
+    state.history_high_water_mark = db_session.execute(
+        select(func.coalesce(func.max(HistoryLog.id), 0))
+    ).scalar_one()
+    state.adjustment_high_water_mark = db_session.execute(
+        select(func.coalesce(func.max(StageCountAdjustment.id), 0))
+    ).scalar_one()
+    state.sweep_type_id = 0
+    db_session.flush()
+    reset_running_totals(db_session)
+
+
+def run_consistency_cycle(session_factory: sessionmaker[Session], sweep_batch_size: int) -> None:
+    started_at = time.perf_counter()
+    with session_factory() as db_session, db_session.begin():
+        hold_write_lock(db_session)
+        if db_session.get_bind().dialect.name == "postgresql":
+            db_session.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+            acquired = db_session.execute(
+                text("SELECT pg_try_advisory_xact_lock(hashtext(:key))"),
+                {"key": _CONSISTENCY_LOCK_KEY},
+            ).scalar_one()
+            if not acquired:
+                return
+
+        result = run_consistency_check(db_session, sweep_batch_size)
+
+    record_consistency_check(result.discrepancies_by_stage, time.perf_counter() - started_at)
+    if result.discrepancies:
+        logger.warning(
+            "Consistency check found %d stage count discrepancies across %d checked types",
+            result.discrepancies,
+            result.checked_types,
+        )
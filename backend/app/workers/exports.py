@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import BinaryIO, Final
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.v1.delta import read_data_revision
+from app.api.v1.exporting import iter_ndjson_chunks
+from app.api.v1.schemas import ExportFormat, ExportJobStatus
+from app.db.models import ExportJob, MiniatureType
+from app.db.session import get_session_factory
+from app.workers.pool import JobProcessPool
+
+logger = logging.getLogger(__name__)
+
+EXPORT_PROGRESS_INTERVAL_SECONDS: Final[float] = 1.0
+_ARTIFACT_SUFFIX_BY_FORMAT: Final[dict[ExportFormat, str]] = {
+    ExportFormat.JSON: "json",
+    ExportFormat.NDJSON: "ndjson",
+}
+
+_PARTIAL_ARTIFACT_NAME_RE: Final[re.Pattern[str]] = re.compile(r"export-(\d+)\.\w+\.partial")
+_INTERRUPTED_JOB_ERROR: Final[str] = "The process running the job stopped before it finished."
+
+_export_pool = JobProcessPool("Export")
+
+
+def export_artifact_path(export_dir: str, job_id: int, export_format: ExportFormat) -> Path:
+    return Path(export_dir) / f"export-{job_id}.{_ARTIFACT_SUFFIX_BY_FORMAT[export_format]}"
+
+
+def _update_job(session_factory: sessionmaker[Session], job_id: int, **values: object) -> None:
+    with session_factory() as db_session, db_session.begin():
+        db_session.execute(
+            update(ExportJob).where(ExportJob.id == job_id).values(updated_at=func.now(), **values)
+        )
+
+
+def _claim_job(session_factory: sessionmaker[Session], job_id: int) -> ExportFormat | None:
+    with session_factory() as db_session, db_session.begin():
+        claimed_format = db_session.execute(
+            update(ExportJob)
+            .where(ExportJob.id == job_id, ExportJob.status == ExportJobStatus.PENDING.value)
+            .values(status=ExportJobStatus.RUNNING.value, updated_at=func.now())
+            .returning(ExportJob.format)
+        ).scalar_one_or_none()
+    return ExportFormat(claimed_format) if claimed_format is not None else None
+
+
+def _write_artifact_chunks(
+    artifact_file: BinaryIO,
+    db_session: Session,
+    export_format: ExportFormat,
+    report_progress: Callable[[int], None],
+) -> int:
+    # NDJSON lines are the ``ExportTypeItem`` objects of the JSON body, and
+    # the only raw newlines in them are line ends, so the JSON artifact is the
+    # same stream with newlines turned into array separators.
+    exported_types = 0
+    if export_format == ExportFormat.JSON:
+        artifact_file.write(b'{"types":[')
+    for chunk, exported_types in iter_ndjson_chunks(db_session):
+        if export_format == ExportFormat.JSON:
+            chunk = chunk.replace(b"\n", b",")
+        artifact_file.write(chunk)
+        report_progress(exported_types)
+    if export_format == ExportFormat.JSON:
+        if exported_types:
+            artifact_file.seek(-1, os.SEEK_END)
+            artifact_file.truncate()
+        artifact_file.write(b"]}")
+    return exported_types
+
+
+def _expire_older_artifacts(
+    session_factory: sessionmaker[Session],
+    export_dir: str,
+    job_id: int,
+    export_format: ExportFormat,
+) -> None:
+    with session_factory() as db_session, db_session.begin():
+        expired_ids = (
+            db_session.execute(
+                update(ExportJob)
+                .where(
+                    ExportJob.id < job_id,
+                    ExportJob.format == export_format.value,
+                    ExportJob.status == ExportJobStatus.COMPLETED.value,
+                )
+                .values(status=ExportJobStatus.EXPIRED.value, updated_at=func.now())
+                .returning(ExportJob.id)
+            )
+            .scalars()
+            .all()
+        )
+    for expired_id in expired_ids:
+        export_artifact_path(export_dir, expired_id, export_format).unlink(missing_ok=True)
+
+
+def run_export_job(job_id: int, export_dir: str) -> None:
+    """Write one export artifact; runs in an export worker process.
+
+    The revision is read inside the export's snapshot, so an artifact whose
+    revision equals the current one is exactly the current data.
+    """
+    session_factory = get_session_factory()
+    export_format = _claim_job(session_factory, job_id)
+    if export_format is None:
+        return
+
+    artifact_path = export_artifact_path(export_dir, job_id, export_format)
+    partial_path = artifact_path.with_name(artifact_path.name + ".partial")
+    try:
+        with session_factory() as db_session, db_session.begin():
+            if db_session.get_bind().dialect.name == "postgresql":
+                db_session.execute(
+                    text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+                )
+            data_revision = read_data_revision(db_session)
+            total_types = db_session.execute(select(func.count(MiniatureType.id))).scalar_one()
+            _update_job(
+                session_factory, job_id, data_revision=data_revision, total_types=total_types
+            )
+
+            last_reported_at = time.monotonic()
+
+            def report_progress(exported_types: int) -> None:
+                nonlocal last_reported_at
+                now = time.monotonic()
+                if now - last_reported_at >= EXPORT_PROGRESS_INTERVAL_SECONDS:
+                    _update_job(session_factory, job_id, exported_types=exported_types)
+                    last_reported_at = now
+
+            artifact_path.parent.mkdir(parents=True, exist_ok=True)
+            with partial_path.open("wb") as artifact_file:
+                exported_types = _write_artifact_chunks(
+                    artifact_file, db_session, export_format, report_progress
+                )
+                artifact_file.flush()
+                os.fsync(artifact_file.fileno())
+        os.replace(partial_path, artifact_path)
+    except Exception as error:
+        logger.exception("Export job %d failed", job_id)
+        partial_path.unlink(missing_ok=True)
+        _update_job(
+            session_factory,
+            job_id,
+            status=ExportJobStatus.FAILED.value,
+            error=str(error)[:500],
+            finished_at=datetime.now(UTC),
+        )
+        return
+
+    _update_job(
+        session_factory,
+        job_id,
+        status=ExportJobStatus.COMPLETED.value,
+        exported_types=exported_types,
+        artifact_bytes=artifact_path.stat().st_size,
+        finished_at=datetime.now(UTC),
+    )
+    _expire_older_artifacts(session_factory, export_dir, job_id, export_format)
+
+
+def recover_export_jobs(export_dir: str, max_workers: int, stale_after: timedelta) -> None:
+    """Requeue or fail jobs whose process went away and drop their partial files.
+
+    As for import jobs, ``updated_at`` is the heartbeat: only jobs silent for
+    ``stale_after`` are touched. Stale pending jobs are requeued when a
+    process pool runs exports, everything else stale is failed.
+    """
+    session_factory = get_session_factory()
+    stale_before = datetime.now(UTC) - stale_after
+    lost_statuses = [ExportJobStatus.RUNNING.value]
+    if max_workers == 0:
+        lost_statuses.append(ExportJobStatus.PENDING.value)
+    with session_factory() as db_session, db_session.begin():
+        failed_ids = (
+            db_session.execute(
+                update(ExportJob)
+                .where(ExportJob.status.in_(lost_statuses), ExportJob.updated_at < stale_before)
+                .values(
+                    status=ExportJobStatus.FAILED.value,
+                    error=_INTERRUPTED_JOB_ERROR,
+                    finished_at=func.now(),
+                    updated_at=func.now(),
+                )
+                .returning(ExportJob.id)
+            )
+            .scalars()
+            .all()
+        )
+        requeued_ids = (
+            db_session.execute(
+                select(ExportJob.id).where(
+                    ExportJob.status == ExportJobStatus.PENDING.value,
+                    ExportJob.updated_at < stale_before,
+                )
+            )
+            .scalars()
+            .all()
+        )
+    if failed_ids:
+        logger.warning("Failed %d interrupted export jobs", len(failed_ids))
+    for job_id in requeued_ids:
+        logger.warning("Requeueing interrupted export job %d", job_id)
+        submit_export_job(max_workers, job_id, export_dir)
+
+    artifact_dir = Path(export_dir)
+    if not artifact_dir.is_dir():
+        return
+    # Listed before the running jobs are read, like import bodies.
+    partial_files = [path for path in artifact_dir.iterdir() if path.suffix == ".partial"]
+    with session_factory() as db_session, db_session.begin():
+        running_ids = set(
+            db_session.execute(
+                select(ExportJob.id).where(ExportJob.status == ExportJobStatus.RUNNING.value)
+            ).scalars()
+        )
+    for path in partial_files:
+        partial_match = _PARTIAL_ARTIFACT_NAME_RE.fullmatch(path.name)
+        if partial_match is not None and int(partial_match.group(1)) not in running_ids:
+            path.unlink(missing_ok=True)
+
+
+def submit_export_job(max_workers: int, job_id: int, export_dir: str) -> None:
+    """Run the job in the shared export process pool, starting it on first use."""
+    _export_pool.submit(max_workers, run_export_job, job_id, export_dir)
+
+
+def shutdown_export_executor() -> None:
+    _export_pool.shutdown()
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import fcntl
+import logging
+import re
+from collections.abc import Sequence
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Final
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.v1.compression import ContentEncoding, LimitedDecompressedReader
+from app.api.v1.delta import bump_bulk_revision
+from app.api.v1.errors import ApiContractError, ErrorCode
+from app.api.v1.importing import (
+    ImportStream,
+    analyze_import_tables,
+    apply_delta_import,
+    apply_import_stream,
+    apply_merge_import,
+    apply_replace_import,
+)
+from app.api.v1.schemas import (
+    ImportCommitMode,
+    ImportJobStatus,
+    ImportMode,
+    ImportTypeItem,
+    ImportTypeOutcome,
+)
+from app.config import get_settings
+from app.db.models import ImportJob, ImportJobType
+from app.db.session import get_engine, get_session_factory, hold_write_lock
+from app.metrics import record_import
+from app.workers.pool import JobProcessPool
+
+logger = logging.getLogger(__name__)
+
+ERROR_MESSAGE_MAX_LENGTH: Final[int] = 500
+UPLOAD_FILE_PREFIX: Final[str] = "upload-"
+_IMPORT_BODY_NAME_RE: Final[re.Pattern[str]] = re.compile(r"import-(\d+)\.body")
+_ACTIVE_JOB_STATUSES: Final[tuple[str, str]] = (
+    ImportJobStatus.PENDING.value,
+    ImportJobStatus.RUNNING.value,
+)
+_INTERRUPTED_JOB_ERROR: Final[str] = "The process running the job stopped before it finished."
+
+_import_pool = JobProcessPool("Import")
+
+
+def import_body_path(import_dir: str, job_id: int) -> Path:
+    return Path(import_dir) / f"import-{job_id}.body"
+
+
+def _holds_body_lock(body_path: Path) -> bool:
+    """Whether a live worker process still has the job's body locked."""
+    try:
+        with body_path.open("rb") as body_file:
+            try:
+                fcntl.flock(body_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+    except FileNotFoundError:
+        pass
+    return False
+
+
+def _update_job(session_factory: sessionmaker[Session], job_id: int, **values: object) -> None:
+    with session_factory() as db_session, db_session.begin():
+        db_session.execute(
+            update(ImportJob).where(ImportJob.id == job_id).values(updated_at=func.now(), **values)
+        )
+
+
+class _ImportJobProgress:
+    """Per-type outcomes and counters of a running job.
+
+    They are written in their own short transactions, so they stay visible
+    while the import transaction is open and survive its rollback. SQLite
+    has a single writer, which the import transaction holds, so there the
+    outcomes of a chunk are kept until the import transaction ends and are
+    written by the next ``settle``.
+    """
+
+    def __init__(
+        self, session_factory: sessionmaker[Session], job_id: int, *, defer_writes: bool
+    ) -> None:
+        self._session_factory = session_factory
+        self._job_id = job_id
+        self._defer_writes = defer_writes
+        self._next_position = 0
+        self._processed_types = 0
+        self._processed_rows = 0
+        self._unwritten_outcomes: list[dict[str, object]] = []
+
+    def record_chunk(self, chunk: Sequence[ImportTypeItem]) -> None:
+        for type_item in chunk:
+            self._unwritten_outcomes.append(
+                {
+                    "job_id": self._job_id,
+                    "position": self._next_position,
+                    "name": type_item.name,
+                    "history_rows": len(type_item.history),
+                    "outcome": ImportTypeOutcome.PENDING.value,
+                }
+            )
+            self._next_position += 1
+            self._processed_rows += len(type_item.history)
+        self._processed_types += len(chunk)
+        if not self._defer_writes:
+            self._write_outcomes()
+
+    def _write_outcomes(self) -> None:
+        if not self._unwritten_outcomes:
+            return
+        with self._session_factory() as db_session, db_session.begin():
+            db_session.execute(insert(ImportJobType), self._unwritten_outcomes)
+            db_session.execute(
+                update(ImportJob)
+                .where(ImportJob.id == self._job_id)
+                .values(
+                    processed_types=self._processed_types,
+                    processed_rows=self._processed_rows,
+                    updated_at=func.now(),
+                )
+            )
+        self._unwritten_outcomes = []
+
+    def settle(self, outcome: ImportTypeOutcome) -> None:
+        """Give every pending type its final outcome; call outside the import transaction."""
+        self._write_outcomes()
+        with self._session_factory() as db_session, db_session.begin():
+            db_session.execute(
+                update(ImportJobType)
+                .where(
+                    ImportJobType.job_id == self._job_id,
+                    ImportJobType.outcome == ImportTypeOutcome.PENDING.value,
+                )
+                .values(outcome=outcome.value)
+            )
+
+
+def _run_single_commit(
+    db_session: Session,
+    import_stream: ImportStream,
+    mode: ImportMode,
+    progress: _ImportJobProgress,
+) -> ImportTypeOutcome:
+    with db_session.begin():
+        hold_write_lock(db_session)
+        if mode == ImportMode.DELTA:
+            applied = apply_delta_import(db_session, import_stream, progress.record_chunk)
+        elif mode == ImportMode.REPLACE:
+            apply_replace_import(db_session, import_stream, progress.record_chunk)
+            applied = True
+        else:
+            apply_merge_import(db_session, import_stream, progress.record_chunk, mode=mode)
+            applied = True
+    record_import(mode.value, import_stream.type_count, import_stream.history_row_count)
+    if mode == ImportMode.REPLACE:
+        with db_session.begin():
+            analyze_import_tables(db_session)
+    return ImportTypeOutcome.APPLIED if applied else ImportTypeOutcome.SKIPPED
+
+
+def _run_chunked_commits(
+    db_session: Session,
+    import_stream: ImportStream,
+    mode: ImportMode,
+    progress: _ImportJobProgress,
+) -> ImportTypeOutcome:
+    # Each chunk is a transaction of its own; the bulk revision moves with
+    # every commit so export artifacts never outlive a committed chunk.
+    def commit_chunk(chunk: Sequence[ImportTypeItem]) -> None:
+        progress.record_chunk(chunk)
+        bump_bulk_revision(db_session)
+        db_session.commit()
+        progress.settle(ImportTypeOutcome.APPLIED)
+        record_import(mode.value, len(chunk), sum(len(item.history) for item in chunk))
+        hold_write_lock(db_session)
+
+    hold_write_lock(db_session)
+    apply_import_stream(db_session, import_stream, mode, commit_chunk)
+    import_stream.read_envelope()
+    db_session.commit()
+    return ImportTypeOutcome.APPLIED
+
+
+def _describe_failure(error: Exception) -> tuple[str | None, str]:
+    if isinstance(error, ApiContractError):
+        return error.code.value, error.message
+    if isinstance(error, IntegrityError):
+        return ErrorCode.ERR_INVALID_IMPORT_FORMAT.value, "Import payload is invalid."
+    return None, str(error)[:ERROR_MESSAGE_MAX_LENGTH]
+
+
+def run_import_job(job_id: int, import_dir: str) -> None:
+    """Apply one spooled import body; runs in an import worker process."""
+    session_factory = get_session_factory()
+    with session_factory() as db_session, db_session.begin():
+        job = db_session.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job_id, ImportJob.status == ImportJobStatus.PENDING.value)
+            .values(
+                status=ImportJobStatus.RUNNING.value,
+                started_at=func.now(),
+                updated_at=func.now(),
+            )
+            .returning(ImportJob.mode, ImportJob.commit_mode, ImportJob.content_encoding)
+        ).one_or_none()
+    if job is None:
+        return
+
+    mode = ImportMode(job.mode)
+    encoding = ContentEncoding(job.content_encoding) if job.content_encoding else None
+    body_path = import_body_path(import_dir, job_id)
+    progress = _ImportJobProgress(
+        session_factory, job_id, defer_writes=get_engine().dialect.name == "sqlite"
+    )
+    try:
+        with body_path.open("rb") as body_file, session_factory() as db_session:
+            # Held until the process exits, however long the import stays silent.
+            fcntl.flock(body_file, fcntl.LOCK_EX)
+            body = LimitedDecompressedReader(body_file, encoding, get_settings().import_max_bytes)
+            import_stream = ImportStream(body, mode)
+            if ImportCommitMode(job.commit_mode) == ImportCommitMode.CHUNKED:
+                outcome = _run_chunked_commits(db_session, import_stream, mode, progress)
+            else:
+                outcome = _run_single_commit(db_session, import_stream, mode, progress)
+    except Exception as error:
+        if not isinstance(error, ApiContractError):
+            logger.exception("Import job %d failed", job_id)
+        error_code, message = _describe_failure(error)
+        progress.settle(ImportTypeOutcome.ROLLED_BACK)
+        _update_job(
+            session_factory,
+            job_id,
+            status=ImportJobStatus.FAILED.value,
+            error_code=error_code,
+            error=message[:ERROR_MESSAGE_MAX_LENGTH],
+            finished_at=datetime.now(UTC),
+        )
+        return
+    finally:
+        body_path.unlink(missing_ok=True)
+
+    progress.settle(outcome)
+    _update_job(
+        session_factory,
+        job_id,
+        status=ImportJobStatus.COMPLETED.value,
+        finished_at=datetime.now(UTC),
+    )
+
+
+def recover_import_jobs(import_dir: str, max_workers: int, stale_after: timedelta) -> None:
+    """Requeue or fail jobs whose process went away and drop orphaned spool files.
+
+    ``updated_at`` is the job's heartbeat: a running job writes it with every
+    chunk, so only jobs silent for ``stale_after`` are touched and the API
+    processes of a live deployment may all run this on startup. On SQLite the
+    import transaction holds the only write lock, so a running job writes no
+    heartbeat until it ends; its worker keeps the spooled body locked instead,
+    and a job whose body is locked is left alone however long it was silent.
+    A stale pending job is requeued while its body is still spooled; a stale
+    running job is failed, since its transaction ended with its process.
+    """
+    session_factory = get_session_factory()
+    stale_before = datetime.now(UTC) - stale_after
+    with session_factory() as db_session, db_session.begin():
+        silent_jobs = db_session.execute(
+            select(ImportJob.id, ImportJob.status).where(
+                ImportJob.status.in_(_ACTIVE_JOB_STATUSES), ImportJob.updated_at < stale_before
+            )
+        ).all()
+    stale_jobs = [
+        (job_id, job_status)
+        for job_id, job_status in silent_jobs
+        if job_status != ImportJobStatus.RUNNING.value
+        or not _holds_body_lock(import_body_path(import_dir, job_id))
+    ]
+    requeued_ids = [
+        job_id
+        for job_id, job_status in stale_jobs
+        if job_status == ImportJobStatus.PENDING.value
+        and max_workers > 0
+        and import_body_path(import_dir, job_id).is_file()
+    ]
+    lost_ids = [job_id for job_id, _ in stale_jobs if job_id not in requeued_ids]
+    if lost_ids:
+        with session_factory() as db_session, db_session.begin():
+            failed_ids = (
+                db_session.execute(
+                    update(ImportJob)
+                    .where(
+                        ImportJob.id.in_(lost_ids),
+                        ImportJob.status.in_(_ACTIVE_JOB_STATUSES),
+                        ImportJob.updated_at < stale_before,
+                    )
+                    .values(
+                        status=ImportJobStatus.FAILED.value,
+                        error=_INTERRUPTED_JOB_ERROR,
+                        finished_at=func.now(),
+                        updated_at=func.now(),
+                    )
+                    .returning(ImportJob.id)
+                )
+                .scalars()
+                .all()
+            )
+            db_session.execute(
+                update(ImportJobType)
+                .where(
+                    ImportJobType.job_id.in_(failed_ids),
+                    ImportJobType.outcome == ImportTypeOutcome.PENDING.value,
+                )
+                .values(outcome=ImportTypeOutcome.ROLLED_BACK.value)
+            )
+        logger.warning("Failed %d interrupted import jobs", len(failed_ids))
+    for job_id in requeued_ids:
+        logger.warning("Requeueing interrupted import job %d", job_id)
+        submit_import_job(max_workers, job_id, import_dir)
+    _remove_orphaned_spool_files(session_factory, Path(import_dir), stale_before)
+
+
+def _remove_orphaned_spool_files(
+    session_factory: sessionmaker[Session], import_dir: Path, stale_before: datetime
+) -> None:
+    # Bodies are listed before the active jobs are read: a body is moved into
+    # place only after its job has committed, so no listed body is mistaken
+    # for an orphan.
+    if not import_dir.is_dir():
+        return
+    spooled_files = list(import_dir.iterdir())
+    with session_factory() as db_session, db_session.begin():
+        active_ids = set(
+            db_session.execute(
+                select(ImportJob.id).where(ImportJob.status.in_(_ACTIVE_JOB_STATUSES))
+            ).scalars()
+        )
+    for path in spooled_files:
+        body_match = _IMPORT_BODY_NAME_RE.fullmatch(path.name)
+        if body_match is not None:
+            orphaned = int(body_match.group(1)) not in active_ids
+        else:
+            # Uploads still being received by another process keep growing.
+            orphaned = path.name.startswith(UPLOAD_FILE_PREFIX) and (
+                datetime.fromtimestamp(path.stat().st_mtime, UTC) < stale_before
+            )
+        if orphaned:
+            path.unlink(missing_ok=True)
+
+
+def submit_import_job(max_workers: int, job_id: int, import_dir: str) -> None:
+    """Run the job in the shared import process pool, starting it on first use."""
+    _import_pool.submit(max_workers, run_import_job, job_id, import_dir)
+
+
+def shutdown_import_executor() -> None:
+    _import_pool.shutdown()
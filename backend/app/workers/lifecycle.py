@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from functools import partial
+
+from app.api.v1.importing import resolve_prepared_imports
+from app.config import Settings
+from app.db.session import get_engine, get_session_factory
+from app.workers.consistency import run_consistency_cycle
+from app.workers.exports import recover_export_jobs
+from app.workers.imports import recover_import_jobs
+from app.workers.periodic import PeriodicWorker
+from app.workers.snapshots import run_snapshot_cycle
+
+
+def recover_interrupted_work(settings: Settings) -> None:
+    """Finish what a previous run of the API left behind; call once on startup."""
+    resolve_prepared_imports(get_engine())
+    stale_after = timedelta(seconds=settings.job_stale_after_seconds)
+    recover_import_jobs(settings.import_jobs_dir, settings.import_job_workers, stale_after)
+    recover_export_jobs(settings.export_jobs_dir, settings.export_job_workers, stale_after)
+
+
+def start_background_workers(settings: Settings) -> list[PeriodicWorker]:
+    workers: list[PeriodicWorker] = []
+
+    if settings.snapshot_interval_seconds > 0:
+        snapshot_interval = timedelta(seconds=settings.snapshot_interval_seconds)
+        workers.append(
+            PeriodicWorker(
+                name="stage-count-snapshots",
+                interval_seconds=settings.snapshot_interval_seconds,
+                task=partial(run_snapshot_cycle, get_session_factory(), snapshot_interval),
+            )
+        )
+
+    if settings.consistency_check_interval_seconds > 0:
+        workers.append(
+            PeriodicWorker(
+                name="consistency-verifier",
+                interval_seconds=settings.consistency_check_interval_seconds,
+                task=partial(
+                    run_consistency_cycle,
+                    get_session_factory(),
+                    settings.consistency_sweep_batch_size,
+                ),
+            )
+        )
+
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def stop_background_workers(workers: list[PeriodicWorker]) -> None:
+    for worker in workers:
+        worker.stop()
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicWorker:
+    """Runs ``task`` on a daemon thread every ``interval_seconds`` until stopped."""
+
+    def __init__(self, name: str, interval_seconds: float, task: Callable[[], None]) -> None:
+        self.name = name
+        self._interval_seconds = interval_seconds
+        self._task = task
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self._task()
+            except Exception:
+                logger.exception("Background worker %s failed", self.name)
+            self._stop_event.wait(self._interval_seconds)
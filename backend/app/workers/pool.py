@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class JobProcessPool:
+    """Process pool for one kind of background job, started on first use.
+
+    Separate processes keep JSON parsing and rendering off the API workers' GIL.
+    """
+
+    def __init__(self, job_kind: str) -> None:
+        self._job_kind = job_kind
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _log_job_crash(self, future: Future[None]) -> None:
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.error("%s worker process crashed: %s", self._job_kind, error)
+
+    def submit(self, max_workers: int, job: Callable[..., None], *args: object) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            future = self._executor.submit(job, *args)
+        future.add_done_callback(self._log_job_crash)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import logging
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import and_, func, insert, or_, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models import StageCount, StageCountSnapshot
+from app.db.session import hold_write_lock
+from app.domain.stages import STAGE_COUNT_FIELD_BY_STAGE
+
+logger = logging.getLogger(__name__)
+
+_SNAPSHOT_LOCK_KEY = "stage_count_snapshots"
+
+
+def take_stage_count_snapshots(db_session: Session, min_interval: timedelta) -> int:
+    """Snapshot every type whose counts changed since a snapshot older than ``min_interval``.
+
+    Types without any snapshot are always captured. The whole capture is one
+    ``INSERT ... SELECT`` over ``stage_counts``, so it sees a single consistent
+    view of the counts and takes no row locks.
+    """
+    field_names = list(STAGE_COUNT_FIELD_BY_STAGE.values())
+    current = (
+        select(
+            StageCount.type_id,
+            *[
+                func.coalesce(
+                    func.sum(StageCount.count).filter(StageCount.stage_name == stage.value), 0
+                ).label(field_name)
+                for stage, field_name in STAGE_COUNT_FIELD_BY_STAGE.items()
+            ],
+        )
+        .group_by(StageCount.type_id)
+        .subquery("current_counts")
+    )
+    latest_taken_at = (
+        select(
+            StageCountSnapshot.type_id,
+            func.max(StageCountSnapshot.taken_at).label("taken_at"),
+        )
+        .group_by(StageCountSnapshot.type_id)
+        .subquery("latest_taken_at")
+    )
+    latest = (
+        select(StageCountSnapshot)
+        .join(
+            latest_taken_at,
+            and_(
+                StageCountSnapshot.type_id == latest_taken_at.c.type_id,
+                StageCountSnapshot.taken_at == latest_taken_at.c.taken_at,
+            ),
+        )
+        .subquery("latest_snapshots")
+    )
+
+    cutoff = datetime.now(UTC) - min_interval
+    candidates = (
+        select(
+            current.c.type_id,
+            func.now(),
+            *[current.c[field_name] for field_name in field_names],
+        )
+        .select_from(current)
+        .outerjoin(latest, latest.c.type_id == current.c.type_id)
+        .where(
+            or_(
+                latest.c.type_id.is_(None),
+                and_(
+                    latest.c.taken_at <= cutoff,
+                    or_(
+                        *[
+                            current.c[field_name] != latest.c[field_name]
+                            for field_name in field_names
+                        ]
+                    ),
+                ),
+            )
+        )
+    )
+    result = db_session.execute(
+        insert(StageCountSnapshot).from_select(["type_id", "taken_at", *field_names], candidates),
+        execution_options={"preserve_rowcount": True},
+    )
+    return result.rowcount or 0
+
+
+def run_snapshot_cycle(session_factory: sessionmaker[Session], min_interval: timedelta) -> None:
+    with session_factory() as db_session, db_session.begin():
+        hold_write_lock(db_session)
+        if db_session.get_bind().dialect.name == "postgresql":
+            acquired = db_session.execute(
+                text("SELECT pg_try_advisory_xact_lock(hashtext(:key))"),
+                {"key": _SNAPSHOT_LOCK_KEY},
+            ).scalar_one()
+            if not acquired:
+                return
+
+        captured = take_stage_count_snapshots(db_session, min_interval)
+
+    if captured:
+        logger.info("Captured %d stage count snapshots", captured)
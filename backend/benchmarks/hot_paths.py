@@ -0,0 +1,200 @@
+"""Per-request cost of the ``get_type`` and ``move_type`` statements.
+
+``before`` builds every statement per call, as the endpoints used to, on
+connections that never prepare; ``after`` runs the statements the router
+builds once at module level on connections with psycopg's
+``prepare_threshold`` set (``--prepare-threshold``, default 5). For each
+request the benchmark reports the CPU time spent in this process and, when
+``pg_stat_statements`` tracks planning (``pg_stat_statements.track_planning =
+on``), the planning time the server spent in the benchmark database. Moves
+are rolled back, so the only lasting change is a benchmark type that is
+deleted at the end. Prepared statements are a psycopg feature, so this only
+runs on PostgreSQL.
+
+Usage (from ``backend/``)::
+
+    DATABASE_URL=postgresql+psycopg://... python -m benchmarks.hot_paths \\
+        [--requests 5000] [--prepare-threshold 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+
+from sqlalchemy import Engine, create_engine, delete, select, text, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.v1 import router
+from app.config import get_settings
+from app.db.models import HistoryLog, MiniatureType, StageCount
+from app.domain.stages import StageCode
+
+_PLAN_TIME_SQL = text(
+    "SELECT COALESCE(SUM(total_plan_time), 0) FROM pg_stat_statements "
+    "WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())"
+)
+
+
+def _get_type_before(db_session: Session, type_id: int) -> None:
+    db_session.execute(
+        select(
+            MiniatureType.id,
+            MiniatureType.name,
+            StageCount.stage_name,
+            StageCount.count,
+        )
+        .select_from(MiniatureType)
+        .outerjoin(StageCount, StageCount.type_id == MiniatureType.id)
+        .where(MiniatureType.id == type_id)
+    ).all()
+
+
+def _get_type_after(db_session: Session, type_id: int) -> None:
+    db_session.execute(router._TYPE_STAGE_ROWS_BY_ID, {"type_id": type_id}).all()
+
+
+def _lock_stage_rows_before(db_session: Session, type_id: int) -> list[StageCount]:
+    return list(
+        db_session.execute(
+            select(StageCount)
+            .where(
+                StageCount.type_id == type_id,
+                StageCount.stage_name.in_([StageCode.IN_BOX.value, StageCode.BUILDING.value]),
+            )
+            .with_for_update()
+        ).scalars()
+    )
+
+
+def _lock_stage_rows_after(db_session: Session, type_id: int) -> list[StageCount]:
+    return list(
+        db_session.execute(
+            router._MOVE_STAGE_ROWS,
+            {
+                "type_id": type_id,
+                "from_stage": StageCode.IN_BOX.value,
+                "to_stage": StageCode.BUILDING.value,
+            },
+        ).scalars()
+    )
+
+
+def _move(
+    lock_stage_rows: Callable[[Session, int], list[StageCount]],
+    get_type: Callable[[Session, int], None],
+) -> Callable[[Session, int], None]:
+    def move(db_session: Session, type_id: int) -> None:
+        # The statement sequence of ``move_type``, rolled back instead of committed.
+        with db_session.begin():
+            db_session.get(MiniatureType, type_id)
+            for stage_row in lock_stage_rows(db_session, type_id):
+                stage_row.count += -1 if stage_row.stage_name == StageCode.IN_BOX.value else 1
+            db_session.add(
+                HistoryLog(
+                    type_id=type_id,
+                    from_stage=StageCode.IN_BOX.value,
+                    to_stage=StageCode.BUILDING.value,
+                    qty=1,
+                )
+            )
+            db_session.flush()
+            get_type(db_session, type_id)
+            db_session.rollback()
+
+    return move
+
+
+def _get_type(get_type: Callable[[Session, int], None]) -> Callable[[Session, int], None]:
+    def read(db_session: Session, type_id: int) -> None:
+        with db_session.begin():
+            get_type(db_session, type_id)
+
+    return read
+
+
+VARIANTS: dict[str, dict[str, Callable[[Session, int], None]]] = {
+    "before": {
+        "get_type": _get_type(_get_type_before),
+        "move_type": _move(_lock_stage_rows_before, _get_type_before),
+    },
+    "after": {
+        "get_type": _get_type(_get_type_after),
+        "move_type": _move(_lock_stage_rows_after, _get_type_after),
+    },
+}
+
+
+def _build_engine(prepare_threshold: int | None) -> Engine:
+    return create_engine(
+        get_settings().database_url,
+        connect_args={"prepare_threshold": prepare_threshold},
+        pool_size=1,
+        max_overflow=0,
+    )
+
+
+def _read_plan_time_ms(engine: Engine) -> float | None:
+    try:
+        with engine.connect() as connection:
+            return float(connection.execute(_PLAN_TIME_SQL).scalar_one())
+    except DBAPIError:
+        return None
+
+
+def run(
+    engine: Engine, request: Callable[[Session, int], None], type_id: int, requests: int
+) -> tuple[float, float | None]:
+    """Run ``requests`` requests; return CPU and planning milliseconds per request."""
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    with session_factory() as db_session:
+        plan_ms_before = _read_plan_time_ms(engine)
+        cpu_started_at = time.process_time()
+        for _ in range(requests):
+            request(db_session, type_id)
+        cpu_seconds = time.process_time() - cpu_started_at
+        plan_ms_after = _read_plan_time_ms(engine)
+
+    plan_ms = None
+    if plan_ms_before is not None and plan_ms_after is not None:
+        plan_ms = (plan_ms_after - plan_ms_before) / requests
+    return cpu_seconds * 1000 / requests, plan_ms
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.hot_paths")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--prepare-threshold", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    engines = {"before": _build_engine(None), "after": _build_engine(args.prepare_threshold)}
+    with Session(engines["after"]) as db_session, db_session.begin():
+        benchmark_type = MiniatureType(name=f"benchmark-hot-paths-{time.time_ns()}")
+        db_session.add(benchmark_type)
+        db_session.flush()
+        type_id = benchmark_type.id
+        db_session.execute(
+            update(StageCount)
+            .where(StageCount.type_id == type_id, StageCount.stage_name == StageCode.IN_BOX.value)
+            .values(count=1)
+        )
+
+    try:
+        for endpoint in ("get_type", "move_type"):
+            for variant, engine in engines.items():
+                cpu_ms, plan_ms = run(engine, VARIANTS[variant][endpoint], type_id, args.requests)
+                plan = "n/a" if plan_ms is None else f"{plan_ms:.3f} ms"
+                print(
+                    f"{endpoint:>9} {variant:>6}: cpu {cpu_ms:.3f} ms, planning {plan} per request"
+                )
+    finally:
+        with engines["after"].begin() as connection:
+            connection.execute(delete(MiniatureType).where(MiniatureType.id == type_id))
+        for engine in engines.values():
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Import throughput by number of worker connections.
+
+Builds one import body and applies it with ``apply_parallel_import`` for each
+worker count (1 is the sequential import). Every run imports freshly named
+types, commits like ``POST /api/v1/import?workers=N`` does, and deletes its
+types afterwards. Worker connections only run on PostgreSQL.
+
+Usage (from ``backend/``)::
+
+    DATABASE_URL=postgresql+psycopg://... python -m benchmarks.import_parallel \\
+        [--types 200] [--rows-per-type 2000] [--workers 1 2 4 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import time
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete
+
+from app.api.v1.importing import ImportStream, apply_parallel_import
+from app.api.v1.schemas import ImportMode
+from app.db.models import MiniatureType
+from app.db.session import get_session_factory
+from app.domain.stages import StageCode
+
+_BASE_TIME = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def build_body(name_prefix: str, type_count: int, rows_per_type: int) -> bytes:
+    history = [
+        {
+            "from_stage": StageCode.IN_BOX.value,
+            "to_stage": StageCode.BUILDING.value,
+            "qty": 1,
+            "created_at": (_BASE_TIME + timedelta(seconds=index)).isoformat(),
+        }
+        for index in range(rows_per_type)
+    ]
+    stage_counts = [
+        {"stage": stage.value, "count": rows_per_type if stage == StageCode.BUILDING else 0}
+        for stage in StageCode
+    ]
+    types = [
+        {"name": f"{name_prefix}{index}", "stage_counts": stage_counts, "history": history}
+        for index in range(type_count)
+    ]
+    return json.dumps({"types": types}).encode()
+
+
+def run(workers: int, type_count: int, rows_per_type: int) -> float:
+    """Import the body with ``workers`` connections and return rows per second."""
+    name_prefix = f"benchmark-{workers}-{time.time_ns()}-"
+    body = build_body(name_prefix, type_count, rows_per_type)
+    session_factory = get_session_factory()
+
+    started_at = time.perf_counter()
+    with session_factory() as db_session, db_session.begin():
+        import_stream = ImportStream(io.BytesIO(body), ImportMode.MERGE)
+        apply_parallel_import(db_session, import_stream, ImportMode.MERGE, workers)
+    elapsed = time.perf_counter() - started_at
+
+    with session_factory() as db_session, db_session.begin():
+        db_session.execute(delete(MiniatureType).where(MiniatureType.name.startswith(name_prefix)))
+    return type_count * rows_per_type / elapsed
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.import_parallel")
+    parser.add_argument("--types", type=int, default=200)
+    parser.add_argument("--rows-per-type", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    for workers in args.workers:
+        rows_per_second = run(workers, args.types, args.rows_per_type)
+        print(
+            f"{workers} worker(s): {args.types * args.rows_per_type} rows, "
+            f"{rows_per_second:,.0f} rows/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""The API's workloads on embedded SQLite next to PostgreSQL.
+
+Runs the same requests through the app against each ``--database-url``:
+an import, ``get_type`` and ``list_types`` reads, ``move_type`` from several
+threads at once and a full export. Each database is migrated to head first;
+the benchmark's types are deleted at the end of its run.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.sqlite_mode \\
+        --database-url sqlite:///var/benchmark.db \\
+        --database-url postgresql+psycopg://... \\
+        [--types 200] [--rows-per-type 200] [--requests 2000] [--threads 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, make_url, select
+
+from app.config import get_settings
+from app.db.models import MiniatureType
+from app.db.session import get_session_factory
+from app.domain.stages import StageCode
+from app.main import create_app
+
+_ALEMBIC_INI = Path(__file__).resolve().parents[1] / "alembic.ini"
+_BASE_TIME = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def build_body(name_prefix: str, type_count: int, rows_per_type: int, in_box: int) -> bytes:
+    history = [
+        {
+            "from_stage": StageCode.IN_BOX.value,
+            "to_stage": StageCode.BUILDING.value,
+            "qty": 1,
+            "created_at": (_BASE_TIME + timedelta(seconds=index)).isoformat(),
+        }
+        for index in range(rows_per_type)
+    ]
+    stage_counts = [
+        {"stage": stage.value, "count": in_box if stage == StageCode.IN_BOX else 0}
+        for stage in StageCode
+    ]
+    types = [
+        {"name": f"{name_prefix}{index}", "stage_counts": stage_counts, "history": history}
+        for index in range(type_count)
+    ]
+    return json.dumps({"types": types}).encode()
+
+
+def _timed(requests: int, threads: int, send: Callable[[int], None]) -> float:
+    """Send ``requests`` requests from ``threads`` threads; return requests per second."""
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(send, range(requests)))
+    return requests / (time.perf_counter() - started_at)
+
+
+def run(
+    database_url: str, type_count: int, rows_per_type: int, requests: int, threads: int
+) -> dict[str, float]:
+    """Run every workload against ``database_url``; return throughput by workload."""
+    os.environ["DATABASE_URL"] = database_url
+    get_settings.cache_clear()
+    command.upgrade(Config(str(_ALEMBIC_INI)), "head")
+    client = TestClient(create_app())
+    session_factory = get_session_factory()
+    name_prefix = f"benchmark-{time.time_ns()}-"
+    results: dict[str, float] = {}
+
+    body = build_body(name_prefix, type_count, rows_per_type, in_box=requests)
+    started_at = time.perf_counter()
+    response = client.post(
+        "/api/v1/import", content=body, headers={"Content-Type": "application/json"}
+    )
+    response.raise_for_status()
+    results["import rows/s"] = type_count * rows_per_type / (time.perf_counter() - started_at)
+
+    with session_factory() as db_session:
+        type_ids = (
+            db_session.execute(
+                select(MiniatureType.id).where(MiniatureType.name.startswith(name_prefix))
+            )
+            .scalars()
+            .all()
+        )
+
+    try:
+        results["get_type req/s"] = _timed(
+            requests,
+            1,
+            lambda index: client.get(f"/api/v1/types/{type_ids[index % type_count]}"),
+        )
+        results["list_types req/s"] = _timed(
+            max(requests // 100, 1), 1, lambda _index: client.get("/api/v1/types")
+        )
+        results[f"move_type x{threads} req/s"] = _timed(
+            requests,
+            threads,
+            lambda index: client.post(
+                f"/api/v1/types/{type_ids[index % type_count]}/move",
+                json={"from_stage": "IN_BOX", "to_stage": "BUILDING", "qty": 1},
+            ).raise_for_status(),
+        )
+        results["export req/s"] = _timed(3, 1, lambda _index: client.get("/api/v1/export"))
+    finally:
+        with session_factory() as db_session, db_session.begin():
+            db_session.execute(
+                delete(MiniatureType).where(MiniatureType.name.startswith(name_prefix))
+            )
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.sqlite_mode")
+    parser.add_argument("--database-url", action="append", required=True)
+    parser.add_argument("--types", type=int, default=200)
+    parser.add_argument("--rows-per-type", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    for database_url in args.database_url:
+        backend = make_url(database_url).get_backend_name()
+        results = run(database_url, args.types, args.rows_per_type, args.requests, args.threads)
+        for workload, throughput in results.items():
+            print(f"{backend:>10} {workload:>20}: {throughput:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
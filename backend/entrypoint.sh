@@ -2,4 +2,11 @@
 set -eu
 
 alembic -c /app/alembic.ini upgrade head
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000
+
+# Metrics of the previous run must not leak into the aggregate of this one.
+if [ -n "${PROMETHEUS_MULTIPROC_DIR:-}" ]; then
+  mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+  find "$PROMETHEUS_MULTIPROC_DIR" -mindepth 1 -delete
+fi
+
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers "${UVICORN_WORKERS:-1}"
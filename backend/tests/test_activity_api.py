@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
+
+from app.db.models import HistoryLog
+
+
+def _history_row(
+    type_id: int, from_stage: str, to_stage: str, qty: int, hour: int
+) -> dict[str, object]:
+    return {
+        "type_id": type_id,
+        "from_stage": from_stage,
+        "to_stage": to_stage,
+        "qty": qty,
+        "created_at": datetime(2026, 2, 25, hour, tzinfo=UTC),
+    }
+
+
+def _seed_activity(db_engine) -> None:
+    with db_engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO miniature_types (name) VALUES (:name)"),
+            [{"name": "Alpha"}, {"name": "Beta"}],
+        )
+        # Bound through the model's column types, so every backend stores UTC.
+        connection.execute(
+            insert(HistoryLog),
+            [
+                _history_row(1, "IN_BOX", "BUILDING", 1, 9),
+                _history_row(2, "IN_BOX", "PRIMING", 2, 10),
+                _history_row(1, "BUILDING", "PAINTING", 3, 10),
+                _history_row(2, "PRIMING", "DONE", 4, 11),
+            ],
+        )
+
+
+def test_get_activity_returns_empty_feed_for_empty_database(client: TestClient, db_engine) -> None:
+    response = client.get("/api/v1/activity")
+
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "next_cursor": None}
+
+
+def test_get_activity_returns_newest_events_across_types(client: TestClient, db_engine) -> None:
+    _seed_activity(db_engine)
+
+    response = client.get("/api/v1/activity")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["next_cursor"] is None
+    assert body["items"][0] == {
+        "id": 4,
+        "type_id": 2,
+        "type_name": "Beta",
+        "from_stage": "PRIMING",
+        "to_stage": "DONE",
+        "qty": 4,
+        "created_at": "2026-02-25T11:00:00Z",
+    }
+    assert [item["id"] for item in body["items"]] == [4, 3, 2, 1]
+
+
+def test_get_activity_paginates_by_created_at_and_id(client: TestClient, db_engine) -> None:
+    _seed_activity(db_engine)
+
+    first_page = client.get("/api/v1/activity", params={"limit": 2})
+    second_page = client.get(
+        "/api/v1/activity",
+        params={"limit": 2, "cursor": first_page.json()["next_cursor"]},
+    )
+
+    assert first_page.status_code == 200
+    assert [item["id"] for item in first_page.json()["items"]] == [4, 3]
+    assert second_page.status_code == 200
+    assert [item["id"] for item in second_page.json()["items"]] == [2, 1]
+    assert second_page.json()["next_cursor"] is None
+
+
+def test_get_activity_rejects_malformed_cursor(client: TestClient, db_engine) -> None:
+    response = client.get("/api/v1/activity", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+    assert response.json() == {"code": "ERR_VALIDATION", "message": "Activity cursor is invalid."}
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import gzip
+import json
+
+import zstandard
+from fastapi.testclient import TestClient
+
+from app.api.v1 import exporting
+from app.config import get_settings
+
+IMPORT_PAYLOAD = {
+    "types": [
+        {
+            "name": "Alpha",
+            "stage_counts": [
+                {"stage": "IN_BOX", "count": 3},
+                {"stage": "BUILDING", "count": 0},
+                {"stage": "PRIMING", "count": 0},
+                {"stage": "PAINTING", "count": 0},
+                {"stage": "DONE", "count": 1},
+            ],
+            "history": [
+                {
+                    "from_stage": "IN_BOX",
+                    "to_stage": "DONE",
+                    "qty": 1,
+                    "created_at": "2026-02-25T09:00:00Z",
+                }
+            ],
+        }
+    ]
+}
+
+
+def _read_raw(client: TestClient, url: str, accept_encoding: str) -> tuple[dict, bytes]:
+    with client.stream("GET", url, headers={"Accept-Encoding": accept_encoding}) as response:
+        assert response.status_code == 200
+        return dict(response.headers), b"".join(response.iter_raw())
+
+
+def test_get_export_honours_gzip_accept_encoding(client: TestClient, db_engine) -> None:
+    client.post("/api/v1/import", json=IMPORT_PAYLOAD)
+
+    headers, raw_body = _read_raw(client, "/api/v1/export", "gzip")
+
+    assert headers["content-encoding"] == "gzip"
+    # CORS adds ``Origin`` to the list.
+    assert "Accept-Encoding" in [value.strip() for value in headers["vary"].split(",")]
+    assert (
+        gzip.decompress(raw_body)
+        == client.get("/api/v1/export", headers={"Accept-Encoding": "identity"}).content
+    )
+
+
+def test_compressed_json_export_streams_chunks_into_the_body(
+    client: TestClient, db_engine, monkeypatch
+) -> None:
+    monkeypatch.setattr(exporting, "EXPORT_STREAM_CHUNK_BYTES", 1)
+    beta = {**IMPORT_PAYLOAD["types"][0], "name": "Beta"}
+    client.post("/api/v1/import", json={"types": [*IMPORT_PAYLOAD["types"], beta]})
+
+    _headers, raw_body = _read_raw(client, "/api/v1/export", "zstd")
+
+    assert (
+        zstandard.ZstdDecompressor().decompressobj().decompress(raw_body)
+        == client.get("/api/v1/export", headers={"Accept-Encoding": "identity"}).content
+    )
+
+
+def test_get_export_prefers_zstd_for_ndjson(client: TestClient, db_engine) -> None:
+    client.post("/api/v1/import", json=IMPORT_PAYLOAD)
+
+    headers, raw_body = _read_raw(client, "/api/v1/export?format=ndjson", "gzip;q=0.5, zstd")
+    lines = zstandard.ZstdDecompressor().decompressobj().decompress(raw_body).splitlines()
+
+    assert headers["content-encoding"] == "zstd"
+    assert [json.loads(line)["name"] for line in lines] == ["Alpha"]
+
+
+def test_get_export_without_accepted_encoding_is_not_compressed(
+    client: TestClient, db_engine
+) -> None:
+    headers, raw_body = _read_raw(client, "/api/v1/export", "identity")
+
+    assert "content-encoding" not in headers
+    assert json.loads(raw_body) == {"types": []}
+
+
+def test_post_import_accepts_gzip_and_zstd_bodies(client: TestClient, db_engine) -> None:
+    body = json.dumps(IMPORT_PAYLOAD).encode()
+
+    gzip_response = client.post(
+        "/api/v1/import",
+        content=gzip.compress(body),
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+    zstd_response = client.post(
+        "/api/v1/import",
+        content=zstandard.ZstdCompressor().compress(body),
+        headers={"Content-Type": "application/json", "Content-Encoding": "zstd"},
+    )
+    alpha = client.get("/api/v1/types").json()["items"][0]
+
+    assert gzip_response.status_code == 200
+    assert zstd_response.status_code == 200
+    assert alpha["counts"]["in_box"] == 6
+    assert alpha["counts"]["done"] == 2
+
+
+def test_post_import_limits_decompressed_size(client: TestClient, db_engine, monkeypatch) -> None:
+    monkeypatch.setenv("IMPORT_MAX_BYTES", str(1024 * 1024))
+    get_settings.cache_clear()
+    padded_body = b'{"types": []' + b" " * (2 * 1024 * 1024) + b"}"
+
+    response = client.post(
+        "/api/v1/import",
+        content=gzip.compress(padded_body),
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["code"] == "ERR_PAYLOAD_TOO_LARGE"
+    assert response.json()["message"] == "Import payload exceeds the 1MB limit."
+
+
+def test_post_import_reports_limits_below_one_megabyte_in_kilobytes(
+    client: TestClient, db_engine, monkeypatch
+) -> None:
+    monkeypatch.setenv("IMPORT_MAX_BYTES", str(512 * 1024))
+    get_settings.cache_clear()
+    padded_body = b'{"types": []' + b" " * (1024 * 1024) + b"}"
+
+    response = client.post(
+        "/api/v1/import",
+        content=gzip.compress(padded_body),
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+
+    assert response.json()["message"] == "Import payload exceeds the 512KB limit."
+
+
+def test_post_import_rejects_corrupt_compressed_body(client: TestClient, db_engine) -> None:
+    response = client.post(
+        "/api/v1/import",
+        content=b"definitely not gzip",
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {
+        "code": "ERR_INVALID_IMPORT_FORMAT",
+        "message": "Import payload is invalid.",
+    }
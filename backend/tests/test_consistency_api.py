@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+from sqlalchemy import text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.workers.consistency import run_consistency_check, run_consistency_cycle
+
+
+def _run_check(db_engine) -> tuple[int, int]:
+    with Session(db_engine) as db_session, db_session.begin():
+        result = run_consistency_check(db_session, sweep_batch_size=100)
+    return result.checked_types, result.discrepancies
+
+
+def _import_alpha(client: TestClient) -> None:
+    response = client.post(
+        "/api/v1/import",
+        json={
+            "types": [
+                {
+                    "name": "Alpha",
+                    "stage_counts": [
+                        {"stage": "IN_BOX", "count": 5},
+                        {"stage": "BUILDING", "count": 2},
+                        {"stage": "PRIMING", "count": 0},
+                        {"stage": "PAINTING", "count": 0},
+                        {"stage": "DONE", "count": 0},
+                    ],
+                    "history": [
+                        {
+                            "from_stage": "IN_BOX",
+                            "to_stage": "BUILDING",
+                            "qty": 2,
+                            "created_at": "2026-02-25T09:00:00Z",
+                        }
+                    ],
+                }
+            ]
+        },
+    )
+    assert response.status_code == 200
+
+
+def test_get_consistency_report_is_empty_before_first_run(client: TestClient, db_engine) -> None:
+    response = client.get("/api/v1/consistency")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "last_run_at": None,
+        "history_high_water_mark": 0,
+        "checked_types": 0,
+        "discrepancies": [],
+    }
+
+
+def test_consistency_check_accepts_imports_and_moves(client: TestClient, db_engine) -> None:
+    _import_alpha(client)
+    moved = client.post(
+        "/api/v1/types/1/move",
+        json={"from_stage": "IN_BOX", "to_stage": "PRIMING", "qty": 3},
+    )
+    assert moved.status_code == 200
+
+    checked_types, discrepancies = _run_check(db_engine)
+    report = client.get("/api/v1/consistency").json()
+
+    assert (checked_types, discrepancies) == (1, 0)
+    assert report["history_high_water_mark"] == 2
+    assert report["discrepancies"] == []
+
+
+def test_consistency_check_reports_counts_drifting_from_history(
+    client: TestClient, db_engine
+) -> None:
+    _import_alpha(client)
+    _run_check(db_engine)
+
+    with db_engine.begin() as connection:
+        connection.execute(
+            text(
+                """
+                INSERT INTO history_logs (type_id, from_stage, to_stage, qty, created_at)
+                VALUES (1, 'BUILDING', 'DONE', 1, '2026-02-26 09:00:00+00')
+                """
+            )
+        )
+
+    checked_types, discrepancies = _run_check(db_engine)
+    report = client.get("/api/v1/consistency").json()
+
+    assert (checked_types, discrepancies) == (1, 2)
+    assert [
+        (item["type_name"], item["stage"], item["actual"], item["expected"])
+        for item in report["discrepancies"]
+    ] == [("Alpha", "BUILDING", 2, 1), ("Alpha", "DONE", 0, 1)]
+
+
+def _insert_drifting_history(db_engine) -> None:
+    with db_engine.begin() as connection:
+        connection.execute(
+            text(
+                """
+                INSERT INTO history_logs (type_id, from_stage, to_stage, qty, created_at)
+                VALUES (1, 'BUILDING', 'DONE', 1, '2026-02-26 09:00:00+00')
+                """
+            )
+        )
+
+
+def test_consistency_check_adds_new_rows_to_running_totals(client: TestClient, db_engine) -> None:
+    _import_alpha(client)
+    assert _run_check(db_engine) == (1, 0)
+    moved = client.post(
+        "/api/v1/types/1/move",
+        json={"from_stage": "IN_BOX", "to_stage": "PRIMING", "qty": 3},
+    )
+    assert moved.status_code == 200
+
+    assert _run_check(db_engine) == (1, 0)
+    with db_engine.begin() as connection:
+        mark = connection.execute(
+            text("SELECT totals_history_mark FROM consistency_checks WHERE id = 1")
+        ).scalar_one()
+        totals = connection.execute(
+            text("SELECT stage_name, expected FROM consistency_expected_counts WHERE expected <> 0")
+        )
+        nonzero_totals = {stage_name: expected for stage_name, expected in totals}
+
+    assert mark == 2
+    assert nonzero_totals == {"IN_BOX": 2, "BUILDING": 2, "PRIMING": 3}
+
+    _insert_drifting_history(db_engine)
+    assert _run_check(db_engine) == (1, 2)
+
+
+def _totals_history_mark(db_engine) -> int:
+    with db_engine.connect() as connection:
+        return connection.execute(
+            text("SELECT totals_history_mark FROM consistency_checks WHERE id = 1")
+        ).scalar_one()
+
+
+def test_consistency_totals_wait_for_imports_still_in_flight(client: TestClient, db_engine) -> None:
+    if db_engine.dialect.name != "postgresql":
+        pytest.skip("Ids are only drawn before commit on PostgreSQL")
+    _import_alpha(client)
+    beta = client.post("/api/v1/types", json={"name": "Beta"}).json()["id"]
+    with db_engine.begin() as connection:
+        connection.execute(
+            text(
+                "UPDATE stage_counts SET count = 10 WHERE type_id = :id AND stage_name = 'IN_BOX'"
+            ),
+            {"id": beta},
+        )
+        connection.execute(
+            text(
+                "INSERT INTO stage_count_adjustments (type_id, stage_name, delta)"
+                " VALUES (:id, 'IN_BOX', 10)"
+            ),
+            {"id": beta},
+        )
+    assert _run_check(db_engine)[1] == 0
+
+    # A long import draws a history id and keeps it invisible while later
+    # moves commit above it and the verifier runs.
+    import_connection = db_engine.connect()
+    import_transaction = import_connection.begin()
+    try:
+        import_connection.execute(
+            text("SELECT count FROM stage_counts WHERE type_id = 1 FOR UPDATE")
+        )
+        import_history_id = import_connection.execute(
+            text(
+                """
+                INSERT INTO history_logs (type_id, from_stage, to_stage, qty, created_at)
+                VALUES (1, 'IN_BOX', 'DONE', 1, '2026-02-26 09:00:00+00')
+                RETURNING id
+                """
+            )
+        ).scalar_one()
+        import_connection.execute(
+            text(
+                """
+                UPDATE stage_counts
+                SET count = count + CASE stage_name WHEN 'DONE' THEN 1 ELSE -1 END
+                WHERE type_id = 1 AND stage_name IN ('IN_BOX', 'DONE')
+                """
+            )
+        )
+        for _ in range(3):
+            moved = client.post(
+                f"/api/v1/types/{beta}/move",
+                json={"from_stage": "IN_BOX", "to_stage": "BUILDING", "qty": 1},
+            )
+            assert moved.status_code == 200
+            assert _run_check(db_engine)[1] == 0
+        assert _totals_history_mark(db_engine) < import_history_id
+        import_transaction.commit()
+    finally:
+        import_connection.close()
+
+    assert _run_check(db_engine)[1] == 0
+    assert _run_check(db_engine)[1] == 0
+    assert _totals_history_mark(db_engine) > import_history_id
+    assert client.get("/api/v1/consistency").json()["discrepancies"] == []
+
+
+def test_consistency_cycle_exports_metrics(client: TestClient, db_engine) -> None:
+    _import_alpha(client)
+    _insert_drifting_history(db_engine)
+
+    run_consistency_cycle(sessionmaker(db_engine), sweep_batch_size=100)
+
+    samples = {
+        (sample.name, sample.labels.get("stage")): sample.value
+        for family in text_string_to_metric_families(client.get("/metrics").text)
+        for sample in family.samples
+    }
+    assert samples[("consistency_discrepancies", "BUILDING")] == 1
+    assert samples[("consistency_discrepancies", "DONE")] == 1
+    assert samples[("consistency_discrepancies", "IN_BOX")] == 0
+    assert samples[("consistency_check_last_run_timestamp_seconds", None)] > 0
+    assert samples[("consistency_check_duration_seconds_count", None)] >= 1
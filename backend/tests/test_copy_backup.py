@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.admin.copy_backup import BackupFormat, dump_backup, restore_backup
+from app.workers.consistency import run_consistency_check
+
+
+@pytest.fixture(autouse=True)
+def _postgresql_only(database_url) -> None:
+    if not database_url.startswith("postgresql"):
+        pytest.skip("Backups use PostgreSQL COPY.")
+
+
+def _seed(client: TestClient, db_engine) -> None:
+    client.post("/api/v1/types", json={"name": "Zeta"})
+    client.post("/api/v1/types", json={"name": 'Alpha, "Vanguard"'})
+    with db_engine.begin() as connection:
+        connection.execute(
+            text("UPDATE stage_counts SET count = 5 WHERE type_id = 2 AND stage_name = 'IN_BOX'")
+        )
+        connection.execute(
+            text(
+                """
+                INSERT INTO history_logs (type_id, from_stage, to_stage, qty, created_at)
+                VALUES
+                    (2, 'IN_BOX', 'BUILDING', 2, '2026-02-25 09:00:00+00'),
+                    (2, 'BUILDING', 'PAINTING', 1, '2026-02-25 09:10:00.250000+00'),
+                    (1, 'IN_BOX', 'PRIMING', 4, '2026-02-25 10:00:00+00')
+                """
+            )
+        )
+
+
+def test_csv_dump_matches_export_csv_tables(client: TestClient, db_engine, tmp_path) -> None:
+    _seed(client, db_engine)
+
+    manifest = dump_backup(sessionmaker(bind=db_engine), tmp_path, BackupFormat.CSV)
+
+    assert (manifest.types, manifest.history) == (2, 3)
+    for table in ("types", "history"):
+        exported = client.get("/api/v1/export", params={"format": "csv", "table": table})
+        assert (tmp_path / f"{table}.csv").read_text() == exported.text
+
+
+@pytest.mark.parametrize("backup_format", list(BackupFormat))
+def test_restore_replaces_data_with_backup(
+    client: TestClient, db_engine, tmp_path, backup_format: BackupFormat
+) -> None:
+    _seed(client, db_engine)
+    session_factory = sessionmaker(bind=db_engine)
+    expected = client.get("/api/v1/export").json()
+    dump_backup(session_factory, tmp_path, backup_format)
+
+    client.post("/api/v1/types", json={"name": "Added later"})
+    client.post(
+        "/api/v1/types/2/move",
+        json={"from_stage": "IN_BOX", "to_stage": "DONE", "qty": 1},
+    )
+    manifest = restore_backup(session_factory, tmp_path)
+
+    assert (manifest.types, manifest.history) == (2, 3)
+    assert client.get("/api/v1/export").json() == expected
+    with Session(db_engine) as db_session, db_session.begin():
+        assert run_consistency_check(db_session, sweep_batch_size=100).discrepancies == 0
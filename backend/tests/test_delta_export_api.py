@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import concurrent.futures
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.api.v1.delta import hold_import_lock
+from app.workers.consistency import run_consistency_check
+
+
+def _stage_counts(in_box: int, building: int) -> list[dict[str, object]]:
+    return [
+        {"stage": "IN_BOX", "count": in_box},
+        {"stage": "BUILDING", "count": building},
+        {"stage": "PRIMING", "count": 0},
+        {"stage": "PAINTING", "count": 0},
+        {"stage": "DONE", "count": 0},
+    ]
+
+
+def _delta_payload(since: str, token: str, in_box: int, building: int) -> dict[str, object]:
+    return {
+        "since": since,
+        "token": token,
+        "types": [
+            {
+                "name": "Alpha",
+                "stage_counts": _stage_counts(in_box, building),
+                "history": [
+                    {
+                        "from_stage": "IN_BOX",
+                        "to_stage": "BUILDING",
+                        "qty": 2,
+                        "created_at": "2026-02-25T09:00:00Z",
+                    }
+                ],
+            }
+        ],
+    }
+
+
+def test_delta_export_returns_only_changes_since_token(client: TestClient, db_engine) -> None:
+    imported = client.post(
+        "/api/v1/import",
+        json={
+            "types": [
+                {"name": "Alpha", "stage_counts": _stage_counts(5, 0), "history": []},
+                {"name": "Beta", "stage_counts": _stage_counts(3, 0), "history": []},
+            ]
+        },
+    )
+    assert imported.status_code == 200
+
+    full = client.get("/api/v1/export", params={"since": "0.0"})
+    assert full.status_code == 200
+    assert full.json()["since"] == "0.0"
+    assert [item["name"] for item in full.json()["types"]] == ["Alpha", "Beta"]
+    token = full.json()["token"]
+
+    unchanged = client.get("/api/v1/export", params={"since": token})
+    assert unchanged.json() == {"types": [], "since": token, "token": token}
+
+    moved = client.post(
+        "/api/v1/types/2/move",
+        json={"from_stage": "IN_BOX", "to_stage": "BUILDING", "qty": 1},
+    )
+    assert moved.status_code == 200
+
+    delta = client.get("/api/v1/export", params={"since": token})
+    body = delta.json()
+    assert [item["name"] for item in body["types"]] == ["Beta"]
+    assert body["types"][0]["stage_counts"][:2] == [
+        {"stage": "IN_BOX", "count": 2},
+        {"stage": "BUILDING", "count": 1},
+    ]
+    assert [(row["from_stage"], row["qty"]) for row in body["types"][0]["history"]] == [
+        ("IN_BOX", 1)
+    ]
+    assert body["token"] != token
+
+
+def test_delta_export_rejects_malformed_token_and_streaming_format(
+    client: TestClient, db_engine
+) -> None:
+    malformed = client.get("/api/v1/export", params={"since": "abc"})
+    streaming = client.get("/api/v1/export", params={"since": "0.0", "format": "ndjson"})
+
+    assert malformed.status_code == 400
+    assert malformed.json()["code"] == "ERR_VALIDATION"
+    assert streaming.status_code == 400
+    assert streaming.json()["code"] == "ERR_VALIDATION"
+
+
+def test_delta_import_sets_counts_and_skips_already_applied_tokens(
+    client: TestClient, db_engine
+) -> None:
+    first = client.post(
+        "/api/v1/import",
+        params={"mode": "delta"},
+        json=_delta_payload("0.0", "1.1", in_box=3, building=2),
+    )
+    retried = client.post(
+        "/api/v1/import",
+        params={"mode": "delta"},
+        json=_delta_payload("0.0", "1.1", in_box=3, building=2),
+    )
+    out_of_order = client.post(
+        "/api/v1/import",
+        params={"mode": "delta"},
+        json=_delta_payload("5.5", "6.6", in_box=1, building=4),
+    )
+
+    assert first.status_code == 200
+    assert retried.status_code == 200
+    assert out_of_order.status_code == 400
+    assert out_of_order.json()["code"] == "ERR_INVALID_IMPORT_FORMAT"
+
+    with db_engine.connect() as connection:
+        history_rows = connection.execute(text("SELECT COUNT(*) FROM history_logs")).scalar_one()
+        applied_token = connection.execute(
+            text("SELECT applied_delta_token FROM data_revisions WHERE id = 1")
+        ).scalar_one()
+    details = client.get("/api/v1/types/1").json()
+    with Session(db_engine) as db_session, db_session.begin():
+        check = run_consistency_check(db_session, sweep_batch_size=100)
+
+    assert history_rows == 1
+    assert applied_token == "1.1"
+    assert details["counts"]["in_box"] == 3
+    assert details["counts"]["building"] == 2
+    assert check.discrepancies == 0
+
+
+def _wait_for_advisory_lock_waiter(db_engine) -> None:
+    deadline = time.monotonic() + 10
+    with db_engine.connect() as conn:
+        while time.monotonic() < deadline:
+            waiting = conn.execute(
+                text("SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND NOT granted")
+            ).scalar_one()
+            if waiting:
+                return
+            conn.rollback()
+            time.sleep(0.05)
+    pytest.fail("the delta export never waited for the import lock")
+
+
+def test_delta_export_waits_for_imports_without_blocking_writers(
+    client: TestClient, db_engine
+) -> None:
+    if db_engine.dialect.name != "postgresql":
+        pytest.skip("the import lock exists only on PostgreSQL")
+    type_id = client.post("/api/v1/types", json={"name": "Alpha"}).json()["id"]
+
+    with (
+        db_engine.connect() as import_connection,
+        concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool,
+    ):
+        import_transaction = import_connection.begin()
+        try:
+            hold_import_lock(Session(bind=import_connection))
+            import_connection.execute(
+                text("UPDATE miniature_types SET name = name WHERE id = :type_id"),
+                {"type_id": type_id},
+            )
+            delta = pool.submit(client.get, "/api/v1/export", params={"since": "0.0"})
+            _wait_for_advisory_lock_waiter(db_engine)
+
+            created = pool.submit(client.post, "/api/v1/types", json={"name": "Beta"})
+            assert created.result(timeout=10).status_code == 201
+            assert not delta.done()
+        finally:
+            import_transaction.rollback()
+
+        exported = delta.result(timeout=10)
+
+    assert exported.status_code == 200
+    assert {item["name"] for item in exported.json()["types"]} == {"Alpha", "Beta"}
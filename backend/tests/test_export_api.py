@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import csv
+import io
+import json
+
+import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import text
 
@@ -98,3 +103,99 @@ def test_get_export_returns_types_counts_and_full_history(client: TestClient, db
             },
         ]
     }
+
+
+def test_get_export_ndjson_streams_one_line_per_type(client: TestClient, db_engine) -> None:
+    client.post("/api/v1/types", json={"name": "Zeta"})
+    client.post("/api/v1/types", json={"name": "Alpha"})
+    client.post("/api/v1/types", json={"name": "Empty"})
+    with db_engine.begin() as connection:
+        connection.execute(
+            text("UPDATE stage_counts SET count = 5 WHERE type_id = 2 AND stage_name = 'IN_BOX'")
+        )
+        connection.execute(
+            text(
+                """
+                INSERT INTO history_logs (type_id, from_stage, to_stage, qty, created_at)
+                VALUES
+                    (2, 'IN_BOX', 'BUILDING', 2, '2026-02-25 09:00:00+00'),
+                    (2, 'BUILDING', 'PAINTING', 1, '2026-02-25 09:10:00.250000+00'),
+                    (1, 'IN_BOX', 'PRIMING', 4, '2026-02-25 10:00:00+00')
+                """
+            )
+        )
+
+    json_response = client.get("/api/v1/export")
+    ndjson_response = client.get("/api/v1/export", params={"format": "ndjson"})
+
+    assert ndjson_response.status_code == 200
+    assert ndjson_response.headers["content-type"].startswith("application/x-ndjson")
+    lines = ndjson_response.text.splitlines()
+    assert [json.loads(line) for line in lines] == json_response.json()["types"]
+    assert [json.loads(line)["name"] for line in lines] == ["Alpha", "Empty", "Zeta"]
+
+
+def test_get_export_ndjson_is_empty_for_empty_database(client: TestClient, db_engine) -> None:
+    response = client.get("/api/v1/export", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    assert response.text == ""
+
+
+def _seed_columnar_export(client: TestClient, db_engine) -> None:
+    client.post("/api/v1/types", json={"name": "Zeta"})
+    client.post("/api/v1/types", json={"name": "Alpha"})
+    with db_engine.begin() as connection:
+        connection.execute(
+            text("UPDATE stage_counts SET count = 5 WHERE type_id = 2 AND stage_name = 'IN_BOX'")
+        )
+        connection.execute(
+            text(
+                """
+                INSERT INTO history_logs (type_id, from_stage, to_stage, qty, created_at)
+                VALUES
+                    (2, 'IN_BOX', 'BUILDING', 2, '2026-02-25 09:00:00+00'),
+                    (1, 'IN_BOX', 'PRIMING', 4, '2026-02-25 10:00:00+00')
+                """
+            )
+        )
+
+
+def test_get_export_csv_returns_flat_types_and_history_tables(
+    client: TestClient, db_engine
+) -> None:
+    _seed_columnar_export(client, db_engine)
+
+    types_response = client.get("/api/v1/export", params={"format": "csv"})
+    history_response = client.get(
+        "/api/v1/export", params={"format": "csv", "table": "history"}
+    )
+
+    assert types_response.status_code == 200
+    assert types_response.headers["content-type"].startswith("text/csv")
+    assert list(csv.reader(io.StringIO(types_response.text))) == [
+        ["name", "in_box", "building", "priming", "painting", "done"],
+        ["Alpha", "5", "0", "0", "0", "0"],
+        ["Zeta", "0", "0", "0", "0", "0"],
+    ]
+    assert list(csv.reader(io.StringIO(history_response.text))) == [
+        ["name", "from_stage", "to_stage", "qty", "created_at"],
+        ["Alpha", "IN_BOX", "BUILDING", "2", "2026-02-25T09:00:00Z"],
+        ["Zeta", "IN_BOX", "PRIMING", "4", "2026-02-25T10:00:00Z"],
+    ]
+
+
+def test_get_export_parquet_dictionary_encodes_stages(client: TestClient, db_engine) -> None:
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    _seed_columnar_export(client, db_engine)
+
+    response = client.get("/api/v1/export", params={"format": "parquet", "table": "history"})
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    table = pq.read_table(pa.BufferReader(response.content))
+    assert table.column_names == ["name", "from_stage", "to_stage", "qty", "created_at"]
+    assert pa.types.is_dictionary(table.schema.field("from_stage").type)
+    assert table.column("name").to_pylist() == ["Alpha", "Zeta"]
+    assert table.column("to_stage").to_pylist() == ["BUILDING", "PRIMING"]
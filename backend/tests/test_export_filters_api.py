@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+
+def _seed(client: TestClient, db_engine) -> None:
+    for name in ("Ultramarines Squad", "Orks", "Ultramarines Tank", "50% Off", "500 Boyz"):
+        assert client.post("/api/v1/types", json={"name": name}).status_code == 201
+    with db_engine.begin() as connection:
+        connection.execute(
+            text(
+                """
+                INSERT INTO history_logs (type_id, from_stage, to_stage, qty, created_at)
+                VALUES
+                    (1, 'IN_BOX', 'BUILDING', 1, '2026-02-24 09:00:00+00'),
+                    (1, 'BUILDING', 'PAINTING', 1, '2026-02-25 09:00:00+00'),
+                    (2, 'IN_BOX', 'PRIMING', 4, '2026-02-25 10:00:00+00'),
+                    (3, 'IN_BOX', 'DONE', 2, '2026-02-26 09:00:00+00')
+                """
+            )
+        )
+
+
+def _names(response) -> list[str]:
+    assert response.status_code == 200
+    return [item["name"] for item in response.json()["types"]]
+
+
+def test_export_filters_types_by_name_prefix_and_ids(client: TestClient, db_engine) -> None:
+    _seed(client, db_engine)
+
+    by_prefix = client.get("/api/v1/export", params={"name": "Ultramarines"})
+    by_literal_prefix = client.get("/api/v1/export", params={"name": "50%"})
+    by_ids = client.get("/api/v1/export", params=[("type_ids", 2), ("type_ids", 3)])
+    combined = client.get(
+        "/api/v1/export", params=[("type_ids", 1), ("type_ids", 2), ("name", "Ork")]
+    )
+
+    assert _names(by_prefix) == ["Ultramarines Squad", "Ultramarines Tank"]
+    assert _names(by_literal_prefix) == ["50% Off"]
+    assert _names(by_ids) == ["Orks", "Ultramarines Tank"]
+    assert _names(combined) == ["Orks"]
+    assert [len(item["history"]) for item in by_prefix.json()["types"]] == [2, 1]
+
+
+def test_export_history_window_keeps_types_and_trims_history(client: TestClient, db_engine) -> None:
+    _seed(client, db_engine)
+    params = {
+        "name": "Ultramarines",
+        "from": "2026-02-25T00:00:00Z",
+        "to": "2026-02-26T00:00:00Z",
+    }
+
+    json_response = client.get("/api/v1/export", params=params)
+    ndjson_response = client.get("/api/v1/export", params={**params, "format": "ndjson"})
+    csv_response = client.get(
+        "/api/v1/export", params={**params, "format": "csv", "table": "history"}
+    )
+
+    types = json_response.json()["types"]
+    assert [item["name"] for item in types] == ["Ultramarines Squad", "Ultramarines Tank"]
+    assert [item["history"] for item in types] == [
+        [
+            {
+                "from_stage": "BUILDING",
+                "to_stage": "PAINTING",
+                "qty": 1,
+                "created_at": "2026-02-25T09:00:00Z",
+            }
+        ],
+        [],
+    ]
+    assert [json.loads(line) for line in ndjson_response.text.splitlines()] == types
+    assert csv_response.text.splitlines()[1:] == [
+        "Ultramarines Squad,BUILDING,PAINTING,1,2026-02-25T09:00:00Z"
+    ]
+
+
+def test_export_rejects_empty_history_window(client: TestClient, db_engine) -> None:
+    response = client.get(
+        "/api/v1/export",
+        params={"from": "2026-02-26T00:00:00Z", "to": "2026-02-25T00:00:00Z"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["code"] == "ERR_VALIDATION"
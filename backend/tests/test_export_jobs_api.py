@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import concurrent.futures
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
+
+from app.config import get_settings
+from app.db.models import ExportJob
+from app.main import create_app
+from app.workers.exports import recover_export_jobs
+
+
+@pytest.fixture
+def export_client(database_url, monkeypatch, tmp_path):
+    # Without a process pool the job runs as a background task before the
+    # test client returns, which keeps these tests deterministic.
+    monkeypatch.setenv("EXPORT_JOB_WORKERS", "0")
+    monkeypatch.setenv("EXPORT_JOBS_DIR", str(tmp_path))
+    get_settings.cache_clear()
+    try:
+        yield TestClient(create_app())
+    finally:
+        get_settings.cache_clear()
+
+
+def _seed_types(client: TestClient) -> None:
+    for name in ("Zeta", "Alpha"):
+        created = client.post("/api/v1/types", json={"name": name})
+        assert created.status_code == 201
+    imported = client.post(
+        "/api/v1/import",
+        json={
+            "types": [
+                {
+                    "name": "Alpha",
+                    "stage_counts": [
+                        {"stage": "IN_BOX", "count": 4},
+                        {"stage": "BUILDING", "count": 0},
+                        {"stage": "PRIMING", "count": 0},
+                        {"stage": "PAINTING", "count": 0},
+                        {"stage": "DONE", "count": 0},
+                    ],
+                    "history": [],
+                }
+            ]
+        },
+    )
+    assert imported.status_code == 200
+    moved = client.post(
+        "/api/v1/types/2/move",
+        json={"from_stage": "IN_BOX", "to_stage": "BUILDING", "qty": 1},
+    )
+    assert moved.status_code == 200
+
+
+def test_export_job_writes_artifact_matching_sync_export(export_client: TestClient) -> None:
+    _seed_types(export_client)
+
+    created = export_client.post("/api/v1/exports", json={"format": "json"})
+    assert created.status_code == 202
+    job = export_client.get(f"/api/v1/exports/{created.json()['id']}").json()
+
+    assert job["status"] == "completed"
+    assert job["total_types"] == 2
+    assert job["exported_types"] == 2
+    artifact = export_client.get(job["download_url"])
+    assert artifact.status_code == 200
+    assert artifact.json() == export_client.get("/api/v1/export").json()
+    assert job["artifact_bytes"] == len(artifact.content)
+
+
+def test_export_job_artifact_supports_range_requests(export_client: TestClient) -> None:
+    _seed_types(export_client)
+    job = export_client.post("/api/v1/exports", json={"format": "ndjson"}).json()
+    full = export_client.get(f"/api/v1/exports/{job['id']}/artifact")
+
+    partial = export_client.get(
+        f"/api/v1/exports/{job['id']}/artifact", headers={"Range": "bytes=5-"}
+    )
+
+    assert partial.status_code == 206
+    assert partial.content == full.content[5:]
+
+
+def test_export_job_is_reused_until_data_changes(export_client: TestClient) -> None:
+    _seed_types(export_client)
+    first = export_client.post("/api/v1/exports", json={})
+    reused = export_client.post("/api/v1/exports", json={})
+
+    assert reused.status_code == 200
+    assert reused.json()["id"] == first.json()["id"]
+
+    created = export_client.post("/api/v1/types", json={"name": "Beta"})
+    assert created.status_code == 201
+    fresh = export_client.post("/api/v1/exports", json={})
+    expired = export_client.get(f"/api/v1/exports/{first.json()['id']}").json()
+
+    assert fresh.status_code == 202
+    assert fresh.json()["id"] != first.json()["id"]
+    assert expired["status"] == "expired"
+    assert expired["download_url"] is None
+
+
+def test_export_job_does_not_wait_for_in_flight_writers(
+    export_client: TestClient, db_engine
+) -> None:
+    if db_engine.dialect.name != "postgresql":
+        pytest.skip("SQLite serializes writers, so no write is ever in flight")
+    _seed_types(export_client)
+    first = export_client.post("/api/v1/exports", json={})
+
+    with (
+        db_engine.connect() as writer,
+        concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool,
+    ):
+        writer_transaction = writer.begin()
+        try:
+            writer.execute(text("UPDATE miniature_types SET name = name WHERE id = 1"))
+            created = pool.submit(export_client.post, "/api/v1/exports", json={})
+            concurrent_job = created.result(timeout=10)
+        finally:
+            writer_transaction.rollback()
+
+    # The in-flight writer may still commit, so its snapshot is not the
+    # first job's one and the artifact cannot be shared.
+    assert concurrent_job.status_code == 202
+    assert concurrent_job.json()["id"] != first.json()["id"]
+
+
+def test_export_job_is_reused_alongside_unrelated_transactions(
+    export_client: TestClient, db_engine
+) -> None:
+    if db_engine.dialect.name != "postgresql":
+        pytest.skip("Only PostgreSQL revisions cover transactions in flight")
+    _seed_types(export_client)
+    first = export_client.post("/api/v1/exports", json={})
+
+    with db_engine.connect() as other:
+        other_transaction = other.begin()
+        try:
+            # A transaction id and a write that touch none of the exported tables.
+            other.execute(text("SELECT pg_current_xact_id()"))
+            other.execute(text("UPDATE export_jobs SET status = status WHERE id = 0"))
+            reused = export_client.post("/api/v1/exports", json={})
+        finally:
+            other_transaction.rollback()
+
+    assert reused.status_code == 200
+    assert reused.json()["id"] == first.json()["id"]
+
+
+def test_export_job_unknown_id_returns_404(export_client: TestClient) -> None:
+    assert export_client.get("/api/v1/exports/999").status_code == 404
+    assert export_client.get("/api/v1/exports/999/artifact").status_code == 404
+
+
+def test_recover_export_jobs_fails_lost_jobs_and_removes_partial_files(
+    export_client: TestClient, db_engine, tmp_path
+) -> None:
+    stale = datetime.now(UTC) - timedelta(hours=1)
+    with db_engine.begin() as connection:
+        connection.execute(
+            insert(ExportJob),
+            [
+                {"id": 1, "format": "json", "status": "running", "updated_at": stale},
+                {"id": 2, "format": "json", "status": "pending", "updated_at": stale},
+                {"id": 3, "format": "ndjson", "status": "running", "updated_at": datetime.now(UTC)},
+            ],
+        )
+    for name in ("export-1.json.partial", "export-3.ndjson.partial"):
+        (tmp_path / name).write_bytes(b"{")
+
+    recover_export_jobs(str(tmp_path), max_workers=0, stale_after=timedelta(minutes=15))
+
+    jobs = [export_client.get(f"/api/v1/exports/{job_id}").json() for job_id in (1, 2, 3)]
+    assert [job["status"] for job in jobs] == ["failed", "failed", "running"]
+    assert [path.name for path in tmp_path.iterdir()] == ["export-3.ndjson.partial"]
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
+
+from app.db.models import HistoryLog
+
+
+def _zero_counts(overrides: dict[str, int] | None = None) -> dict[str, int]:
+    counts = {"in_box": 0, "building": 0, "priming": 0, "painting": 0, "done": 0}
+    if overrides:
+        counts.update(overrides)
+    return counts
+
+
+def _history_row(
+    type_id: int, from_stage: str, to_stage: str, qty: int, created_at: datetime
+) -> dict[str, object]:
+    return {
+        "type_id": type_id,
+        "from_stage": from_stage,
+        "to_stage": to_stage,
+        "qty": qty,
+        "created_at": created_at,
+    }
+
+
+def _seed_history(db_engine) -> tuple[int, int]:
+    with db_engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO miniature_types (name) VALUES (:name)"),
+            [{"name": "Alpha"}, {"name": "Beta"}],
+        )
+        # Bound through the model's column types, so every backend stores UTC.
+        connection.execute(
+            insert(HistoryLog),
+            [
+                _history_row(1, "IN_BOX", "BUILDING", 2, datetime(2026, 3, 2, 9, tzinfo=UTC)),
+                _history_row(1, "IN_BOX", "BUILDING", 3, datetime(2026, 3, 2, 18, tzinfo=UTC)),
+                _history_row(2, "BUILDING", "PRIMING", 1, datetime(2026, 3, 2, 10, tzinfo=UTC)),
+                _history_row(1, "BUILDING", "DONE", 4, datetime(2026, 3, 4, 8, tzinfo=UTC)),
+                _history_row(2, "IN_BOX", "PAINTING", 6, datetime(2026, 3, 10, 8, tzinfo=UTC)),
+            ],
+        )
+    return 1, 2
+
+
+def test_get_flow_stats_returns_dense_daily_series(client: TestClient, db_engine) -> None:
+    _seed_history(db_engine)
+
+    response = client.get(
+        "/api/v1/stats/flow", params={"bucket": "day", "from": "2026-03-01", "to": "2026-03-04"}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "bucket": "day",
+        "type_id": None,
+        "items": [
+            {"start": "2026-03-01", "counts": _zero_counts()},
+            {"start": "2026-03-02", "counts": _zero_counts({"building": 5, "priming": 1})},
+            {"start": "2026-03-03", "counts": _zero_counts()},
+            {"start": "2026-03-04", "counts": _zero_counts({"done": 4})},
+        ],
+    }
+
+
+def test_get_flow_stats_groups_weeks_and_filters_by_type(client: TestClient, db_engine) -> None:
+    alpha_id, beta_id = _seed_history(db_engine)
+
+    overall = client.get(
+        "/api/v1/stats/flow", params={"bucket": "week", "from": "2026-03-02", "to": "2026-03-15"}
+    )
+    beta_only = client.get(
+        "/api/v1/stats/flow",
+        params={"bucket": "week", "from": "2026-03-02", "to": "2026-03-15", "type_id": beta_id},
+    )
+
+    assert overall.status_code == 200
+    assert overall.json()["items"] == [
+        {"start": "2026-03-02", "counts": _zero_counts({"building": 5, "priming": 1, "done": 4})},
+        {"start": "2026-03-09", "counts": _zero_counts({"painting": 6})},
+    ]
+    assert beta_only.status_code == 200
+    assert beta_only.json()["type_id"] == beta_id
+    assert beta_only.json()["items"] == [
+        {"start": "2026-03-02", "counts": _zero_counts({"priming": 1})},
+        {"start": "2026-03-09", "counts": _zero_counts({"painting": 6})},
+    ]
+    assert alpha_id != beta_id
+
+
+def test_get_flow_stats_recomputes_closed_buckets_after_import(
+    client: TestClient, db_engine
+) -> None:
+    _seed_history(db_engine)
+    params = {"bucket": "day", "from": "2026-03-04", "to": "2026-03-04"}
+
+    before = client.get("/api/v1/stats/flow", params=params)
+    imported = client.post(
+        "/api/v1/import",
+        json={
+            "types": [
+                {
+                    "name": "Alpha",
+                    "stage_counts": [
+                        {"stage": stage, "count": 0}
+                        for stage in ("IN_BOX", "BUILDING", "PRIMING", "PAINTING", "DONE")
+                    ],
+                    "history": [
+                        {
+                            "from_stage": "PAINTING",
+                            "to_stage": "DONE",
+                            "qty": 2,
+                            "created_at": "2026-03-04T12:00:00Z",
+                        }
+                    ],
+                }
+            ]
+        },
+    )
+    after = client.get("/api/v1/stats/flow", params=params)
+
+    assert before.json()["items"] == [{"start": "2026-03-04", "counts": _zero_counts({"done": 4})}]
+    assert imported.status_code == 200
+    assert after.json()["items"] == [{"start": "2026-03-04", "counts": _zero_counts({"done": 6})}]
+
+
+def test_get_flow_stats_rejects_inverted_range(client: TestClient, db_engine) -> None:
+    response = client.get("/api/v1/stats/flow", params={"from": "2026-03-05", "to": "2026-03-01"})
+
+    assert response.status_code == 400
+    assert response.json()["code"] == "ERR_VALIDATION"
+
+
+def test_get_flow_stats_returns_404_for_unknown_type(client: TestClient, db_engine) -> None:
+    response = client.get("/api/v1/stats/flow", params={"type_id": 999})
+
+    assert response.status_code == 404
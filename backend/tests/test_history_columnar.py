@@ -0,0 +1,99 @@
+"""Parity checks between the row-based and columnar history grouping paths."""
+
+from __future__ import annotations
+
+import random
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.api.v1.router import (
+    _group_history_columns,
+    _group_history_rows,
+    _has_history_rows,
+    _HistoryColumns,
+    _HistoryRow,
+)
+from app.db.models import HistoryLog
+from app.domain.stages import STAGE_INDEX, STAGES
+
+
+def _columns_from_rows(rows: list[_HistoryRow]) -> _HistoryColumns:
+    epoch = datetime(1970, 1, 1, tzinfo=UTC)
+    return _HistoryColumns(
+        from_stage=np.asarray([STAGE_INDEX[row.from_stage] for row in rows], dtype=np.int8),
+        to_stage=np.asarray([STAGE_INDEX[row.to_stage] for row in rows], dtype=np.int8),
+        qty=np.asarray([row.qty for row in rows], dtype=np.int64),
+        created_at_us=np.asarray(
+            [(row.created_at - epoch) // timedelta(microseconds=1) for row in rows],
+            dtype=np.int64,
+        ),
+    )
+
+
+def _random_rows(seed: int, row_count: int) -> list[_HistoryRow]:
+    rng = random.Random(seed)
+    transitions = [
+        (from_stage, to_stage)
+        for from_index, from_stage in enumerate(STAGES)
+        for to_stage in STAGES[from_index + 1 :]
+    ]
+    created_at = datetime(2026, 2, 25, 9, 0, tzinfo=UTC)
+    rows: list[_HistoryRow] = []
+    for _ in range(row_count):
+        created_at += timedelta(
+            microseconds=rng.choice([0, 1, 299_999_999, 300_000_000, 300_000_001, 3_600_000_000])
+        )
+        from_stage, to_stage = rng.choice(transitions[:3])
+        rows.append(
+            _HistoryRow(
+                from_stage=from_stage,
+                to_stage=to_stage,
+                qty=rng.randint(1, 50),
+                created_at=created_at,
+            )
+        )
+    return rows
+
+
+def test_group_history_columns_handles_empty_history() -> None:
+    assert _group_history_columns(_columns_from_rows([])) == []
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_group_history_columns_matches_row_grouping(seed: int) -> None:
+    rows = _random_rows(seed, row_count=2_000)
+
+    expected = _group_history_rows(iter(rows))
+    actual = _group_history_columns(_columns_from_rows(rows))
+
+    assert [group.model_dump() for group in actual] == [group.model_dump() for group in expected]
+
+
+def test_has_history_rows_answers_from_a_bounded_probe(client: TestClient, db_engine) -> None:
+    alpha_id = client.post("/api/v1/types", json={"name": "Alpha"}).json()["id"]
+    beta_id = client.post("/api/v1/types", json={"name": "Beta"}).json()["id"]
+    rows = _random_rows(seed=0, row_count=3)
+    with db_engine.begin() as connection:
+        connection.execute(
+            insert(HistoryLog),
+            [
+                {
+                    "type_id": alpha_id,
+                    "from_stage": row.from_stage,
+                    "to_stage": row.to_stage,
+                    "qty": row.qty,
+                    "created_at": row.created_at,
+                }
+                for row in rows
+            ],
+        )
+
+    with Session(db_engine) as db_session:
+        assert _has_history_rows(db_session, alpha_id, 3)
+        assert not _has_history_rows(db_session, alpha_id, 4)
+        assert not _has_history_rows(db_session, beta_id, 1)
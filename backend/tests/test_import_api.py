@@ -1,8 +1,7 @@
 from __future__ import annotations
 
 from fastapi.testclient import TestClient
-from sqlalchemy import text
-
+from sqlalchemy import inspect, text
 
 
 ERR_INVALID_IMPORT_FORMAT = {
@@ -517,3 +516,254 @@ def test_post_import_atomicity_valid_type_rolled_back_when_later_type_fails(
     assert in_box == 5, "Survivor counts must remain unchanged"
     assert crasher_exists == 0, "Crasher type must not be created"
     assert history_count == 1, "Only the pre-existing history row should remain"
+
+
+def test_post_import_applies_repeated_type_names_in_body_order(
+    client: TestClient, db_engine
+) -> None:
+    history_item = {
+        "from_stage": "IN_BOX",
+        "to_stage": "BUILDING",
+        "qty": 1,
+        "created_at": "2026-02-25T09:00:00Z",
+    }
+    response = client.post(
+        "/api/v1/import",
+        json={
+            "types": [
+                {
+                    "name": "Twice",
+                    "stage_counts": _all_stages_zero({"IN_BOX": 2, "BUILDING": 1}),
+                    "history": [history_item],
+                },
+                {
+                    "name": "Twice",
+                    "stage_counts": _all_stages_zero({"IN_BOX": 3}),
+                    "history": [history_item, history_item],
+                },
+            ]
+        },
+    )
+    assert response.status_code == 200
+
+    with db_engine.begin() as conn:
+        type_ids = (
+            conn.execute(text("SELECT id FROM miniature_types WHERE name = 'Twice'"))
+            .scalars()
+            .all()
+        )
+        counts = dict(
+            conn.execute(
+                text("SELECT stage_name, count FROM stage_counts WHERE type_id = :tid"),
+                {"tid": type_ids[0]},
+            ).all()
+        )
+        history_count = conn.execute(text("SELECT COUNT(*) FROM history_logs")).scalar_one()
+
+    assert len(type_ids) == 1
+    assert counts == {"IN_BOX": 5, "BUILDING": 1, "PRIMING": 0, "PAINTING": 0, "DONE": 0}
+    assert history_count == 3
+
+
+# ---------------------------------------------------------------------------
+# Idempotent mode: history deduplicated by content hash
+# ---------------------------------------------------------------------------
+
+
+def _type_state(db_engine, name: str) -> tuple[dict[str, int], int]:
+    with db_engine.begin() as conn:
+        type_id = conn.execute(
+            text("SELECT id FROM miniature_types WHERE name = :name"), {"name": name}
+        ).scalar_one()
+        counts = dict(
+            conn.execute(
+                text("SELECT stage_name, count FROM stage_counts WHERE type_id = :tid"),
+                {"tid": type_id},
+            ).all()
+        )
+        history_count = conn.execute(
+            text("SELECT COUNT(*) FROM history_logs WHERE type_id = :tid"),
+            {"tid": type_id},
+        ).scalar_one()
+    return counts, history_count
+
+
+def test_post_import_idempotent_reimport_is_noop(client: TestClient, db_engine) -> None:
+    history_item = {
+        "from_stage": "IN_BOX",
+        "to_stage": "BUILDING",
+        "qty": 2,
+        "created_at": "2026-02-25T09:00:00Z",
+    }
+    payload = {
+        "types": [
+            {
+                "name": "Synced",
+                "stage_counts": _all_stages_zero({"IN_BOX": 5, "BUILDING": 4}),
+                "history": [history_item, history_item],
+            }
+        ]
+    }
+
+    for _attempt in range(2):
+        response = client.post("/api/v1/import", params={"mode": "idempotent"}, json=payload)
+        assert response.status_code == 200
+    counts, history_count = _type_state(db_engine, "Synced")
+
+    assert counts == {"IN_BOX": 5, "BUILDING": 4, "PRIMING": 0, "PAINTING": 0, "DONE": 0}
+    # Identical events within one item are distinct; only the re-import is dropped.
+    assert history_count == 2
+
+
+def test_post_import_idempotent_applies_only_new_events(client: TestClient, db_engine) -> None:
+    known_event = {
+        "from_stage": "IN_BOX",
+        "to_stage": "BUILDING",
+        "qty": 2,
+        "created_at": "2026-02-25T09:00:00Z",
+    }
+    new_event = {
+        "from_stage": "BUILDING",
+        "to_stage": "PRIMING",
+        "qty": 1,
+        "created_at": "2026-02-26T09:00:00+03:00",
+    }
+    first = client.post(
+        "/api/v1/import",
+        params={"mode": "idempotent"},
+        json={
+            "types": [
+                {
+                    "name": "Synced",
+                    "stage_counts": _all_stages_zero({"IN_BOX": 5, "BUILDING": 2}),
+                    "history": [known_event],
+                }
+            ]
+        },
+    )
+    assert first.status_code == 200
+
+    second = client.post(
+        "/api/v1/import",
+        params={"mode": "idempotent"},
+        json={
+            "types": [
+                {
+                    "name": "Synced",
+                    "stage_counts": _all_stages_zero({"IN_BOX": 9, "BUILDING": 1, "PRIMING": 1}),
+                    "history": [known_event, new_event],
+                }
+            ]
+        },
+    )
+    assert second.status_code == 200
+    counts, history_count = _type_state(db_engine, "Synced")
+
+    # Counts of an existing type move only by the flow of the new event.
+    assert counts == {"IN_BOX": 5, "BUILDING": 1, "PRIMING": 1, "PAINTING": 0, "DONE": 0}
+    assert history_count == 2
+
+
+def test_post_import_idempotent_reimport_keeps_change_markers(
+    client: TestClient, db_engine
+) -> None:
+    payload = {
+        "types": [
+            {
+                "name": "Synced",
+                "stage_counts": _all_stages_zero({"IN_BOX": 1}),
+                "history": [],
+            }
+        ]
+    }
+    first = client.post("/api/v1/import", params={"mode": "idempotent"}, json=payload)
+    assert first.status_code == 200
+    with db_engine.begin() as conn:
+        marker = conn.execute(text("SELECT change_seq FROM miniature_types")).scalar_one()
+
+    second = client.post("/api/v1/import", params={"mode": "idempotent"}, json=payload)
+    assert second.status_code == 200
+    with db_engine.begin() as conn:
+        assert conn.execute(text("SELECT change_seq FROM miniature_types")).scalar_one() == marker
+
+
+# ---------------------------------------------------------------------------
+# Replace mode: all types, counts and history swapped for the payload
+# ---------------------------------------------------------------------------
+
+
+def test_post_import_replace_swaps_all_data(client: TestClient, db_engine) -> None:
+    seeded = client.post(
+        "/api/v1/import",
+        json={
+            "types": [
+                {
+                    "name": "Old",
+                    "stage_counts": _all_stages_zero({"IN_BOX": 4}),
+                    "history": [
+                        {
+                            "from_stage": "IN_BOX",
+                            "to_stage": "BUILDING",
+                            "qty": 1,
+                            "created_at": "2026-02-24T09:00:00Z",
+                        }
+                    ],
+                }
+            ]
+        },
+    )
+    assert seeded.status_code == 200
+
+    response = client.post(
+        "/api/v1/import",
+        params={"mode": "replace"},
+        json={
+            "types": [
+                {
+                    "name": "New",
+                    "stage_counts": _all_stages_zero({"IN_BOX": 1, "DONE": 2}),
+                    "history": [
+                        {
+                            "from_stage": "IN_BOX",
+                            "to_stage": "DONE",
+                            "qty": 2,
+                            "created_at": "2026-02-25T09:00:00Z",
+                        }
+                    ],
+                }
+            ]
+        },
+    )
+    assert response.status_code == 200
+
+    with db_engine.begin() as conn:
+        names = conn.execute(text("SELECT name FROM miniature_types")).scalars().all()
+    counts, history_count = _type_state(db_engine, "New")
+    history_indexes = {index["name"] for index in inspect(db_engine).get_indexes("history_logs")}
+
+    assert names == ["New"]
+    assert counts == {"IN_BOX": 1, "BUILDING": 0, "PRIMING": 0, "PAINTING": 0, "DONE": 2}
+    assert history_count == 1
+    assert "ix_history_logs_type_id_created_at" in history_indexes
+
+
+def test_post_import_replace_keeps_data_on_invalid_payload(client: TestClient, db_engine) -> None:
+    seeded = client.post(
+        "/api/v1/import",
+        json={"types": [{"name": "Kept", "stage_counts": _all_stages_zero(), "history": []}]},
+    )
+    assert seeded.status_code == 200
+
+    response = client.post(
+        "/api/v1/import",
+        params={"mode": "replace"},
+        json={"types": [{"name": "Broken", "stage_counts": [], "history": []}]},
+    )
+
+    assert response.status_code == 400
+    assert response.json() == ERR_INVALID_IMPORT_FORMAT
+    with db_engine.begin() as conn:
+        names = conn.execute(text("SELECT name FROM miniature_types")).scalars().all()
+    history_indexes = {index["name"] for index in inspect(db_engine).get_indexes("history_logs")}
+    assert names == ["Kept"]
+    assert "ix_history_logs_type_id_created_at" in history_indexes
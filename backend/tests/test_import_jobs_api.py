@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
+
+from app.api.v1 import importing
+from app.config import get_settings
+from app.db.models import ImportJob, ImportJobType
+from app.main import create_app
+from app.workers import imports
+from app.workers.imports import recover_import_jobs
+
+
+@pytest.fixture
+def import_client(database_url, monkeypatch, tmp_path):
+    # Without a process pool the job runs as a background task before the
+    # test client returns, which keeps these tests deterministic.
+    monkeypatch.setenv("IMPORT_JOB_WORKERS", "0")
+    monkeypatch.setenv("IMPORT_JOBS_DIR", str(tmp_path))
+    get_settings.cache_clear()
+    try:
+        yield TestClient(create_app())
+    finally:
+        get_settings.cache_clear()
+
+
+def _type_item(name: str, qty: int = 1) -> dict[str, object]:
+    return {
+        "name": name,
+        "stage_counts": [
+            {"stage": "IN_BOX", "count": 2},
+            {"stage": "BUILDING", "count": 0},
+            {"stage": "PRIMING", "count": 0},
+            {"stage": "PAINTING", "count": 0},
+            {"stage": "DONE", "count": 0},
+        ],
+        "history": [
+            {
+                "from_stage": "IN_BOX",
+                "to_stage": "BUILDING",
+                "qty": qty,
+                "created_at": "2026-02-25T09:00:00Z",
+            }
+        ],
+    }
+
+
+def _post_import_job(client: TestClient, body: bytes, **params: str):
+    return client.post(
+        "/api/v1/imports",
+        params=params,
+        content=body,
+        headers={"Content-Type": "application/json"},
+    )
+
+
+def test_import_job_applies_payload_and_reports_outcomes(
+    import_client: TestClient, db_engine, tmp_path
+) -> None:
+    body = json.dumps({"types": [_type_item("Alpha"), _type_item("Beta")]}).encode()
+
+    created = _post_import_job(import_client, body)
+    assert created.status_code == 202
+    assert created.json()["status"] == "pending"
+    job = import_client.get(f"/api/v1/imports/{created.json()['id']}").json()
+
+    assert job["status"] == "completed"
+    assert job["commit_mode"] == "single"
+    assert job["processed_types"] == 2
+    assert job["processed_rows"] == 2
+    assert job["rows_per_second"] is not None
+    assert [(item["name"], item["outcome"]) for item in job["types"]] == [
+        ("Alpha", "applied"),
+        ("Beta", "applied"),
+    ]
+    assert list(tmp_path.iterdir()) == []
+    with db_engine.connect() as connection:
+        history_rows = connection.execute(text("SELECT COUNT(*) FROM history_logs")).scalar_one()
+    assert history_rows == 2
+
+
+def test_import_job_single_commit_rolls_back_on_late_error(
+    import_client: TestClient, db_engine, monkeypatch
+) -> None:
+    monkeypatch.setattr(importing, "IMPORT_CHUNK_HISTORY_ROWS", 1)
+    body = json.dumps({"types": [_type_item("Alpha")]}).encode()[:-2] + b",{"
+
+    created = _post_import_job(import_client, body)
+    job = import_client.get(f"/api/v1/imports/{created.json()['id']}").json()
+
+    assert job["status"] == "failed"
+    assert job["error_code"] == "ERR_VALIDATION"
+    assert [item["outcome"] for item in job["types"]] == ["rolled_back"]
+    with db_engine.connect() as connection:
+        type_count = connection.execute(text("SELECT COUNT(*) FROM miniature_types")).scalar_one()
+    assert type_count == 0
+
+
+def test_import_job_chunked_commit_keeps_committed_chunks(
+    import_client: TestClient, db_engine, monkeypatch
+) -> None:
+    monkeypatch.setattr(importing, "IMPORT_CHUNK_HISTORY_ROWS", 1)
+    body = json.dumps(
+        {"types": [_type_item("Alpha"), _type_item("Beta"), _type_item("Broken", qty=-1)]}
+    ).encode()
+
+    created = _post_import_job(import_client, body, commit="chunked")
+    job = import_client.get(f"/api/v1/imports/{created.json()['id']}").json()
+
+    assert job["status"] == "failed"
+    assert job["error_code"] == "ERR_INVALID_IMPORT_FORMAT"
+    assert [(item["name"], item["outcome"]) for item in job["types"]] == [
+        ("Alpha", "applied"),
+        ("Beta", "applied"),
+    ]
+    with db_engine.connect() as connection:
+        names = (
+            connection.execute(text("SELECT name FROM miniature_types ORDER BY name"))
+            .scalars()
+            .all()
+        )
+    assert names == ["Alpha", "Beta"]
+
+
+def test_import_job_rejects_chunked_delta_and_unknown_job(import_client: TestClient) -> None:
+    body = json.dumps({"types": [], "since": "0.0", "token": "0.0"}).encode()
+
+    chunked_delta = _post_import_job(import_client, body, mode="delta", commit="chunked")
+    missing = import_client.get("/api/v1/imports/999")
+
+    assert chunked_delta.status_code == 400
+    assert chunked_delta.json()["code"] == "ERR_VALIDATION"
+    assert missing.status_code == 404
+
+
+def _insert_job(db_engine, job_id: int, status: str, updated_at: datetime) -> None:
+    with db_engine.begin() as connection:
+        connection.execute(
+            insert(ImportJob).values(
+                id=job_id,
+                mode="merge",
+                commit_mode="single",
+                status=status,
+                body_bytes=2,
+                updated_at=updated_at,
+            )
+        )
+
+
+def test_recover_import_jobs_fails_lost_jobs_and_removes_orphaned_files(
+    import_client: TestClient, db_engine, tmp_path
+) -> None:
+    stale = datetime.now(UTC) - timedelta(hours=1)
+    _insert_job(db_engine, 1, "running", stale)
+    _insert_job(db_engine, 2, "pending", stale)
+    _insert_job(db_engine, 3, "running", datetime.now(UTC))
+    with db_engine.begin() as connection:
+        connection.execute(
+            insert(ImportJobType).values(
+                job_id=1, position=0, name="Alpha", history_rows=1, outcome="pending"
+            )
+        )
+    for name in ("import-2.body", "import-3.body", "import-9.body", "upload-old.partial"):
+        (tmp_path / name).write_bytes(b"{}")
+    (tmp_path / "upload-new.partial").write_bytes(b"{}")
+    os.utime(tmp_path / "upload-old.partial", (stale.timestamp(), stale.timestamp()))
+
+    recover_import_jobs(str(tmp_path), max_workers=0, stale_after=timedelta(minutes=15))
+
+    jobs = {job_id: import_client.get(f"/api/v1/imports/{job_id}").json() for job_id in (1, 2, 3)}
+    assert [jobs[job_id]["status"] for job_id in (1, 2, 3)] == ["failed", "failed", "running"]
+    assert [item["outcome"] for item in jobs[1]["types"]] == ["rolled_back"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "import-3.body",
+        "upload-new.partial",
+    ]
+
+
+def test_recover_import_jobs_keeps_silent_jobs_whose_worker_is_alive(
+    import_client: TestClient, db_engine, tmp_path
+) -> None:
+    # A SQLite import writes no heartbeat until it commits; its worker holds
+    # the body locked for as long as it runs.
+    stale = datetime.now(UTC) - timedelta(hours=1)
+    _insert_job(db_engine, 1, "running", stale)
+    body_path = tmp_path / "import-1.body"
+    body_path.write_bytes(b"{}")
+
+    with body_path.open("rb") as body_file:
+        fcntl.flock(body_file, fcntl.LOCK_EX)
+        recover_import_jobs(str(tmp_path), max_workers=1, stale_after=timedelta(minutes=15))
+        assert import_client.get("/api/v1/imports/1").json()["status"] == "running"
+        assert body_path.is_file()
+
+    recover_import_jobs(str(tmp_path), max_workers=1, stale_after=timedelta(minutes=15))
+    assert import_client.get("/api/v1/imports/1").json()["status"] == "failed"
+
+
+def test_recover_import_jobs_requeues_stale_pending_jobs_with_a_body(
+    import_client: TestClient, db_engine, tmp_path, monkeypatch
+) -> None:
+    submitted: list[int] = []
+    monkeypatch.setattr(
+        imports, "submit_import_job", lambda _workers, job_id, _dir: submitted.append(job_id)
+    )
+    stale = datetime.now(UTC) - timedelta(hours=1)
+    _insert_job(db_engine, 1, "pending", stale)
+    _insert_job(db_engine, 2, "pending", stale)
+    (tmp_path / "import-1.body").write_bytes(b"{}")
+
+    recover_import_jobs(str(tmp_path), max_workers=1, stale_after=timedelta(minutes=15))
+
+    assert submitted == [1]
+    assert import_client.get("/api/v1/imports/1").json()["status"] == "pending"
+    assert import_client.get("/api/v1/imports/2").json()["status"] == "failed"
+    assert (tmp_path / "import-1.body").is_file()
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.engine import TwoPhaseTransaction
+from sqlalchemy.exc import OperationalError
+
+from app.api.v1 import importing
+
+STAGES = ("IN_BOX", "BUILDING", "PRIMING", "PAINTING", "DONE")
+
+
+def _type_item(name: str, qty: int = 1) -> dict[str, object]:
+    return {
+        "name": name,
+        "stage_counts": [
+            {"stage": stage, "count": 3 if stage == "BUILDING" else 0} for stage in STAGES
+        ],
+        "history": [
+            {
+                "from_stage": "IN_BOX",
+                "to_stage": "BUILDING",
+                "qty": qty,
+                "created_at": "2026-02-25T09:00:00Z",
+            }
+        ],
+    }
+
+
+def _injected_failure() -> OperationalError:
+    return OperationalError("PREPARE TRANSACTION", {}, Exception("injected failure"))
+
+
+@pytest.fixture
+def prepared_transactions(db_engine) -> None:
+    if db_engine.dialect.name != "postgresql":
+        pytest.skip("Parallel imports run on PostgreSQL only.")
+    with db_engine.connect() as connection:
+        capacity = connection.execute(text("SHOW max_prepared_transactions")).scalar_one()
+    if int(capacity) < 4:
+        pytest.skip("Parallel imports need max_prepared_transactions >= 4.")
+
+
+def _table_counts(db_engine) -> tuple[int, int, int]:
+    with db_engine.connect() as connection:
+        return (
+            connection.execute(text("SELECT COUNT(*) FROM miniature_types")).scalar_one(),
+            connection.execute(text("SELECT COUNT(*) FROM history_logs")).scalar_one(),
+            connection.execute(text("SELECT COUNT(*) FROM pg_prepared_xacts")).scalar_one(),
+        )
+
+
+def _post_import(client: TestClient, payload: dict[str, object], **params: object):
+    return client.post(
+        "/api/v1/import",
+        params=params,
+        content=json.dumps(payload),
+        headers={"Content-Type": "application/json"},
+    )
+
+
+def test_post_import_with_workers_applies_every_type(client: TestClient, db_engine) -> None:
+    payload = {"types": [_type_item(f"Type {index:02d}") for index in range(20)]}
+    payload["types"].append(_type_item("Type 00"))
+
+    response = _post_import(client, payload, workers=4)
+
+    assert response.status_code == 200
+    with db_engine.connect() as connection:
+        counts = dict(
+            connection.execute(
+                text(
+                    "SELECT t.name, sc.count FROM stage_counts sc "
+                    "JOIN miniature_types t ON t.id = sc.type_id "
+                    "WHERE sc.stage_name = 'BUILDING'"
+                )
+            ).all()
+        )
+        history_rows = connection.execute(text("SELECT COUNT(*) FROM history_logs")).scalar_one()
+    assert len(counts) == 20
+    assert counts["Type 00"] == 6
+    assert history_rows == 21
+
+
+def test_post_import_with_workers_rolls_back_every_worker(
+    client: TestClient, db_engine, monkeypatch
+) -> None:
+    # One type per chunk, so workers have applied their share before the error.
+    monkeypatch.setattr(importing, "IMPORT_CHUNK_HISTORY_ROWS", 1)
+    payload = {"types": [_type_item(f"Type {index:02d}") for index in range(20)]}
+    payload["types"].append(_type_item("Broken", qty=0))
+
+    response = _post_import(client, payload, workers=4)
+
+    assert response.status_code == 400
+    assert response.json()["code"] == "ERR_INVALID_IMPORT_FORMAT"
+    with db_engine.connect() as connection:
+        type_count = connection.execute(text("SELECT COUNT(*) FROM miniature_types")).scalar_one()
+    assert type_count == 0
+
+
+def test_post_import_rejects_workers_for_delta(client: TestClient) -> None:
+    payload = {"types": [], "since": "0.0", "token": "0.0"}
+
+    response = _post_import(client, payload, mode="delta", workers=2)
+
+    assert response.status_code == 400
+    assert response.json()["code"] == "ERR_VALIDATION"
+
+
+def test_post_import_with_workers_writes_nothing_when_a_worker_cannot_prepare(
+    client: TestClient, db_engine, prepared_transactions, monkeypatch
+) -> None:
+    prepare = TwoPhaseTransaction.prepare
+    prepared_xids: list[str] = []
+
+    def fail_second_prepare(transaction: TwoPhaseTransaction) -> None:
+        prepared_xids.append(transaction.xid)
+        if len(prepared_xids) == 2:
+            raise _injected_failure()
+        prepare(transaction)
+
+    monkeypatch.setattr(TwoPhaseTransaction, "prepare", fail_second_prepare)
+    payload = {"types": [_type_item(f"Type {index:02d}") for index in range(20)]}
+
+    with pytest.raises(OperationalError):
+        _post_import(client, payload, workers=4)
+
+    assert len(prepared_xids) == 2
+    assert _table_counts(db_engine) == (0, 0, 0)
+
+
+def test_post_import_with_workers_completes_a_worker_commit_that_failed(
+    client: TestClient, db_engine, prepared_transactions, monkeypatch
+) -> None:
+    commit = TwoPhaseTransaction.commit
+    committed_xids: list[str] = []
+
+    def fail_second_commit(transaction: TwoPhaseTransaction) -> None:
+        committed_xids.append(transaction.xid)
+        if len(committed_xids) == 2:
+            raise _injected_failure()
+        commit(transaction)
+
+    monkeypatch.setattr(TwoPhaseTransaction, "commit", fail_second_commit)
+    payload = {"types": [_type_item(f"Type {index:02d}") for index in range(20)]}
+
+    response = _post_import(client, payload, workers=4)
+
+    assert response.status_code == 200
+    assert len(committed_xids) == 4
+    assert _table_counts(db_engine) == (20, 20, 0)
+
+
+def test_post_import_with_workers_falls_back_without_prepared_transactions(
+    client: TestClient, db_engine, monkeypatch
+) -> None:
+    monkeypatch.setattr(importing, "_can_prepare_worker_transactions", lambda *_args: False)
+    payload = {"types": [_type_item(f"Type {index:02d}") for index in range(20)]}
+
+    response = _post_import(client, payload, workers=4)
+
+    assert response.status_code == 200
+    with db_engine.connect() as connection:
+        type_count = connection.execute(text("SELECT COUNT(*) FROM miniature_types")).scalar_one()
+    assert type_count == 20
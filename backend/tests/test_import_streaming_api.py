@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.config import get_settings
+
+STAGES = ("IN_BOX", "BUILDING", "PRIMING", "PAINTING", "DONE")
+
+
+def _type_item(name: str, history_rows: int) -> dict[str, object]:
+    return {
+        "name": name,
+        "stage_counts": [
+            {"stage": stage, "count": history_rows if stage == "DONE" else 0} for stage in STAGES
+        ],
+        "history": [
+            {
+                "from_stage": "IN_BOX",
+                "to_stage": "DONE",
+                "qty": 1,
+                "created_at": f"2026-02-25T09:{minute % 60:02d}:00Z",
+            }
+            for minute in range(history_rows)
+        ],
+    }
+
+
+def _count_rows(db_engine, table: str) -> int:
+    with db_engine.connect() as connection:
+        return connection.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar_one()
+
+
+def test_post_import_applies_types_across_flush_chunks(client: TestClient, db_engine) -> None:
+    payload = {"types": [_type_item(f"Type {index:03d}", 100) for index in range(250)]}
+
+    response = client.post("/api/v1/import", json=payload)
+
+    assert response.status_code == 200
+    assert _count_rows(db_engine, "history_logs") == 25_000
+    with db_engine.connect() as connection:
+        done_counts = (
+            connection.execute(
+                text("SELECT count FROM stage_counts WHERE stage_name = 'DONE' ORDER BY type_id")
+            )
+            .scalars()
+            .all()
+        )
+    assert done_counts == [100] * 250
+
+
+def test_post_import_rolls_back_applied_types_on_malformed_tail(
+    client: TestClient, db_engine
+) -> None:
+    body = json.dumps({"types": [_type_item("Alpha", 3)]}).encode()[:-2] + b",{"
+
+    response = client.post(
+        "/api/v1/import", content=body, headers={"Content-Type": "application/json"}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["code"] == "ERR_VALIDATION"
+    assert _count_rows(db_engine, "miniature_types") == 0
+    assert _count_rows(db_engine, "history_logs") == 0
+
+
+def test_post_import_rejects_unknown_field_after_types(client: TestClient, db_engine) -> None:
+    body = json.dumps({"types": [_type_item("Alpha", 1)], "extra": 1}).encode()
+
+    response = client.post(
+        "/api/v1/import", content=body, headers={"Content-Type": "application/json"}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["code"] == "ERR_INVALID_IMPORT_FORMAT"
+    assert _count_rows(db_engine, "miniature_types") == 0
+
+
+def test_post_import_limits_chunked_body_without_content_length(
+    client: TestClient, db_engine, monkeypatch
+) -> None:
+    monkeypatch.setenv("IMPORT_MAX_BYTES", str(1024 * 1024))
+    get_settings.cache_clear()
+
+    def chunks() -> Iterator[bytes]:
+        yield b'{"types": ['
+        for _ in range(64):
+            yield b" " * 32 * 1024
+
+    response = client.post(
+        "/api/v1/import", content=chunks(), headers={"Content-Type": "application/json"}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["code"] == "ERR_PAYLOAD_TOO_LARGE"
+
+
+def test_delta_import_with_trailing_token_skips_applied_retry(
+    client: TestClient, db_engine
+) -> None:
+    body = json.dumps({"types": [_type_item("Alpha", 2)], "since": "0.0", "token": "2.1"}).encode()
+
+    first = client.post(
+        "/api/v1/import",
+        params={"mode": "delta"},
+        content=body,
+        headers={"Content-Type": "application/json"},
+    )
+    retried = client.post(
+        "/api/v1/import",
+        params={"mode": "delta"},
+        content=body,
+        headers={"Content-Type": "application/json"},
+    )
+
+    assert first.status_code == 200
+    assert retried.status_code == 200
+    assert _count_rows(db_engine, "history_logs") == 2
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+
+
+def _sample(client: TestClient, name: str, **labels: str) -> float:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    for family in text_string_to_metric_families(response.text):
+        for sample in family.samples:
+            if sample.name == name and all(
+                sample.labels.get(key) == value for key, value in labels.items()
+            ):
+                return sample.value
+    return 0.0
+
+
+def test_metrics_count_requests_moves_and_contract_errors(client: TestClient) -> None:
+    requests_before = _sample(
+        client, "http_requests_total", method="GET", handler="list_types", status="200"
+    )
+    moved_before = _sample(
+        client, "stage_moved_items_total", from_stage="IN_BOX", to_stage="BUILDING"
+    )
+    errors_before = _sample(client, "api_contract_errors_total", code="ERR_INSUFFICIENT_QTY")
+
+    type_id = client.post("/api/v1/types", json={"name": "Alpha"}).json()["id"]
+    client.get("/api/v1/types")
+    client.post(
+        f"/api/v1/types/{type_id}/move",
+        json={"from_stage": "IN_BOX", "to_stage": "BUILDING", "qty": 1},
+    )
+
+    assert (
+        _sample(client, "http_requests_total", method="GET", handler="list_types", status="200")
+        == requests_before + 1
+    )
+    assert (
+        _sample(client, "http_request_duration_seconds_count", method="GET", handler="list_types")
+        >= 1
+    )
+    assert (
+        _sample(client, "stage_moved_items_total", from_stage="IN_BOX", to_stage="BUILDING")
+        == moved_before
+    )
+    assert (
+        _sample(client, "api_contract_errors_total", code="ERR_INSUFFICIENT_QTY")
+        == errors_before + 1
+    )
+    assert _sample(client, "move_lock_wait_seconds_count") >= 1
+    assert _sample(client, "db_pool_connections_checked_out", database="primary") == 0
+
+
+def test_metrics_count_imported_rows(client: TestClient) -> None:
+    rows_before = _sample(client, "imported_history_rows_total", mode="merge")
+    history = [
+        {
+            "from_stage": "IN_BOX",
+            "to_stage": "BUILDING",
+            "qty": 1,
+            "created_at": f"2026-02-25T09:00:0{index}Z",
+        }
+        for index in range(3)
+    ]
+    payload = {
+        "types": [
+            {
+                "name": "Alpha",
+                "stage_counts": [
+                    {"stage": stage, "count": 3 if stage == "BUILDING" else 0}
+                    for stage in ("IN_BOX", "BUILDING", "PRIMING", "PAINTING", "DONE")
+                ],
+                "history": history,
+            }
+        ]
+    }
+
+    response = client.post(
+        "/api/v1/import",
+        content=json.dumps(payload),
+        headers={"Content-Type": "application/json"},
+    )
+
+    assert response.status_code == 200
+    assert _sample(client, "imported_history_rows_total", mode="merge") == rows_before + 3
@@ -11,8 +11,17 @@ def test_alembic_upgrade_head_creates_schema(client: TestClient, db_engine) -> N
 
     assert set(inspector.get_table_names()) == {
         "alembic_version",
+        "consistency_checks",
+        "consistency_discrepancies",
+        "consistency_expected_counts",
+        "data_revisions",
+        "export_jobs",
         "history_logs",
+        "import_job_types",
+        "import_jobs",
         "miniature_types",
+        "stage_count_adjustments",
+        "stage_count_snapshots",
         "stage_counts",
     }
 
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.config import get_settings
+from app.db.session import MonitoredQueuePool
+
+
+def test_get_pool_reports_configured_size_and_checkouts(client: TestClient) -> None:
+    before = client.get("/api/v1/pool")
+    assert before.status_code == 200
+
+    assert client.get("/api/v1/types").status_code == 200
+    after = client.get("/api/v1/pool").json()
+
+    settings = get_settings()
+    assert after["size"] == settings.db_pool_size
+    assert after["max_overflow"] == settings.db_max_overflow
+    assert after["checked_out"] == 0
+    assert after["checkouts"] > before.json()["checkouts"]
+    assert after["wait_seconds_total"] >= after["wait_seconds_max"] >= 0
+    assert after["timeouts"] == 0
+
+
+def test_monitored_pool_counts_checkout_timeouts(database_url) -> None:
+    engine = create_engine(
+        database_url, poolclass=MonitoredQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.1
+    )
+    try:
+        with engine.connect(), pytest.raises(PoolTimeoutError):
+            engine.connect()
+        stats = engine.pool.checkout_stats()
+    finally:
+        engine.dispose()
+
+    assert stats.checkouts == 2
+    assert stats.timeouts == 1
+    assert stats.wait_seconds_max >= 0.1
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.api.v1 import replica
+from app.config import get_settings
+from app.db import Base
+from app.main import create_app
+
+
+@pytest.fixture
+def replica_client(database_url, monkeypatch, tmp_path):
+    # An empty database stands in for a replica that has replayed nothing, so
+    # every response shows which database served it.
+    read_url = f"sqlite:///{tmp_path / 'replica.db'}"
+    engine = create_engine(read_url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    monkeypatch.setenv("DATABASE_READ_URL", read_url)
+    get_settings.cache_clear()
+    try:
+        yield TestClient(create_app())
+    finally:
+        get_settings.cache_clear()
+
+
+def _type_names(client: TestClient) -> list[str]:
+    return [item["name"] for item in client.get("/api/v1/types").json()["items"]]
+
+
+def test_reads_go_to_replica_without_a_recent_write(replica_client: TestClient) -> None:
+    created = replica_client.post("/api/v1/types", json={"name": "Alpha"})
+    assert created.status_code == 201
+    replica_client.cookies.clear()
+
+    assert _type_names(replica_client) == []
+    assert replica_client.get("/api/v1/export").json()["types"] == []
+
+
+def test_reads_stay_on_primary_until_replica_replays_the_write(
+    replica_client: TestClient, database_url, monkeypatch
+) -> None:
+    if not database_url.startswith("postgresql"):
+        pytest.skip("Write positions are PostgreSQL WAL positions.")
+    created = replica_client.post("/api/v1/types", json={"name": "Alpha"})
+    assert replica.WRITE_LSN_COOKIE in created.cookies
+
+    assert _type_names(replica_client) == ["Alpha"]
+
+    monkeypatch.setattr(replica, "_replica_has_replayed", lambda session_factory, lsn: True)
+    assert _type_names(replica_client) == []
+
+
+def test_delta_export_reads_primary(replica_client: TestClient) -> None:
+    replica_client.post("/api/v1/types", json={"name": "Alpha"})
+    replica_client.cookies.clear()
+
+    delta = replica_client.get("/api/v1/export", params={"since": "0.0"})
+
+    assert [item["name"] for item in delta.json()["types"]] == ["Alpha"]
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import logging
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import create_app
+
+_SERVER_TIMING_RE = re.compile(r"db;dur=(\d+\.\d{3}), db_count;desc=(\d+)")
+
+
+def _server_timing(response) -> tuple[float, int]:
+    match = _SERVER_TIMING_RE.fullmatch(response.headers["server-timing"])
+    assert match is not None
+    return float(match.group(1)), int(match.group(2))
+
+
+@pytest.fixture
+def logging_client(database_url, monkeypatch):
+    monkeypatch.setenv("QUERY_COUNT_LOG_THRESHOLD", "100")
+    monkeypatch.setenv("QUERY_COUNT_LOG_ROUTE_THRESHOLDS", '{"move_type": 1}')
+    get_settings.cache_clear()
+    try:
+        yield TestClient(create_app())
+    finally:
+        get_settings.cache_clear()
+
+
+def test_server_timing_reports_statements_of_each_request(client: TestClient) -> None:
+    created = client.post("/api/v1/types", json={"name": "Alpha"})
+    listed = client.get("/api/v1/types")
+    health = client.get("/health")
+
+    _, created_count = _server_timing(created)
+    duration_ms, listed_count = _server_timing(listed)
+    assert created_count >= 2
+    assert listed_count >= 1
+    assert duration_ms >= 0
+    assert _server_timing(health) == (0.0, 0)
+
+
+def test_requests_over_route_threshold_are_logged(logging_client: TestClient, caplog) -> None:
+    type_id = logging_client.post("/api/v1/types", json={"name": "Alpha"}).json()["id"]
+
+    with caplog.at_level(logging.WARNING, logger="app.api.server_timing"):
+        logging_client.get(f"/api/v1/types/{type_id}")
+        logging_client.post(
+            f"/api/v1/types/{type_id}/move",
+            json={"from_stage": "IN_BOX", "to_stage": "BUILDING", "qty": 1},
+        )
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert len(messages) == 1
+    assert messages[0].startswith(f"POST /api/v1/types/{type_id}/move (move_type) ran ")
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import json
+from datetime import timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.workers.snapshots import take_stage_count_snapshots
+
+
+def _set_counts(connection, type_id: int, counts: dict[str, int]) -> None:
+    for stage_name, count in counts.items():
+        connection.execute(
+            text(
+                "UPDATE stage_counts SET count = :count "
+                "WHERE type_id = :type_id AND stage_name = :stage_name"
+            ),
+            {"type_id": type_id, "stage_name": stage_name, "count": count},
+        )
+
+
+def _seed_pipeline(db_engine) -> None:
+    with db_engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO miniature_types (name, created_at) "
+                "VALUES (:name, '2026-02-01 00:00:00+00')"
+            ),
+            [{"name": "Alpha"}, {"name": "Beta"}],
+        )
+        connection.execute(
+            text(
+                """
+                INSERT INTO stage_count_snapshots
+                    (type_id, taken_at, in_box, building, priming, painting, done)
+                VALUES (1, '2026-03-01 00:00:00+00', 10, 0, 0, 0, 0)
+                """
+            )
+        )
+        connection.execute(
+            text(
+                """
+                INSERT INTO history_logs (type_id, from_stage, to_stage, qty, created_at)
+                VALUES
+                    (1, 'IN_BOX', 'BUILDING', 4, '2026-03-01 10:00:00+00'),
+                    (1, 'BUILDING', 'DONE', 2, '2026-03-05 10:00:00+00'),
+                    (2, 'IN_BOX', 'BUILDING', 2, '2026-03-03 10:00:00+00')
+                """
+            )
+        )
+        _set_counts(connection, 1, {"IN_BOX": 6, "BUILDING": 2, "DONE": 2})
+        _set_counts(connection, 2, {"IN_BOX": 3, "BUILDING": 2})
+
+
+def test_get_types_as_of_replays_history_from_nearest_snapshot(
+    client: TestClient, db_engine
+) -> None:
+    _seed_pipeline(db_engine)
+
+    response = client.get("/api/v1/types", params={"as_of": "2026-03-02T00:00:00Z"})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "items": [
+            {
+                "id": 1,
+                "name": "Alpha",
+                "counts": {"in_box": 6, "building": 4, "priming": 0, "painting": 0, "done": 0},
+            },
+            {
+                "id": 2,
+                "name": "Beta",
+                "counts": {"in_box": 5, "building": 0, "priming": 0, "painting": 0, "done": 0},
+            },
+        ]
+    }
+
+
+def test_get_type_as_of_before_first_snapshot_replays_backwards(
+    client: TestClient, db_engine
+) -> None:
+    _seed_pipeline(db_engine)
+
+    response = client.get("/api/v1/types/1", params={"as_of": "2026-02-20T00:00:00Z"})
+
+    assert response.status_code == 200
+    assert response.json()["counts"] == {
+        "in_box": 10,
+        "building": 0,
+        "priming": 0,
+        "painting": 0,
+        "done": 0,
+    }
+
+
+def test_get_type_as_of_returns_404_for_unknown_type(client: TestClient, db_engine) -> None:
+    response = client.get("/api/v1/types/999", params={"as_of": "2026-03-02T00:00:00Z"})
+
+    assert response.status_code == 404
+
+
+def test_take_stage_count_snapshots_only_captures_new_or_stale_types(
+    client: TestClient, db_engine
+) -> None:
+    _seed_pipeline(db_engine)
+
+    with Session(db_engine) as db_session, db_session.begin():
+        first_run = take_stage_count_snapshots(db_session, timedelta(hours=1))
+    with Session(db_engine) as db_session, db_session.begin():
+        second_run = take_stage_count_snapshots(db_session, timedelta(hours=1))
+
+    # Alpha's only snapshot is old and its counts changed; Beta had none.
+    assert first_run == 2
+    assert second_run == 0
+
+
+def test_get_types_as_of_replays_the_adjustment_ledger(client: TestClient, db_engine) -> None:
+    _seed_pipeline(db_engine)
+    with db_engine.begin() as connection:
+        connection.execute(
+            text(
+                """
+                INSERT INTO stage_count_adjustments (type_id, stage_name, delta, created_at)
+                VALUES (2, 'IN_BOX', 5, '2026-03-04 10:00:00+00')
+                """
+            )
+        )
+        _set_counts(connection, 2, {"IN_BOX": 8})
+
+    before = client.get("/api/v1/types/2", params={"as_of": "2026-03-02T00:00:00Z"})
+    after = client.get("/api/v1/types/2", params={"as_of": "2026-03-05T00:00:00Z"})
+
+    assert before.status_code == 200
+    assert before.json()["counts"]["in_box"] == 5
+    assert after.json()["counts"]["in_box"] == 8
+
+
+def test_get_types_as_of_leaves_out_types_created_later(client: TestClient, db_engine) -> None:
+    _seed_pipeline(db_engine)
+    with db_engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO miniature_types (name, created_at) "
+                "VALUES ('Gamma', '2026-03-10 00:00:00+00')"
+            )
+        )
+
+    listed = client.get("/api/v1/types", params={"as_of": "2026-03-02T00:00:00Z"})
+    single = client.get("/api/v1/types/3", params={"as_of": "2026-03-02T00:00:00Z"})
+
+    assert [item["name"] for item in listed.json()["items"]] == ["Alpha", "Beta"]
+    assert single.status_code == 404
+
+
+def test_imported_types_date_from_their_earliest_history(client: TestClient) -> None:
+    payload = {
+        "types": [
+            {
+                "name": "Alpha",
+                "stage_counts": [
+                    {"stage": stage, "count": 3 if stage == "BUILDING" else 0}
+                    for stage in ("IN_BOX", "BUILDING", "PRIMING", "PAINTING", "DONE")
+                ],
+                "history": [
+                    {
+                        "from_stage": "IN_BOX",
+                        "to_stage": "BUILDING",
+                        "qty": 3,
+                        "created_at": "2026-02-25T09:00:00Z",
+                    }
+                ],
+            }
+        ]
+    }
+    response = client.post(
+        "/api/v1/import",
+        content=json.dumps(payload),
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 200
+
+    before = client.get("/api/v1/types", params={"as_of": "2026-02-24T00:00:00Z"})
+    after = client.get("/api/v1/types", params={"as_of": "2026-02-26T00:00:00Z"})
+
+    assert before.json() == {"items": []}
+    assert after.json()["items"][0]["counts"] == {
+        "in_box": 0,
+        "building": 3,
+        "priming": 0,
+        "painting": 0,
+        "done": 0,
+    }